@@ -0,0 +1,120 @@
+"""
+连接准入控制模块
+在 accept 时执行全局连接上限、单IP连接上限与新建连接速率限制，
+并为每个会话提供报文速率令牌桶，重连风暴时拒绝超额连接而不是耗尽文件描述符和内存
+"""
+
+import time
+from typing import Dict, Optional
+
+# 拒绝原因
+REJECT_MAX_CONNECTIONS = "max_connections"
+REJECT_MAX_PER_IP = "max_per_ip"
+REJECT_ACCEPT_RATE = "accept_rate"
+
+
+class TokenBucket:
+    """令牌桶：以 rate 个/秒补充，最多累积 burst 个"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def consume(self, now: float, tokens: float = 1.0) -> bool:
+        """尝试取出令牌，不足时返回False"""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+
+class AdmissionController:
+    """
+    连接准入控制器
+
+    各项限制取值 <= 0 时表示不限制。
+    """
+
+    def __init__(self, max_connections: int = 1000, max_per_ip: int = 0,
+                 accept_rate: float = 200.0, accept_burst: float = 1000.0,
+                 frame_rate: float = 200.0, frame_burst: float = 500.0):
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self.frame_rate = frame_rate
+        self.frame_burst = frame_burst
+        self._accept_bucket = TokenBucket(accept_rate, accept_burst) if accept_rate > 0 else None
+        self._active = 0
+        self._per_ip: Dict[str, int] = {}
+        # 统计信息
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {
+            REJECT_MAX_CONNECTIONS: 0,
+            REJECT_MAX_PER_IP: 0,
+            REJECT_ACCEPT_RATE: 0
+        }
+        self.frames_throttled = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def rejected_total(self) -> int:
+        return sum(self.rejected.values())
+
+    def admit(self, ip: str, now: Optional[float] = None) -> Optional[str]:
+        """
+        新连接准入检查
+        允许时登记连接并返回None，拒绝时返回拒绝原因
+        """
+        reason = None
+        if self.max_connections > 0 and self._active >= self.max_connections:
+            reason = REJECT_MAX_CONNECTIONS
+        elif self.max_per_ip > 0 and self._per_ip.get(ip, 0) >= self.max_per_ip:
+            reason = REJECT_MAX_PER_IP
+        elif self._accept_bucket is not None and \
+                not self._accept_bucket.consume(time.monotonic() if now is None else now):
+            reason = REJECT_ACCEPT_RATE
+        if reason is not None:
+            self.rejected[reason] += 1
+            return reason
+        self._active += 1
+        self._per_ip[ip] = self._per_ip.get(ip, 0) + 1
+        self.admitted += 1
+        return None
+
+    def release(self, ip: str):
+        """已准入的连接断开时释放名额"""
+        self._active -= 1
+        count = self._per_ip.get(ip, 0) - 1
+        if count > 0:
+            self._per_ip[ip] = count
+        else:
+            self._per_ip.pop(ip, None)
+
+    def new_frame_bucket(self, now: Optional[float] = None) -> Optional[TokenBucket]:
+        """为新会话创建报文速率令牌桶，不限制时返回None"""
+        if self.frame_rate <= 0:
+            return None
+        return TokenBucket(self.frame_rate, self.frame_burst, now)
+
+    def get_stats(self) -> Dict:
+        """获取准入控制统计信息"""
+        return {
+            "active": self._active,
+            "max_connections": self.max_connections,
+            "max_per_ip": self.max_per_ip,
+            "source_ips": len(self._per_ip),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "rejected_total": self.rejected_total,
+            "frames_throttled": self.frames_throttled
+        }
@@ -0,0 +1,178 @@
+"""
+JT808 报文编码模块
+编码 2013/2019 版消息头（含分包项），计算校验码并完成转义与标识位封装，
+供平台应答、下行指令以及压测/模拟终端共用
+"""
+
+import struct
+from typing import Dict, Optional, Tuple
+
+try:
+    from .frame_decoder import xor_checksum
+except ImportError:
+    import importlib.util
+    import os
+    frame_decoder_path = os.path.join(os.path.dirname(__file__), 'frame_decoder.py')
+    spec = importlib.util.spec_from_file_location("frame_decoder", frame_decoder_path)
+    frame_decoder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_decoder)
+    xor_checksum = frame_decoder.xor_checksum
+
+# 消息体属性：低10位为消息体长度，0x2000 为分包标志，0x4000 为2019版版本标识
+BODY_LENGTH_MASK = 0x03FF
+SUBPKG_FLAG = 0x2000
+VERSION_FLAG = 0x4000
+MAX_BODY_SIZE = BODY_LENGTH_MASK
+
+# 手机号BCD位数（2013版12位，2019版20位）
+PHONE_DIGITS = 12
+PHONE_DIGITS_2019 = 20
+
+# 手机号BCD缓存上限，超过后整体清空重建
+PHONE_CACHE_SIZE = 100000
+
+# 整段消息头缓存上限（按 终端+消息ID+消息体长度 缓存），超过后整体清空重建
+HEAD_CACHE_SIZE = 200000
+
+_SEQ = struct.Struct('>H')
+_SEQ_SUBPKG = struct.Struct('>HHH')
+# 校验码字节
+_CHECKSUM = [bytes((value,)) for value in range(256)]
+
+
+class JT808Builder:
+    """
+    JT808 报文编码器
+
+    "消息ID+消息体属性(+版本号)"按 (消息ID, 消息体长度, 版本, 是否分包) 缓存，
+    终端手机号BCD按终端缓存，二者的异或值一并缓存，编码时只需写入流水号与消息体并补齐校验码。
+    "消息头+手机号"整段另按 (终端, 消息ID, 消息体长度, 版本, 是否分包) 缓存，编码一帧只需
+    拼接流水号与消息体；内容中没有 0x7E/0x7D 时（绝大多数报文）直接加标识位输出，否则再做转义替换。
+    version 为终端的协议版本号（2019版），为None时按2013版消息头编码。
+    """
+
+    def __init__(self):
+        self._seq = 0
+        self._phone_bcd: Dict[str, Tuple[bytes, int]] = {}
+        self._phone_bcd_2019: Dict[str, Tuple[bytes, int]] = {}
+        self._prefixes: Dict[Tuple[int, int, Optional[int], bool], Tuple[bytes, int]] = {}
+        self._heads: Dict[Tuple[str, int, int, Optional[int], bool], Tuple[bytes, int]] = {}
+        # 统计信息
+        self.frames_built = 0
+        self.bytes_built = 0
+        self.frames_escaped = 0
+
+    @property
+    def seq(self) -> int:
+        """最近一次分配的平台流水号"""
+        return self._seq
+
+    def next_seq(self) -> int:
+        """平台自身的消息流水号，循环累加"""
+        self._seq = (self._seq + 1) & 0xFFFF
+        return self._seq
+
+    def phone_bcd(self, phone: str, version: Optional[int] = None) -> bytes:
+        """终端手机号转BCD（2013版6字节，2019版10字节，带缓存）"""
+        return self.phone_template(phone, version)[0]
+
+    def phone_template(self, phone: str, version: Optional[int] = None) -> Tuple[bytes, int]:
+        """手机号BCD及其异或值"""
+        if version is None:
+            cache, digits = self._phone_bcd, PHONE_DIGITS
+        else:
+            cache, digits = self._phone_bcd_2019, PHONE_DIGITS_2019
+        template = cache.get(phone)
+        if template is None:
+            if len(cache) >= PHONE_CACHE_SIZE:
+                cache.clear()
+            bcd = bytes.fromhex(phone.rjust(digits, '0')[-digits:])
+            template = (bcd, xor_checksum(bcd))
+            cache[phone] = template
+        return template
+
+    def prefix_template(self, msg_id: int, body_len: int, version: Optional[int] = None,
+                        subpackage: bool = False) -> Tuple[bytes, int]:
+        """消息ID+消息体属性（2019版另含协议版本号）及其异或值"""
+        key = (msg_id, body_len, version, subpackage)
+        template = self._prefixes.get(key)
+        if template is None:
+            body_props = body_len & BODY_LENGTH_MASK
+            if subpackage:
+                body_props |= SUBPKG_FLAG
+            if version is None:
+                prefix = struct.pack('>HH', msg_id, body_props)
+            else:
+                prefix = struct.pack('>HHB', msg_id, body_props | VERSION_FLAG, version)
+            template = (prefix, xor_checksum(prefix))
+            self._prefixes[key] = template
+        return template
+
+    def head_template(self, msg_id: int, phone: str, body_len: int, version: Optional[int] = None,
+                      subpackage: bool = False) -> Tuple[bytes, int]:
+        """整段消息头（流水号之前的部分）及其异或值，按终端缓存"""
+        key = (phone, msg_id, body_len, version, subpackage)
+        template = self._heads.get(key)
+        if template is None:
+            if len(self._heads) >= HEAD_CACHE_SIZE:
+                self._heads.clear()
+            prefix, prefix_xor = self.prefix_template(msg_id, body_len, version, subpackage)
+            bcd, bcd_xor = self.phone_template(phone, version)
+            template = (prefix + bcd, prefix_xor ^ bcd_xor)
+            self._heads[key] = template
+        return template
+
+    def _encode(self, msg_id: int, phone: str, body, seq: Optional[int], version: Optional[int],
+                pkg_total: Optional[int], pkg_index: Optional[int]) -> Tuple[bytes, int]:
+        """编码未转义的消息头+消息体，返回内容及其校验码"""
+        body_len = len(body)
+        if body_len > MAX_BODY_SIZE:
+            raise ValueError(f"消息体长度 {body_len} 超过上限 {MAX_BODY_SIZE}，请分包发送")
+        if seq is None:
+            seq = self._seq = (self._seq + 1) & 0xFFFF
+        template = self._heads.get((phone, msg_id, body_len, version, pkg_total is not None))
+        if template is None:
+            template = self.head_template(msg_id, phone, body_len, version, pkg_total is not None)
+        head, checksum = template
+        checksum ^= (seq >> 8) ^ (seq & 0xFF)
+        if pkg_total is None:
+            content = head + _SEQ.pack(seq) + body
+        else:
+            content = head + _SEQ_SUBPKG.pack(seq, pkg_total, pkg_index) + body
+            checksum ^= (pkg_total >> 8) ^ (pkg_total & 0xFF) ^ (pkg_index >> 8) ^ (pkg_index & 0xFF)
+        for b in body:
+            checksum ^= b
+        return content, checksum
+
+    def build_content(self, msg_id: int, phone: str, body=b'', seq: Optional[int] = None,
+                      version: Optional[int] = None, pkg_total: Optional[int] = None,
+                      pkg_index: Optional[int] = None) -> bytes:
+        """编码未转义的消息头+消息体（不含校验码与标识位），即解码器产出的帧内容"""
+        return self._encode(msg_id, phone, body, seq, version, pkg_total, pkg_index)[0]
+
+    def build(self, msg_id: int, phone: str, body=b'', seq: Optional[int] = None,
+              version: Optional[int] = None, pkg_total: Optional[int] = None,
+              pkg_index: Optional[int] = None) -> bytes:
+        """
+        编码完整的线上帧（标识位+转义后的消息头、消息体、校验码+标识位）
+        seq 为None时使用平台流水号；pkg_total/pkg_index 不为None时写入分包项
+        """
+        content, checksum = self._encode(msg_id, phone, body, seq, version, pkg_total, pkg_index)
+        content += _CHECKSUM[checksum]
+        # 绝大多数报文不含 0x7E/0x7D，按单字节查找（memchr）即可跳过转义
+        if 0x7E in content or 0x7D in content:
+            content = content.replace(b'\x7d', b'\x7d\x01').replace(b'\x7e', b'\x7d\x02')
+            self.frames_escaped += 1
+        frame = b'\x7e' + content + b'\x7e'
+        self.frames_built += 1
+        self.bytes_built += len(frame)
+        return frame
+
+    def get_stats(self) -> Dict:
+        """获取编码统计信息"""
+        return {
+            "frames_built": self.frames_built,
+            "bytes_built": self.bytes_built,
+            "frames_escaped": self.frames_escaped,
+            "platform_seq": self._seq
+        }
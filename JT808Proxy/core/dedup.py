@@ -0,0 +1,153 @@
+"""
+重复报文抑制模块
+终端收不到平台应答时会以相同流水号重发报文，每个会话用滑动窗口位图记录最近收到的流水号
+及对应报文的指纹（消息ID+校验码），在入库和转发之前识别重发，避免重复写库、重复转发
+"""
+
+from array import array
+from enum import Enum
+from typing import Dict
+
+# 消息流水号为 WORD，循环累加
+SEQ_MODULO = 0x10000
+SEQ_HALF = SEQ_MODULO // 2
+
+# 终端注册、终端鉴权：终端重启或重新上线的标志，收到时清空流水号窗口
+RESET_MSG_IDS = frozenset({0x0100, 0x0102})
+
+
+def frame_fingerprint(msg_id: int, checksum: int) -> int:
+    """报文指纹：消息ID+校验码，流水号相同但内容不同的报文不视为重发"""
+    return (msg_id << 8) | checksum
+
+
+class DuplicateMode(Enum):
+    """重复报文处理方式"""
+    DROP = "drop"  # 仅应答，不入库、不转发
+    FLAG = "flag"  # 只统计，照常入库和转发
+    OFF = "off"    # 不检测
+
+
+class SequenceWindow:
+    """
+    流水号滑动窗口
+
+    highest 为已收到的最新流水号，bitmap 第 i 位表示 highest - i 是否已收到，
+    fingerprints 按 流水号 % 窗口大小 记录该流水号报文的指纹，流水号与指纹都相同才算重发。
+    流水号回绕按 WORD 取模比较；落后超过窗口大小的流水号视为终端重启后重新计数。
+    fresh 表示窗口刚由旧连接交接过来：新连接上的首个报文若流水号回退且不是重发，
+    说明终端重启后重新计数，清空窗口。
+    """
+
+    __slots__ = ('highest', 'bitmap', 'fingerprints', 'fresh')
+
+    def __init__(self):
+        self.highest = -1
+        self.bitmap = 0
+        self.fingerprints = None
+        self.fresh = False
+
+    def reset(self, seq: int, size: int, fingerprint: int = 0):
+        """清空窗口，只保留当前流水号"""
+        if self.fingerprints is None or len(self.fingerprints) != size:
+            self.fingerprints = array('I', bytes(4 * size))
+        self.highest = seq
+        self.bitmap = 1
+        self.fingerprints[seq % size] = fingerprint
+
+    def seen(self, seq: int, size: int, fingerprint: int = 0) -> bool:
+        """记录流水号及报文指纹，同一流水号、同一指纹已在窗口内出现过时返回True"""
+        fresh = self.fresh
+        self.fresh = False
+        if self.highest < 0 or self.fingerprints is None or len(self.fingerprints) != size:
+            self.reset(seq, size, fingerprint)
+            return False
+        ahead = (seq - self.highest) % SEQ_MODULO
+        if ahead == 0:
+            behind = 0
+        elif ahead < SEQ_HALF:
+            # 窗口前移
+            self.bitmap = ((self.bitmap << ahead) | 1) & ((1 << size) - 1) if ahead < size else 1
+            self.highest = seq
+            self.fingerprints[seq % size] = fingerprint
+            return False
+        else:
+            behind = SEQ_MODULO - ahead
+            if behind >= size:
+                # 超出窗口，按重新计数处理
+                self.reset(seq, size, fingerprint)
+                return False
+        bit = 1 << behind
+        index = seq % size
+        if self.bitmap & bit and self.fingerprints[index] == fingerprint:
+            return True
+        if fresh:
+            # 新连接上流水号回退且不是重发：终端重启后重新计数
+            self.reset(seq, size, fingerprint)
+            return False
+        self.bitmap |= bit
+        self.fingerprints[index] = fingerprint
+        return False
+
+
+class DuplicateFilter:
+    """
+    重复报文过滤器
+
+    被检查的会话对象需要有 seq_window 属性（None 时按需创建窗口）。
+    每个窗口另有 window_size 个4字节指纹（默认256，即每会话1KB）。
+    """
+
+    def __init__(self, window_size: int = 256, mode: DuplicateMode = DuplicateMode.DROP):
+        self.window_size = window_size
+        self.mode = DuplicateMode(mode)
+        # 统计信息
+        self.checked = 0
+        self.duplicates = 0
+        self.writes_saved = 0
+        self.forwards_saved = 0
+        self.resets = 0
+
+    def is_duplicate(self, session, seq: int, msg_id: int = 0, checksum: int = 0) -> bool:
+        """检查并记录会话的报文流水号，msg_id 与 checksum 组成报文指纹"""
+        if self.mode is DuplicateMode.OFF:
+            return False
+        window = session.seq_window
+        if window is None:
+            window = session.seq_window = SequenceWindow()
+        self.checked += 1
+        fingerprint = frame_fingerprint(msg_id, checksum)
+        if msg_id in RESET_MSG_IDS:
+            # 终端注册/鉴权：之前的流水号不再有效
+            window.reset(seq, self.window_size, fingerprint)
+            self.resets += 1
+            return False
+        if window.seen(seq, self.window_size, fingerprint):
+            self.duplicates += 1
+            return True
+        return False
+
+    def inherit(self, session, previous):
+        """终端重连：新会话沿用被接管会话的流水号窗口，以识别重连后重发的报文"""
+        window = previous.seq_window
+        if session.seq_window is None and window is not None:
+            window.fresh = True
+            session.seq_window = window
+
+    @property
+    def drops(self) -> bool:
+        """重复报文是否跳过入库和转发"""
+        return self.mode is DuplicateMode.DROP
+
+    def get_stats(self) -> Dict:
+        """获取重复报文统计信息"""
+        return {
+            "mode": self.mode.value,
+            "window_size": self.window_size,
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "hit_rate": self.duplicates / self.checked if self.checked else 0.0,
+            "writes_saved": self.writes_saved,
+            "forwards_saved": self.forwards_saved,
+            "resets": self.resets
+        }
@@ -0,0 +1,102 @@
+"""
+报文分发注册表模块
+按消息ID登记处理函数及其属性（是否解析消息体、是否入库、是否应答），
+分发时一次字典查找，未登记的消息ID不做任何消息体解析；每个消息ID自动统计处理次数与耗时
+"""
+
+import time
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 处理函数：(消息头, 完整报文, 消息体偏移量)，偏移量取自消息头（已区分协议版本与分包）
+MessageHandler = Callable[[object, bytes, int], Awaitable[None]]
+
+
+class MessageRoute:
+    """一个消息ID的处理登记及统计"""
+
+    __slots__ = ('msg_id', 'name', 'handler', 'parse', 'fragments', 'stores', 'reply',
+                 'count', 'errors', 'total_seconds', 'max_seconds')
+
+    def __init__(self, msg_id: int, name: str, handler: Optional[MessageHandler],
+                 parse: bool = True, stores: bool = False, reply: bool = True,
+                 fragments: bool = False):
+        self.msg_id = msg_id
+        self.name = name
+        self.handler = handler
+        # 需要完整消息体（分包报文先重组再处理）
+        self.parse = parse
+        # 分包报文不重组，逐包交给处理函数（如多媒体数据直接落盘）
+        self.fragments = fragments
+        # 处理时会写入数据库
+        self.stores = stores
+        # 需要平台应答
+        self.reply = reply
+        # 统计信息
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total_seconds / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max_seconds * 1000
+        }
+
+
+class MessageDispatcher:
+    """消息ID -> 处理函数 注册表"""
+
+    def __init__(self):
+        self._routes: Dict[int, MessageRoute] = {}
+        # 未登记消息ID的报文数
+        self.unhandled = 0
+
+    def register(self, msg_id: int, name: str, handler: Optional[MessageHandler] = None,
+                 parse: bool = True, stores: bool = False, reply: bool = True,
+                 fragments: bool = False) -> MessageRoute:
+        """登记消息处理函数，重复登记时覆盖；handler 为None时只登记属性"""
+        route = MessageRoute(msg_id, name, handler, parse=parse and handler is not None,
+                             stores=stores, reply=reply, fragments=fragments and handler is not None)
+        self._routes[msg_id] = route
+        return route
+
+    def get(self, msg_id: int) -> Optional[MessageRoute]:
+        """
+        查找消息ID的登记，未登记返回None
+        调用方每帧只查一次，再直接读取 parse/fragments/stores/reply 属性
+        """
+        return self._routes.get(msg_id)
+
+    async def dispatch(self, header, data: bytes) -> bool:
+        """分发一条完整报文，返回是否有对应的处理函数"""
+        route = self._routes.get(header.msg_id)
+        if route is None or route.handler is None:
+            self.unhandled += 1
+            return False
+        start = time.perf_counter()
+        try:
+            await route.handler(header, data, header.body_offset)
+        except Exception as e:
+            route.errors += 1
+            logger.error(f"处理消息 0x{route.msg_id:04X}({route.name}) 时出错: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            route.count += 1
+            route.total_seconds += elapsed
+            if elapsed > route.max_seconds:
+                route.max_seconds = elapsed
+        return True
+
+    def get_stats(self) -> Dict:
+        """获取各消息ID的处理统计"""
+        return {
+            "unhandled": self.unhandled,
+            "routes": {f"0x{msg_id:04X}": route.get_stats() for msg_id, route in self._routes.items()}
+        }
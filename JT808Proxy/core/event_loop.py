@@ -0,0 +1,70 @@
+"""
+事件循环引擎选择模块
+启动时按配置选用 uvloop 或标准 asyncio 事件循环，uvloop 未安装时自动退回标准循环
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 可选的事件循环引擎
+LOOP_AUTO = "auto"
+LOOP_UVLOOP = "uvloop"
+LOOP_ASYNCIO = "asyncio"
+LOOP_CHOICES = (LOOP_AUTO, LOOP_UVLOOP, LOOP_ASYNCIO)
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def uvloop_available() -> bool:
+    """uvloop 是否已安装"""
+    return uvloop is not None
+
+
+def resolve_event_loop(engine: str = LOOP_AUTO) -> str:
+    """
+    将配置的引擎解析为实际可用的引擎
+    auto 时优先 uvloop；指定 uvloop 但未安装时记录警告并退回 asyncio
+    """
+    engine = (engine or LOOP_AUTO).lower()
+    if engine not in LOOP_CHOICES:
+        raise ValueError(f"未知的事件循环引擎: {engine}，可选: {', '.join(LOOP_CHOICES)}")
+    if engine == LOOP_ASYNCIO:
+        return LOOP_ASYNCIO
+    if uvloop_available():
+        return LOOP_UVLOOP
+    if engine == LOOP_UVLOOP:
+        logger.warning("未安装 uvloop，退回标准 asyncio 事件循环")
+    return LOOP_ASYNCIO
+
+
+def install_event_loop(engine: str = LOOP_AUTO) -> str:
+    """设置当前进程的事件循环策略，返回实际使用的引擎"""
+    resolved = resolve_event_loop(engine)
+    if resolved == LOOP_UVLOOP:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    else:
+        asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
+    logger.info(f"事件循环引擎: {resolved}")
+    return resolved
+
+
+def run(coro: Awaitable, engine: str = LOOP_AUTO):
+    """按选定的引擎运行协程（替代 asyncio.run）"""
+    install_event_loop(engine)
+    return asyncio.run(coro)
+
+
+def current_event_loop(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    """当前运行中的事件循环引擎名，不在事件循环中时返回 none"""
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return "none"
+    return LOOP_UVLOOP if type(loop).__module__.startswith("uvloop") else LOOP_ASYNCIO
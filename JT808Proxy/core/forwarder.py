@@ -1,14 +1,70 @@
 """
 JT808 报文转发模块
-支持按终端手机号智能转发，支持一对一/多对一转发模式
+支持按终端手机号智能转发，支持一对一/多对一/每终端独立连接转发模式；
+上游平台下发的报文按消息头中的终端手机号回送给对应终端
 """
 
 import asyncio
 import logging
-from typing import Dict, Optional, List
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, List, Set
+from dataclasses import dataclass, field
 from datetime import datetime
 
+try:
+    from .outbound import OutboundQueue, OverflowPolicy
+except ImportError:
+    import importlib.util
+    import os
+    outbound_path = os.path.join(os.path.dirname(__file__), 'outbound.py')
+    spec = importlib.util.spec_from_file_location("outbound", outbound_path)
+    outbound = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(outbound)
+    OutboundQueue = outbound.OutboundQueue
+    OverflowPolicy = outbound.OverflowPolicy
+
+try:
+    from .frame_decoder import JT808FrameDecoder
+except ImportError:
+    import importlib.util
+    import os
+    frame_decoder_path = os.path.join(os.path.dirname(__file__), 'frame_decoder.py')
+    spec = importlib.util.spec_from_file_location("frame_decoder", frame_decoder_path)
+    frame_decoder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_decoder)
+    JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+
+try:
+    from .frame_view import JT808Frame
+except ImportError:
+    import importlib.util
+    import os
+    frame_view_path = os.path.join(os.path.dirname(__file__), 'frame_view.py')
+    spec = importlib.util.spec_from_file_location("frame_view", frame_view_path)
+    frame_view = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_view)
+    JT808Frame = frame_view.JT808Frame
+
+# 上游链路单次读取的字节数
+UPSTREAM_READ_SIZE = 64 * 1024
+
+FORWARDING_MODES = ('one_to_one', 'many_to_one', 'per_terminal')
+
+# 连接数达到上限时，从最久未使用的一端起最多检查的链路数（跳过仍有待发数据的链路）
+EVICT_SCAN_LIMIT = 64
+
+# 连接数达到上限时只关闭空闲超过该时间（秒）的链路：关闭链路会断开其终端，
+# 终端数超过连接数上限时不能让在线终端轮流被断开重连
+LINK_EVICT_IDLE = 60.0
+
+# 终端断开后关闭其上游连接前，等待待发数据写出的最长时间（秒）
+RELEASE_FLUSH_TIMEOUT = 30.0
+
+# 链路建连失败后的重连退避（秒）：每次失败翻倍，直到上限，连接成功后清零
+RECONNECT_BACKOFF_MIN = 1.0
+RECONNECT_BACKOFF_MAX = 60.0
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,30 +77,101 @@ class TargetServer:
     is_active: bool = True
 
 
+@dataclass
+class PendingLink:
+    """正在建立的上游连接：建连任务，以及建连期间到达、连接建立后按序写出的数据"""
+    task: asyncio.Task
+    buffer: List[bytes] = field(default_factory=list)
+    buffered_bytes: int = 0
+
+
 class ForwardingConfig:
     """转发配置"""
     def __init__(self):
-        # 转发模式：'one_to_one' 或 'many_to_one'
+        # 转发模式：'one_to_one'、'many_to_one' 或 'per_terminal'
         self.mode = 'one_to_one'
-        # 默认目标服务器（多对一模式使用）
+        # 默认目标服务器（多对一模式，及每终端独立连接模式下未映射的终端使用）
         self.default_target = TargetServer('127.0.0.1', 7900, 'default_server')
-        # 终端到目标服务器的映射（一对一模式使用）
+        # 终端到目标服务器的映射（一对一模式，及每终端独立连接模式使用）
         self.terminal_mapping: Dict[str, TargetServer] = {}
         # 活跃的目标服务器连接
         self.target_connections: Dict[str, asyncio.StreamWriter] = {}
+        # 每条目标服务器连接的发送队列
+        self.target_queues: Dict[str, OutboundQueue] = {}
 
 
 class Forwarder:
-    """报文转发器"""
+    """
+    报文转发器
+
+    每条上游链路一个发送队列和一个读任务：读任务解码上游下发的报文（注册应答、
+    0x8001 通用应答、0x8103 设置终端参数等），交给 on_downlink(终端手机号, 帧视图)
+    写入终端会话的发送队列，返回是否送达。
+
+    per_terminal 模式下每个终端独占一条上游连接（与标准 JT808 平台按连接保存鉴权状态一致）：
+    连接在终端首次转发时才建立，终端断开时写完待发数据后关闭；链路按最近使用顺序
+    维护，空闲超过 link_idle_timeout 秒的链路由 close_idle_links() 关闭，连接数达到
+    max_links 时先关闭最久未使用、空闲超过 link_evict_idle 秒且没有待发数据的链路，
+    再建立新连接，没有可关闭的链路时暂不转发（由代理本地应答），不断开在线终端。上游平台按连接
+    保存鉴权状态，终端在线时其链路被关闭（LRU关闭、空闲关闭、上游断开等）即失去鉴权，
+    此时回调 on_link_closed(终端手机号)，由服务器断开终端，终端重连后重新注册鉴权。
+
+    建连在后台进行（超时 connect_timeout 秒），转发不等待建连：期间的数据暂存，
+    连接建立后写入发送队列；建连失败时暂存的数据被丢弃，回调 on_pending_dropped(线上字节列表)，
+    由服务器补发这些报文的本地应答。建连失败的链路（按连接键，每终端独立连接模式下
+    各终端互不影响）按指数退避重连，退避期间的转发直接返回失败，失败日志每次退避只记录一次。
+    """
     
-    def __init__(self):
+    def __init__(self, queue_max_bytes: int = 1024 * 1024, overflow_policy: str = 'drop_oldest',
+                 on_downlink: Optional[Callable[[str, JT808Frame], bool]] = None,
+                 max_links: int = 30000, link_idle_timeout: float = 600.0,
+                 connect_timeout: float = 10.0,
+                 on_link_closed: Optional[Callable[[str], None]] = None,
+                 on_pending_dropped: Optional[Callable[[List[bytes]], None]] = None,
+                 link_evict_idle: float = LINK_EVICT_IDLE):
         self.config = ForwardingConfig()
         self._connection_lock = asyncio.Lock()
+        # 上游链路发送队列配置：慢速上游只积压在自己的队列中，不阻塞终端接入
+        self.queue_max_bytes = queue_max_bytes
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        # 上游下行报文回送终端的处理函数，以及每条上游链路的读任务
+        self.on_downlink = on_downlink
+        self._readers: Dict[str, asyncio.Task] = {}
+        # 正在建立的上游连接（连接键 -> 建连任务与暂存数据），并发的首次转发共用同一次建连
+        self._connecting: Dict[str, PendingLink] = {}
+        # 建连超时，以及建连失败的链路（连接键）-> (连续失败次数, 允许重连的单调时钟时间)
+        self.connect_timeout = connect_timeout
+        self._backoff: Dict[str, tuple] = {}
+        self.connect_failures = 0
+        self.pending_dropped = 0
+        self.on_pending_dropped = on_pending_dropped
+        # 下行回送统计（时延为从上游读出到写入终端发送队列，单位秒）
+        self.downlink_frames = 0
+        self.downlink_bytes = 0
+        self.downlink_relayed = 0
+        self.downlink_unknown = 0
+        self.downlink_invalid = 0
+        self.relay_latency_total = 0.0
+        self.relay_latency_max = 0.0
+        # 每终端独立连接模式：连接数上限（文件描述符预算）、空闲关闭时间（秒，0为不关闭），
+        # 链路按最近使用顺序排列（连接键 -> 最近收发时间，单调时钟秒）
+        self.max_links = max_links
+        self.link_idle_timeout = link_idle_timeout
+        self.link_evict_idle = link_evict_idle
+        self._link_lru: "OrderedDict[str, float]" = OrderedDict()
+        self.on_link_closed = on_link_closed
+        self._opening = 0
+        self._closing: Set[asyncio.Task] = set()
+        self.links_opened = 0
+        self.links_released = 0
+        self.links_idle_closed = 0
+        self.links_evicted = 0
+        self.links_rejected = 0
     
     def set_forwarding_mode(self, mode: str):
         """设置转发模式"""
-        if mode not in ['one_to_one', 'many_to_one']:
-            raise ValueError("转发模式必须是 'one_to_one' 或 'many_to_one'")
+        if mode not in FORWARDING_MODES:
+            raise ValueError("转发模式必须是 'one_to_one'、'many_to_one' 或 'per_terminal'")
         self.config.mode = mode
         logger.info(f"转发模式设置为: {mode}")
     
@@ -61,52 +188,346 @@ class Forwarder:
     
     async def get_target_connection(self, terminal_phone: str) -> Optional[asyncio.StreamWriter]:
         """获取目标服务器连接"""
+        queue = await self._get_target_queue(terminal_phone)
+        return queue.writer if queue else None
+    
+    async def _get_target_queue(self, terminal_phone: str) -> Optional[OutboundQueue]:
+        """获取目标服务器连接的发送队列，必要时建立新连接并等待建连完成"""
+        link = self._get_link(terminal_phone)
+        if isinstance(link, PendingLink):
+            # 建连期间到达的调用都等待同一个任务，只建立一条连接；调用方被取消时不中断建连
+            return await asyncio.shield(link.task)
+        return link
+    
+    def _get_link(self, terminal_phone: str):
+        """返回已建立的发送队列，或正在建立的连接（必要时在后台发起建连）；无法转发时返回 None"""
         target = self._get_target_server(terminal_phone)
         if not target:
-            logger.warning(f"未找到终端 {terminal_phone} 的目标服务器")
+            logger.debug("未找到终端 %s 的目标服务器", terminal_phone)
             return None
         
         # 检查是否已有连接
-        conn_key = f"{target.host}:{target.port}"
-        if conn_key in self.config.target_connections:
-            writer = self.config.target_connections[conn_key]
-            if not writer.is_closing():
-                return writer
+        per_terminal = self.config.mode == 'per_terminal'
+        conn_key = self._connection_key(terminal_phone, target)
+        queue = self.config.target_queues.get(conn_key)
+        if queue is not None and not queue.closed and not queue.writer.is_closing():
+            if per_terminal:
+                self._touch_link(conn_key)
+            return queue
+        
+        pending = self._connecting.get(conn_key)
+        if pending is not None:
+            return pending
+        
+        # 链路处于重连退避期间不发起建连
+        backoff = self._backoff.get(conn_key)
+        if backoff is not None and time.monotonic() < backoff[1]:
+            logger.debug("链路 %s 重连退避中，终端 %s 暂不转发", conn_key, terminal_phone)
+            return None
         
-        # 建立新连接
+        # 每终端独立连接模式下先确保不超出连接数预算
+        if per_terminal:
+            if not self._reserve_link():
+                self.links_rejected += 1
+                logger.debug("上游连接数已达上限 %d，终端 %s 暂不转发", self.max_links, terminal_phone)
+                return None
+            self._opening += 1
+        pending = PendingLink(asyncio.create_task(
+            self._open_link(terminal_phone, target, conn_key, per_terminal)))
+        self._connecting[conn_key] = pending
+        return pending
+    
+    async def _open_link(self, terminal_phone: str, target: TargetServer, conn_key: str,
+                         per_terminal: bool) -> Optional[OutboundQueue]:
+        """后台建立到目标服务器的连接及其发送队列、读任务，并写出建连期间暂存的数据"""
+        address = f"{target.host}:{target.port}"
+        error = None
         try:
-            reader, writer = await asyncio.open_connection(target.host, target.port)
-            async with self._connection_lock:
-                self.config.target_connections[conn_key] = writer
-            logger.info(f"建立到目标服务器 {target.name} ({target.host}:{target.port}) 的连接")
-            return writer
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(target.host, target.port), self.connect_timeout)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"连接目标服务器 {target.name} ({target.host}:{target.port}) 失败: {e}")
+            error = e
+        finally:
+            pending = self._connecting.pop(conn_key, None)
+            if per_terminal:
+                self._opening -= 1
+        if error is not None:
+            self._on_connect_failed(target, conn_key, error)
+            if pending is not None and pending.buffer:
+                self.pending_dropped += len(pending.buffer)
+                if self.on_pending_dropped is not None:
+                    self.on_pending_dropped(pending.buffer)
             return None
+        
+        queue = OutboundQueue(writer, name=conn_key, max_bytes=self.queue_max_bytes,
+                              policy=self.overflow_policy, on_close=self._on_queue_closed)
+        self.config.target_connections[conn_key] = writer
+        self.config.target_queues[conn_key] = queue
+        self._readers[conn_key] = asyncio.create_task(self._read_upstream(conn_key, reader, queue))
+        if per_terminal:
+            self._link_lru[conn_key] = time.monotonic()
+            self.links_opened += 1
+        if self._backoff.pop(conn_key, None) is not None and not per_terminal:
+            logger.info(f"目标服务器 {target.name} ({address}) 已恢复连接")
+        if per_terminal:
+            logger.debug("建立终端 %s 到目标服务器 %s 的独立连接", terminal_phone, target.name)
+        else:
+            logger.info(f"建立到目标服务器 {target.name} ({address}) 的连接")
+        if pending is not None:
+            for data in pending.buffer:
+                queue.put(data)
+        return queue
+    
+    def _on_connect_failed(self, target: TargetServer, conn_key: str, error: Exception):
+        """
+        记录建连失败并安排该链路退避重连；同一次退避内的失败（如并发建连）不重复记录错误日志。
+        每终端独立连接的失败只记录调试日志（数量与终端数相当），汇总见 connect_failures
+        """
+        self.connect_failures += 1
+        now = time.monotonic()
+        failures, retry_at = self._backoff.get(conn_key, (0, 0.0))
+        if now < retry_at:
+            logger.debug("连接目标服务器 %s 失败: %s", conn_key, error)
+            return
+        failures += 1
+        delay = min(RECONNECT_BACKOFF_MIN * 2 ** (failures - 1), RECONNECT_BACKOFF_MAX)
+        self._backoff[conn_key] = (failures, now + delay)
+        reason = "连接超时" if isinstance(error, asyncio.TimeoutError) else error
+        if self.config.mode == 'per_terminal':
+            logger.debug("建立链路 %s 失败: %s，连续失败 %d 次，%.0f 秒后重试", conn_key, reason, failures, delay)
+        else:
+            logger.error(f"连接目标服务器 {target.name} ({conn_key}) 失败: {reason}，"
+                         f"连续失败 {failures} 次，{delay:.0f} 秒后重试")
     
     def _get_target_server(self, terminal_phone: str) -> Optional[TargetServer]:
         """根据终端手机号获取目标服务器"""
         if self.config.mode == 'one_to_one':
             return self.config.terminal_mapping.get(terminal_phone)
+        elif self.config.mode == 'per_terminal':
+            return self.config.terminal_mapping.get(terminal_phone) or self.config.default_target
         else:  # many_to_one
             return self.config.default_target
     
-    async def forward_packet(self, terminal_phone: str, data: bytes) -> bool:
-        """转发数据包"""
-        writer = await self.get_target_connection(terminal_phone)
-        if not writer:
-            return False
-        
+    def _connection_key(self, terminal_phone: str, target: TargetServer) -> str:
+        """连接键：共享链路按目标服务器区分，每终端独立连接另带终端手机号"""
+        if self.config.mode == 'per_terminal':
+            return f"{terminal_phone}@{target.host}:{target.port}"
+        return f"{target.host}:{target.port}"
+    
+    def _touch_link(self, conn_key: str):
+        """记录链路最近一次收发，移到最近使用一端"""
+        lru = self._link_lru
+        if conn_key in lru:
+            lru[conn_key] = time.monotonic()
+            lru.move_to_end(conn_key)
+    
+    def _reserve_link(self) -> bool:
+        """
+        连接数达到上限时关闭最久未使用、空闲超过 link_evict_idle 秒且没有待发数据的链路，
+        返回是否可以建立新连接
+        正在建立、以及终端断开后等待写完待发数据的连接同样占用连接数
+        """
+        queues = self.config.target_queues
+        idle_before = time.monotonic() - self.link_evict_idle
+        while len(queues) + self._opening + len(self._closing) >= self.max_links:
+            victim = None
+            for index, (conn_key, last_used) in enumerate(self._link_lru.items()):
+                # 链路按最近使用顺序排列，遇到未空闲的链路即可停止
+                if index >= EVICT_SCAN_LIMIT or last_used > idle_before:
+                    break
+                queue = queues.get(conn_key)
+                if queue is None or not queue.queued_bytes:
+                    victim = conn_key
+                    break
+            if victim is None:
+                return False
+            queue = queues.get(victim)
+            self._link_lru.pop(victim, None)
+            self.links_evicted += 1
+            if queue is not None:
+                logger.debug("上游连接数已达上限，关闭最久未使用的链路: %s", victim)
+                queue.abort()
+        return True
+    
+    def close_idle_links(self, now: Optional[float] = None) -> int:
+        """关闭空闲超时的每终端独立连接（从最久未使用的一端检查），返回关闭数量"""
+        lru = self._link_lru
+        if not lru or self.link_idle_timeout <= 0:
+            return 0
+        now = time.monotonic() if now is None else now
+        deadline = now - self.link_idle_timeout
+        closed = 0
+        while lru:
+            conn_key, last_used = next(iter(lru.items()))
+            if last_used > deadline:
+                break
+            queue = self.config.target_queues.get(conn_key)
+            if queue is not None and queue.queued_bytes:
+                # 仍有待发数据（上游消化慢）的链路不算空闲
+                lru[conn_key] = now
+                lru.move_to_end(conn_key)
+                continue
+            del lru[conn_key]
+            if queue is not None:
+                queue.abort()
+                closed += 1
+        if closed:
+            self.links_idle_closed += closed
+            logger.info(f"关闭 {closed} 条空闲的终端上游连接")
+        return closed
+    
+    def release_terminal(self, terminal_phone: str):
+        """终端断开：每终端独立连接模式下写完待发数据后关闭其上游连接"""
+        if self.config.mode != 'per_terminal':
+            return
+        target = self._get_target_server(terminal_phone)
+        if not target:
+            return
+        conn_key = self._connection_key(terminal_phone, target)
+        self._backoff.pop(conn_key, None)
+        queue = self.config.target_queues.pop(conn_key, None)
+        if queue is None:
+            return
+        # 先解除登记，终端重连时建立新连接；读任务在连接关闭后自行结束
+        self.config.target_connections.pop(conn_key, None)
+        self._link_lru.pop(conn_key, None)
+        self._readers.pop(conn_key, None)
+        self.links_released += 1
+        if queue.queued_bytes:
+            task = asyncio.create_task(self._close_after_flush(queue))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            queue.abort()
+    
+    async def _close_after_flush(self, queue: OutboundQueue):
+        """等待队列写出后关闭连接"""
         try:
-            writer.write(data)
-            await writer.drain()
-            logger.debug(f"成功转发数据包到终端 {terminal_phone}, 数据长度: {len(data)} 字节")
-            return True
+            await queue.flush(RELEASE_FLUSH_TIMEOUT)
         except Exception as e:
-            logger.error(f"转发数据包到终端 {terminal_phone} 失败: {e}")
-            # 移除失效的连接
-            await self._remove_invalid_connection(writer)
+            logger.warning(f"上游连接 {queue.name} 关闭前未能写完待发数据: {e}")
+        finally:
+            queue.abort()
+    
+    async def flush(self, timeout: Optional[float] = None):
+        """等待正在建立的上游连接，以及所有上游发送队列写出"""
+        connecting = [pending.task for pending in self._connecting.values()]
+        if connecting:
+            await asyncio.wait(connecting, timeout=timeout)
+        queues = [queue for queue in self.config.target_queues.values() if not queue.closed]
+        await asyncio.gather(*(queue.flush(timeout) for queue in queues))
+    
+    async def forward_packet(self, terminal_phone: str, data) -> bool:
+        """
+        转发数据包（放入上游链路发送队列，不等待建连和上游消化）
+        data 为线上字节，或帧视图（JT808Frame，取其原始线上字节，确定有目标连接后才复制）；
+        连接正在建立时数据暂存（不超过发送队列上限），连接建立后按序写出
+        """
+        link = self._get_link(terminal_phone)
+        if link is None:
             return False
+
+        data = getattr(data, 'wire', data)
+        if isinstance(link, PendingLink):
+            if link.buffered_bytes + len(data) > self.queue_max_bytes:
+                self.pending_dropped += 1
+                logger.debug("上游连接建立中且暂存数据已满，丢弃终端 %s 的数据包", terminal_phone)
+                return False
+            link.buffer.append(data)
+            link.buffered_bytes += len(data)
+            return True
+
+        queue = link
+        if queue.put(data):
+            logger.debug("成功转发数据包到终端 %s, 数据长度: %d 字节", terminal_phone, len(data))
+            return True
+        logger.debug("转发终端 %s 的数据包失败: 发送队列已满或连接已关闭", terminal_phone)
+        if queue.closed or queue.writer.is_closing():
+            # 移除失效的连接
+            await self._remove_invalid_connection(queue.writer)
+        return False
+    
+    async def _read_upstream(self, conn_key: str, reader: asyncio.StreamReader, queue: OutboundQueue):
+        """上游链路读任务：逐帧解码上游下发的报文，按终端手机号回送"""
+        decoder = JT808FrameDecoder()
+        current_wire = decoder.current_wire
+        try:
+            while True:
+                data = await reader.read(UPSTREAM_READ_SIZE)
+                if not data:
+                    if self.config.mode == 'per_terminal':
+                        logger.debug("目标服务器关闭连接: %s", conn_key)
+                    else:
+                        logger.info(f"目标服务器关闭连接: {conn_key}")
+                    break
+                received = time.perf_counter()
+                self._touch_link(conn_key)
+                for frame in decoder.feed(data):
+                    self._relay_frame(JT808Frame(frame, current_wire), received)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"读取目标服务器 {conn_key} 下行数据出错: {e}")
+        finally:
+            if self._readers.get(conn_key) is asyncio.current_task():
+                del self._readers[conn_key]
+            queue.abort()
+
+    def _relay_frame(self, frame: JT808Frame, received: float):
+        """把一帧上游下行报文交给终端会话"""
+        self.downlink_frames += 1
+        if not frame.is_valid:
+            self.downlink_invalid += 1
+            return
+        self.downlink_bytes += len(frame.data)
+        if self.on_downlink is None or not self.on_downlink(frame.phone, frame):
+            self.downlink_unknown += 1
+            logger.debug("下行报文无法送达终端 %s, 消息ID: 0x%04X", frame.phone, frame.msg_id)
+            return
+        self.downlink_relayed += 1
+        latency = time.perf_counter() - received
+        self.relay_latency_total += latency
+        if latency > self.relay_latency_max:
+            self.relay_latency_max = latency
+    
+    def _on_queue_closed(self, queue: OutboundQueue):
+        """发送队列关闭（写出失败或溢出断开）时移除对应连接，并停止其读任务"""
+        conn_key = queue.name
+        if self.config.target_queues.get(conn_key) is queue:
+            del self.config.target_queues[conn_key]
+            self.config.target_connections.pop(conn_key, None)
+            self._link_lru.pop(conn_key, None)
+            if self.config.mode == 'per_terminal':
+                logger.debug("移除失效连接: %s", conn_key)
+            else:
+                logger.info(f"移除失效连接: {conn_key}")
+            task = self._readers.pop(conn_key, None)
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+            # 每终端独立连接（连接键为 手机号@host:port）关闭即失去上游鉴权，通知断开终端
+            phone, separator, _ = conn_key.partition('@')
+            if separator and self.on_link_closed is not None:
+                self.on_link_closed(phone)
+    
+    def close(self):
+        """关闭所有上游链路（丢弃尚未写出的数据）"""
+        queues = list(self.config.target_queues.values())
+        # 先解除登记，整体关闭时不逐条通知断开终端
+        self.config.target_queues.clear()
+        self.config.target_connections.clear()
+        for queue in queues:
+            queue.abort()
+        for task in list(self._readers.values()):
+            task.cancel()
+        self._readers.clear()
+        for pending in list(self._connecting.values()):
+            pending.task.cancel()
+        self._connecting.clear()
+        self._link_lru.clear()
+        for task in list(self._closing):
+            task.cancel()
     
     async def _remove_invalid_connection(self, writer: asyncio.StreamWriter):
         """移除失效的连接"""
@@ -114,11 +535,17 @@ class Forwarder:
             for conn_key, conn_writer in list(self.config.target_connections.items()):
                 if conn_writer == writer:
                     del self.config.target_connections[conn_key]
+                    self.config.target_queues.pop(conn_key, None)
+                    self._link_lru.pop(conn_key, None)
+                    task = self._readers.pop(conn_key, None)
+                    if task is not None:
+                        task.cancel()
                     logger.info(f"移除失效连接: {conn_key}")
                     break
     
     def get_forwarding_stats(self) -> Dict:
-        """获取转发统计信息"""
+        """获取转发统计信息（每终端独立连接模式下链路众多，只给出汇总）"""
+        per_terminal = self.config.mode == 'per_terminal'
         return {
             "mode": self.config.mode,
             "default_target": {
@@ -128,6 +555,34 @@ class Forwarder:
             },
             "terminal_mappings": len(self.config.terminal_mapping),
             "active_connections": len(self.config.target_connections),
+            "queues": [] if per_terminal else [queue.get_stats() for queue in self.config.target_queues.values()],
+            "links": {
+                "max_links": self.max_links,
+                "idle_timeout": self.link_idle_timeout,
+                "queued_bytes": sum(queue.queued_bytes for queue in self.config.target_queues.values()),
+                "opened": self.links_opened,
+                "released": self.links_released,
+                "idle_closed": self.links_idle_closed,
+                "evicted": self.links_evicted,
+                "rejected": self.links_rejected
+            },
+            "connect": {
+                "timeout": self.connect_timeout,
+                "pending": len(self._connecting),
+                "failures": self.connect_failures,
+                "backoff_links": len(self._backoff),
+                "pending_dropped": self.pending_dropped
+            },
+            "downlink": {
+                "frames": self.downlink_frames,
+                "bytes": self.downlink_bytes,
+                "relayed": self.downlink_relayed,
+                "unknown_terminal": self.downlink_unknown,
+                "invalid": self.downlink_invalid,
+                "avg_latency_us": (self.relay_latency_total / self.downlink_relayed * 1e6
+                                   if self.downlink_relayed else 0.0),
+                "max_latency_us": self.relay_latency_max * 1e6
+            },
             "mappings": [
                 {
                     "terminal": phone,
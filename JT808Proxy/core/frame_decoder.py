@@ -0,0 +1,142 @@
+"""
+JT808 流式帧解码模块
+按 0x7E 标识位切分TCP字节流，完成转义还原与校验码验证
+"""
+
+from typing import Iterator, Union
+
+# 标识位与转义规则：0x7E <-> 0x7D 0x02，0x7D <-> 0x7D 0x01
+FRAME_FLAG = 0x7E
+ESCAPE_FLAG = 0x7D
+
+# 最短帧：消息ID(2) + 消息体属性(2) + 手机号(6) + 流水号(2) + 校验码(1)
+MIN_FRAME_SIZE = 13
+# 单帧还原后的最大长度（消息体最大1023字节，另含头部与校验码）
+MAX_FRAME_SIZE = 1100
+
+
+def xor_checksum(data: Union[bytes, bytearray, memoryview]) -> int:
+    """计算JT808校验码（逐字节异或）"""
+    checksum = 0
+    for b in data:
+        checksum ^= b
+    return checksum
+
+
+def escape_payload(payload: Union[bytes, bytearray, memoryview]) -> bytes:
+    """对消息头+消息体进行转义"""
+    return bytes(payload).replace(b'\x7d', b'\x7d\x01').replace(b'\x7e', b'\x7d\x02')
+
+
+def encode_frame(content: Union[bytes, bytearray, memoryview]) -> bytes:
+    """将未转义的消息头+消息体封装为线上帧（校验码、转义、标识位）"""
+    content = bytes(content)
+    checksum = xor_checksum(content)
+    return b'\x7e' + escape_payload(content + bytes((checksum,))) + b'\x7e'
+
+
+class JT808FrameDecoder:
+    """
+    JT808 增量帧解码器（每个连接一个实例）
+
+    feed() 接收任意切分的字节流，产出完整帧的 memoryview（消息头+消息体，
+    已还原转义、已去掉校验码）。所有帧复用同一个预分配 bytearray，
+    产出的 memoryview 仅在下一次迭代前有效，需要保留时请自行 bytes() 拷贝。
+    current_wire() 返回当前帧的原始线上字节（含标识位与转义），同样只在下一次迭代前可用。
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._pending = bytearray()
+        self._frame = bytearray(max_frame_size)
+        self._frame_view = memoryview(self._frame)
+        # 当前帧在 _pending 中的原始字节区间
+        self._wire_start = 0
+        self._wire_end = 0
+        # 最近产出的帧的校验码（校验时已取得，供重复报文识别等使用）
+        self.checksum = 0
+        # 统计信息
+        self.frames_decoded = 0
+        self.checksum_errors = 0
+        self.invalid_frames = 0
+        self.discarded_bytes = 0
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> Iterator[memoryview]:
+        """写入新收到的数据，逐个产出已解码的完整帧"""
+        pending = self._pending
+        pending += data
+
+        start = pending.find(FRAME_FLAG)
+        if start < 0:
+            # 没有任何标识位，全部视为噪声
+            self.discarded_bytes += len(pending)
+            pending.clear()
+            return
+        self.discarded_bytes += start
+        consumed = start
+        try:
+            while True:
+                end = pending.find(FRAME_FLAG, start + 1)
+                if end < 0:
+                    # 帧尚未接收完整，超长则丢弃
+                    if len(pending) - start > self.max_frame_size * 2:
+                        self.invalid_frames += 1
+                        consumed = len(pending)
+                    break
+                # 结束标识位同时可作为下一帧的起始标识位
+                consumed = end
+                size = end - start - 1
+                if size == 0:
+                    start = end
+                    continue
+                frame = self._unescape(pending, start + 1, end)
+                if frame is not None:
+                    self.frames_decoded += 1
+                    self._wire_start, self._wire_end = start, end + 1
+                    start = end
+                    yield frame
+                else:
+                    start = end
+        finally:
+            del pending[:consumed]
+
+    def _unescape(self, pending: bytearray, start: int, end: int):
+        """还原 [start, end) 区间的转义并校验，成功返回帧视图"""
+        if pending.find(ESCAPE_FLAG, start, end) < 0:
+            raw = pending[start:end]
+        else:
+            raw = pending[start:end].replace(b'\x7d\x02', b'\x7e').replace(b'\x7d\x01', b'\x7d')
+        size = len(raw)
+        if size < MIN_FRAME_SIZE or size > self.max_frame_size:
+            self.invalid_frames += 1
+            return None
+        # 含校验码在内的全部字节异或结果应为0
+        if xor_checksum(raw):
+            self.checksum_errors += 1
+            return None
+        self._frame[:size] = raw
+        self.checksum = raw[-1]
+        return self._frame_view[:size - 1]
+
+    def current_wire(self) -> bytes:
+        """最近产出的帧的原始线上字节（标识位+转义后的内容+标识位）"""
+        return bytes(self._pending[self._wire_start:self._wire_end])
+
+    def reset(self):
+        """清空未完成的缓冲数据"""
+        self._pending.clear()
+
+    @property
+    def buffered_bytes(self) -> int:
+        """当前缓冲中尚未组成完整帧的字节数"""
+        return len(self._pending)
+
+    def get_stats(self) -> dict:
+        """获取解码统计信息"""
+        return {
+            "frames_decoded": self.frames_decoded,
+            "checksum_errors": self.checksum_errors,
+            "invalid_frames": self.invalid_frames,
+            "discarded_bytes": self.discarded_bytes,
+            "buffered_bytes": len(self._pending)
+        }
@@ -0,0 +1,167 @@
+"""
+JT808 帧视图模块
+直接基于解码器产出的 memoryview 访问消息头字段，各字段在首次访问时才解码并缓存，
+只需要消息ID做路由或转发的调用方不必构造手机号字符串等对象
+"""
+
+import struct
+from typing import Callable, Optional
+
+try:
+    from .jt808_parser import (HEADER_SIZE, HEADER_SIZE_2019, SUBPKG_FLAG, VERSION_FLAG,
+                               bcd_to_phone)
+except ImportError:
+    import importlib.util
+    import os
+    jt808_parser_path = os.path.join(os.path.dirname(__file__), 'jt808_parser.py')
+    spec = importlib.util.spec_from_file_location("jt808_parser", jt808_parser_path)
+    jt808_parser = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(jt808_parser)
+    HEADER_SIZE = jt808_parser.HEADER_SIZE
+    HEADER_SIZE_2019 = jt808_parser.HEADER_SIZE_2019
+    SUBPKG_FLAG = jt808_parser.SUBPKG_FLAG
+    VERSION_FLAG = jt808_parser.VERSION_FLAG
+    bcd_to_phone = jt808_parser.bcd_to_phone
+
+try:
+    from .frame_decoder import encode_frame, xor_checksum
+except ImportError:
+    import importlib.util
+    import os
+    frame_decoder_path = os.path.join(os.path.dirname(__file__), 'frame_decoder.py')
+    spec = importlib.util.spec_from_file_location("frame_decoder", frame_decoder_path)
+    frame_decoder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_decoder)
+    encode_frame = frame_decoder.encode_frame
+    xor_checksum = frame_decoder.xor_checksum
+
+_SUBPKG = struct.Struct('>HH')
+_WORD = struct.Struct('>H')
+
+# 未解码标记
+_UNSET = object()
+
+
+class JT808Frame:
+    """
+    JT808 帧视图（消息头+消息体，已还原转义、已去掉校验码）
+
+    与 JT808Header 提供相同的字段（msg_id、body_props、version、phone、msg_seq、
+    pkg_total、pkg_index、header_size、body_offset），可直接交给应答、重组、分发等模块使用。
+    data 通常是解码器复用缓冲区上的 memoryview，仅在解码器下一次迭代前有效；
+    wire_source 返回原始线上字节（如 JT808FrameDecoder.current_wire），用于原样转发；
+    checksum 为解码器校验时取得的校验码（JT808FrameDecoder.checksum），未给出时按需计算。
+    """
+
+    __slots__ = ('data', '_wire_source', '_wire', '_body_props', '_phone', '_pkg', '_checksum')
+
+    def __init__(self, data, wire_source: Optional[Callable[[], bytes]] = None,
+                 checksum: Optional[int] = None):
+        self.data = data
+        self._wire_source = wire_source
+        self._wire = None
+        self._body_props = None
+        self._phone = None
+        self._pkg = _UNSET
+        self._checksum = checksum
+
+    @property
+    def is_valid(self) -> bool:
+        """长度是否足以容纳消息头"""
+        size = len(self.data)
+        return size >= HEADER_SIZE and (size >= HEADER_SIZE_2019 or not self.body_props & VERSION_FLAG)
+
+    @property
+    def msg_id(self) -> int:
+        data = self.data
+        return (data[0] << 8) | data[1]
+
+    @property
+    def body_props(self) -> int:
+        body_props = self._body_props
+        if body_props is None:
+            data = self.data
+            body_props = self._body_props = (data[2] << 8) | data[3]
+        return body_props
+
+    @property
+    def version(self) -> Optional[int]:
+        """协议版本号（2019版），2013版为None"""
+        return self.data[4] if self.body_props & VERSION_FLAG else None
+
+    @property
+    def header_size(self) -> int:
+        """消息头长度（不含分包项）"""
+        return HEADER_SIZE_2019 if self.body_props & VERSION_FLAG else HEADER_SIZE
+
+    @property
+    def phone(self) -> str:
+        phone = self._phone
+        if phone is None:
+            if self.body_props & VERSION_FLAG:
+                phone_bcd = bytes(self.data[5:15])
+            else:
+                phone_bcd = bytes(self.data[4:10])
+            phone = self._phone = bcd_to_phone(phone_bcd)
+        return phone
+
+    @property
+    def msg_seq(self) -> int:
+        return _WORD.unpack_from(self.data, self.header_size - 2)[0]
+
+    def _subpackage(self):
+        pkg = self._pkg
+        if pkg is _UNSET:
+            pkg = None
+            header_size = self.header_size
+            if self.body_props & SUBPKG_FLAG and len(self.data) >= header_size + _SUBPKG.size:
+                pkg = _SUBPKG.unpack_from(self.data, header_size)
+            self._pkg = pkg
+        return pkg
+
+    @property
+    def pkg_total(self) -> Optional[int]:
+        pkg = self._subpackage()
+        return pkg[0] if pkg is not None else None
+
+    @property
+    def pkg_index(self) -> Optional[int]:
+        pkg = self._subpackage()
+        return pkg[1] if pkg is not None else None
+
+    @property
+    def body_offset(self) -> int:
+        """消息体在帧中的偏移（含分包项）"""
+        return self.header_size + (_SUBPKG.size if self._subpackage() is not None else 0)
+
+    @property
+    def body(self):
+        """消息体视图（不拷贝）"""
+        return self.data[self.body_offset:]
+
+    @property
+    def checksum(self) -> int:
+        """校验码（消息头与消息体逐字节异或）"""
+        checksum = self._checksum
+        if checksum is None:
+            checksum = self._checksum = xor_checksum(self.data)
+        return checksum
+
+    @property
+    def wire(self) -> bytes:
+        """原始线上字节（标识位+转义内容+校验码+标识位），没有来源时重新封装"""
+        wire = self._wire
+        if wire is None:
+            wire = self._wire = self._wire_source() if self._wire_source is not None else encode_frame(self.data)
+        return wire
+
+    def to_dict(self) -> dict:
+        return {
+            'msg_id': self.msg_id,
+            'body_props': self.body_props,
+            'phone': self.phone,
+            'msg_seq': self.msg_seq,
+            'pkg_total': self.pkg_total,
+            'pkg_index': self.pkg_index,
+            'version': self.version
+        }
@@ -0,0 +1,75 @@
+"""
+监听套接字交接模块
+平滑重启时旧进程把监听套接字的文件描述符传给新启动的进程，新进程就绪后旧进程再停止接入并排空，
+监听端口始终有进程在 accept，终端无需集中重连
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+from typing import List, Optional
+
+# 环境变量：继承的监听套接字 fd、就绪通知管道 fd
+LISTEN_FD_ENV = "JT808_LISTEN_FD"
+READY_FD_ENV = "JT808_READY_FD"
+
+
+def inherited_socket() -> Optional[socket.socket]:
+    """取得由上一个进程交接过来的监听套接字，没有时返回None"""
+    value = os.environ.pop(LISTEN_FD_ENV, None)
+    if not value:
+        return None
+    sock = socket.socket(fileno=int(value))
+    sock.setblocking(False)
+    return sock
+
+
+def notify_ready():
+    """通知上一个进程：新进程已开始监听"""
+    value = os.environ.pop(READY_FD_ENV, None)
+    if not value:
+        return
+    fd = int(value)
+    try:
+        os.write(fd, b"1")
+    finally:
+        os.close(fd)
+
+
+async def spawn_successor(sock, argv: Optional[List[str]] = None,
+                          timeout: float = 30.0) -> subprocess.Popen:
+    """
+    以相同命令行启动新进程并交接监听套接字，等待其就绪
+    超时或新进程提前退出时终止新进程并抛出 RuntimeError，旧进程可继续服务
+    """
+    listen_fd = sock.fileno()
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ)
+    env[LISTEN_FD_ENV] = str(listen_fd)
+    env[READY_FD_ENV] = str(write_fd)
+    command = [sys.executable] + (argv if argv is not None else sys.argv)
+    process = subprocess.Popen(command, env=env, pass_fds=(listen_fd, write_fd))
+    os.close(write_fd)
+
+    # 新进程写入就绪标记，或退出导致管道关闭（读到空）
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def on_readable():
+        if not future.done():
+            future.set_result(os.read(read_fd, 1))
+
+    loop.add_reader(read_fd, on_readable)
+    try:
+        ready = await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        ready = b""
+    finally:
+        loop.remove_reader(read_fd)
+        os.close(read_fd)
+    if ready != b"1":
+        process.kill()
+        raise RuntimeError(f"新进程未能就绪 (pid: {process.pid}, exitcode: {process.poll()})")
+    return process
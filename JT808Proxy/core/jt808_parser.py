@@ -1,18 +1,216 @@
 """
 JT808 协议头解析模块
+各字段布局预编译为 struct.Struct，直接在 bytes/memoryview 上 unpack_from，不做切片拷贝；
+BCD 码通过 256 项查表转换
 """
-from typing import Optional, Dict, Any
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 import struct
 
+# 消息头（2013版）：消息ID、消息体属性、终端手机号BCD[6]、消息流水号
+_HEADER = struct.Struct('>HH6sH')
+# 消息头（2019版）：消息ID、消息体属性、协议版本号、终端手机号BCD[10]、消息流水号
+_HEADER_2019 = struct.Struct('>HHB10sH')
+# 分包项：分包总数、包序号
+_SUBPKG = struct.Struct('>HH')
+# 位置基本信息：报警标志、状态、纬度、经度、高程、速度、方向、时间BCD[6]
+_LOCATION = struct.Struct('>IIIIHHH6s')
+# 定位数据批量上传：数据项个数、位置数据类型（0正常批量汇报 1盲区补报）
+_BATCH_LOCATION = struct.Struct('>HB')
+# 终端注册：省域ID、市县域ID、制造商ID[5]、终端型号[20]、终端ID[7]、车牌颜色
+_REGISTER = struct.Struct('>HH5s20s7sB')
+# 终端注册（2019版）：制造商ID[11]、终端型号[30]、终端ID[30]
+_REGISTER_2019 = struct.Struct('>HH11s30s30sB')
+
+_BYTE = struct.Struct('>B')
+_WORD = struct.Struct('>H')
+_SHORT = struct.Struct('>h')
+_DWORD = struct.Struct('>I')
+
+# 消息体属性中的分包标志位、版本标识位（2019版）
+SUBPKG_FLAG = 0x2000
+VERSION_FLAG = 0x4000
+
+# 消息头长度（不含分包项）
+HEADER_SIZE = _HEADER.size
+HEADER_SIZE_2019 = _HEADER_2019.size
+# 手机号BCD位数
+PHONE_DIGITS = 12
+PHONE_DIGITS_2019 = 20
+
+# BCD 字节 -> 两位数字字符串（高4位、低4位各一位）
+BCD_TABLE = tuple(f"{b >> 4}{b & 0xF}" for b in range(256))
+
+
+def bcd_to_str(data: bytes) -> str:
+    """BCD 码转数字字符串"""
+    return ''.join([BCD_TABLE[b] for b in data])
+
+
+# 手机号BCD -> 手机号字符串缓存，超过上限后整体清空重建
+PHONE_CACHE_SIZE = 100000
+_phone_cache: Dict[bytes, str] = {}
+
+
+def bcd_to_phone(data: bytes) -> str:
+    """手机号BCD转字符串（去掉前导0，带缓存）"""
+    phone = _phone_cache.get(data)
+    if phone is None:
+        if len(_phone_cache) >= PHONE_CACHE_SIZE:
+            _phone_cache.clear()
+        phone = _phone_cache[data] = bcd_to_str(data).lstrip('0')
+    return phone
+
+
+def bcd_to_time(data: bytes) -> str:
+    """6字节 BCD 时间（YY-MM-DD-hh-mm-ss）转 'YYYY-MM-DD hh:mm:ss'"""
+    t = BCD_TABLE
+    return f"20{t[data[0]]}-{t[data[1]]}-{t[data[2]]} {t[data[3]]}:{t[data[4]]}:{t[data[5]]}"
+
+
+def _scaled(unpacker: struct.Struct, scale: float) -> Callable[[bytes, int, int], Any]:
+    def decode(data: bytes, offset: int, length: int):
+        return unpacker.unpack_from(data, offset)[0] / scale
+    return decode
+
+
+def _plain(unpacker: struct.Struct) -> Callable[[bytes, int, int], Any]:
+    def decode(data: bytes, offset: int, length: int):
+        return unpacker.unpack_from(data, offset)[0]
+    return decode
+
+
+def _overspeed_alarm(data: bytes, offset: int, length: int) -> Dict[str, int]:
+    """超速报警附加信息：位置类型[, 区域或路段ID]"""
+    location_type = data[offset]
+    area_id = _DWORD.unpack_from(data, offset + 1)[0] if location_type and length >= 5 else None
+    return {'location_type': location_type, 'area_id': area_id}
+
+
+def _area_alarm(data: bytes, offset: int, length: int) -> Dict[str, int]:
+    """进出区域/路线报警附加信息：位置类型、区域或路线ID、方向（0进 1出）"""
+    location_type, area_id, direction = struct.unpack_from('>BIB', data, offset)
+    return {'location_type': location_type, 'area_id': area_id, 'direction': direction}
+
+
+def _route_time_alarm(data: bytes, offset: int, length: int) -> Dict[str, int]:
+    """路段行驶时间不足/过长报警附加信息：路段ID、行驶时间（秒）、结果（0不足 1过长）"""
+    route_id, drive_time, result = struct.unpack_from('>IHB', data, offset)
+    return {'route_id': route_id, 'drive_time': drive_time, 'result': result}
+
+
+def _tire_pressure(data: bytes, offset: int, length: int) -> Tuple[int, ...]:
+    """胎压（Pa），每个轮胎一个字节，0xFF 表示无效"""
+    return tuple(data[offset:offset + length])
+
+
+# 位置附加信息项：ID -> (字段名, 最小长度, 解码函数)
+ADDITIONAL_ITEMS: Dict[int, Tuple[str, int, Callable[[bytes, int, int], Any]]] = {
+    0x01: ('mileage', 4, _scaled(_DWORD, 10)),                # 里程，km
+    0x02: ('fuel_consumption', 2, _scaled(_WORD, 10)),        # 油量，L
+    0x03: ('recorder_speed', 2, _scaled(_WORD, 10)),          # 行驶记录功能获取的速度，km/h
+    0x04: ('alarm_event_id', 2, _plain(_WORD)),               # 需要人工确认报警事件的ID
+    0x05: ('tire_pressure', 1, _tire_pressure),               # 胎压
+    0x06: ('carriage_temperature', 2, _plain(_SHORT)),        # 车厢温度，摄氏度
+    0x11: ('overspeed_alarm', 1, _overspeed_alarm),           # 超速报警附加信息
+    0x12: ('area_alarm', 6, _area_alarm),                     # 进出区域/路线报警附加信息
+    0x13: ('route_time_alarm', 7, _route_time_alarm),         # 路段行驶时间不足/过长报警附加信息
+    0x25: ('extended_signal_status', 4, _plain(_DWORD)),      # 扩展车辆信号状态位
+    0x2A: ('io_status', 2, _plain(_WORD)),                    # IO状态位
+    0x2B: ('analog', 4, _plain(_DWORD)),                      # 模拟量，bit0-15 AD0，bit16-31 AD1
+    0x30: ('signal_strength', 1, _plain(_BYTE)),              # 无线通信网络信号强度
+    0x31: ('satellites', 1, _plain(_BYTE)),                   # GNSS定位卫星数
+}
+_ADDITIONAL_BY_NAME = {name: (item_id, size, decode) for item_id, (name, size, decode) in ADDITIONAL_ITEMS.items()}
+
+
+class LocationData(Mapping):
+    """
+    0x0200 位置信息
+
+    位置基本信息在解析时即解码；附加信息项只记录各项的偏移和长度，
+    首次按字段名访问时才解码并缓存，没有被访问的附加信息不产生解码开销。
+    未定义的附加信息项通过 additional_items() 以原始字节取得。
+    """
+
+    __slots__ = ('_fields', '_extra', '_offsets')
+
+    def __init__(self, fields: Dict[str, Any], extra: bytes = b'', offsets: Optional[Dict[int, Tuple[int, int]]] = None):
+        self._fields = fields
+        # 附加信息原始字节（拷贝，不引用解码器的复用缓冲区）
+        self._extra = extra
+        # 附加信息ID -> (在 _extra 中的偏移, 长度)
+        self._offsets = offsets or {}
+
+    def __getitem__(self, key: str) -> Any:
+        fields = self._fields
+        if key in fields:
+            return fields[key]
+        spec = _ADDITIONAL_BY_NAME.get(key)
+        if spec is not None:
+            item_id, size, decode = spec
+            location = self._offsets.get(item_id)
+            if location is not None and location[1] >= size:
+                value = fields[key] = decode(self._extra, location[0], location[1])
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        for item_id, (_, length) in self._offsets.items():
+            spec = ADDITIONAL_ITEMS.get(item_id)
+            if spec is not None and length >= spec[1] and spec[0] not in self._fields:
+                yield spec[0]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    @property
+    def additional_ids(self) -> Tuple[int, ...]:
+        """报文中出现的附加信息ID"""
+        return tuple(self._offsets)
+
+    def additional_items(self) -> Dict[int, bytes]:
+        """全部附加信息项的原始字节"""
+        return {item_id: self._extra[offset:offset + length]
+                for item_id, (offset, length) in self._offsets.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """解码全部字段，返回普通字典"""
+        return dict(self.items())
+
+    def __reduce__(self):
+        # 跨进程传递（如多进程模式下发往存储汇总进程）时转为普通字典
+        return dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"LocationData({self._fields!r}, additional_ids={list(self._offsets)})"
+
+
 class JT808Header:
     """JT808协议头数据结构"""
-    def __init__(self, msg_id: int, body_props: int, phone: str, msg_seq: int, pkg_total: Optional[int]=None, pkg_index: Optional[int]=None):
+
+    __slots__ = ('msg_id', 'body_props', 'phone', 'msg_seq', 'pkg_total', 'pkg_index', 'version', 'body_offset')
+
+    def __init__(self, msg_id: int, body_props: int, phone: str, msg_seq: int, pkg_total: Optional[int]=None, pkg_index: Optional[int]=None,
+                 version: Optional[int]=None, body_offset: Optional[int]=None):
         self.msg_id = msg_id
         self.body_props = body_props
         self.phone = phone
         self.msg_seq = msg_seq
         self.pkg_total = pkg_total
         self.pkg_index = pkg_index
+        # 协议版本号，2013版报文为None
+        self.version = version
+        # 消息体在帧中的偏移（含分包项）
+        if body_offset is None:
+            body_offset = self.header_size + (_SUBPKG.size if pkg_total and pkg_index else 0)
+        self.body_offset = body_offset
+
+    @property
+    def header_size(self) -> int:
+        """消息头长度（不含分包项）"""
+        return HEADER_SIZE if self.version is None else HEADER_SIZE_2019
 
     def to_dict(self) -> Dict:
         return {
@@ -21,7 +219,8 @@ class JT808Header:
             'phone': self.phone,
             'msg_seq': self.msg_seq,
             'pkg_total': self.pkg_total,
-            'pkg_index': self.pkg_index
+            'pkg_index': self.pkg_index,
+            'version': self.version
         }
 
 class JT808Parser:
@@ -30,112 +229,134 @@ class JT808Parser:
     def parse_header(data: bytes) -> Optional[JT808Header]:
         """
         解析JT808协议头，返回JT808Header对象
-        JT808标准头部格式：
+        JT808标准头部格式（2013版）：
         0      1      2      3      4      5      6      7      8      9      10     11     12     13
         |----消息ID----|--消息体属性--|----终端手机号BCD----|--消息流水号--|[分包总数][分包序号]
+        2019版（消息体属性 bit14 版本标识为1）：
+        |----消息ID----|--消息体属性--|-版本号-|--终端手机号BCD[10]--|--消息流水号--|[分包总数][分包序号]
         """
-        if len(data) < 12:
+        if len(data) < HEADER_SIZE:
             return None
-        msg_id = int.from_bytes(data[0:2], 'big')
-        body_props = int.from_bytes(data[2:4], 'big')
-        phone_bcd = data[4:10]
-        phone = ''.join(f"{(b>>4)&0xF}{b&0xF}" for b in phone_bcd).lstrip('0')
-        msg_seq = int.from_bytes(data[10:12], 'big')
-        # 判断是否分包
-        is_subpkg = (body_props & 0x2000) != 0
-        pkg_total = pkg_index = None
-        if is_subpkg and len(data) >= 16:
-            pkg_total = int.from_bytes(data[12:14], 'big')
-            pkg_index = int.from_bytes(data[14:16], 'big')
-        return JT808Header(msg_id, body_props, phone, msg_seq, pkg_total, pkg_index)
+        msg_id, body_props, phone_bcd, msg_seq = _HEADER.unpack_from(data)
+        version = None
+        body_offset = HEADER_SIZE
+        if body_props & (SUBPKG_FLAG | VERSION_FLAG):
+            # 2019版按版本标识重新解析，2013版只多一次按位与
+            if body_props & VERSION_FLAG:
+                if len(data) < HEADER_SIZE_2019:
+                    return None
+                msg_id, body_props, version, phone_bcd, msg_seq = _HEADER_2019.unpack_from(data)
+                body_offset = HEADER_SIZE_2019
+            # 判断是否分包
+            if body_props & SUBPKG_FLAG and len(data) >= body_offset + _SUBPKG.size:
+                pkg_total, pkg_index = _SUBPKG.unpack_from(data, body_offset)
+                return JT808Header(msg_id, body_props, bcd_to_phone(phone_bcd), msg_seq,
+                                   pkg_total, pkg_index, version, body_offset + _SUBPKG.size)
+        return JT808Header(msg_id, body_props, bcd_to_phone(phone_bcd), msg_seq,
+                           None, None, version, body_offset)
 
     @staticmethod
-    def parse_location_data(data: bytes, header_offset: int = 0) -> Optional[Dict[str, Any]]:
+    def parse_location_data(data: bytes, header_offset: int = 0, end: Optional[int] = None) -> Optional[LocationData]:
         """
         解析0x0200定位信息报文
-        定位信息格式（简化版）：
+        定位信息格式：位置基本信息(28字节) + 位置附加信息项列表
         0      1      2      3      4      5      6      7      8      9      10     11     12     13     14     15
         |----报警标志----|----状态----|----纬度----|----经度----|----高程----|----速度----|----方向----|----时间----|
+        纬度、经度为 度*10^6，高程单位米，速度单位 0.1km/h，方向 0-359（正北为0，顺时针）
+        附加信息项：附加信息ID(BYTE) + 附加信息长度(BYTE) + 附加信息
+        end 为位置信息的结束位置，默认到数据末尾
         """
-        if len(data) < header_offset + 28:  # 最小长度检查
+        if end is None:
+            end = len(data)
+        if end < header_offset + _LOCATION.size:  # 最小长度检查
             return None
-        
-        offset = header_offset
-        alarm_flag = int.from_bytes(data[offset:offset+4], 'big')
-        offset += 4
-        status = int.from_bytes(data[offset:offset+4], 'big')
-        offset += 4
-        
-        # 纬度（度*10^6）
-        latitude_raw = int.from_bytes(data[offset:offset+4], 'big')
-        latitude = latitude_raw / 1000000.0
-        offset += 4
-        
-        # 经度（度*10^6）
-        longitude_raw = int.from_bytes(data[offset:offset+4], 'big')
-        longitude = longitude_raw / 1000000.0
-        offset += 4
-        
-        # 高程（米）
-        altitude = int.from_bytes(data[offset:offset+2], 'big')
-        offset += 2
-        
-        # 速度（0.1km/h）
-        speed = int.from_bytes(data[offset:offset+2], 'big')
-        offset += 2
-        
-        # 方向（0-359，正北为0，顺时针）
-        direction = int.from_bytes(data[offset:offset+2], 'big')
-        offset += 2
-        
-        # 时间（BCD码，YY-MM-DD-hh-mm-ss）
-        time_bytes = data[offset:offset+6]
-        time_str = ''.join(f"{b>>4}{b&0xF:02d}" for b in time_bytes)
-        time_str = f"20{time_str[:2]}-{time_str[2:4]}-{time_str[4:6]} {time_str[6:8]}:{time_str[8:10]}:{time_str[10:12]}"
-        
-        return {
+        (alarm_flag, status, latitude_raw, longitude_raw,
+         altitude, speed, direction, time_bcd) = _LOCATION.unpack_from(data, header_offset)
+        fields = {
             'alarm_flag': alarm_flag,
             'status': status,
-            'latitude': latitude,
-            'longitude': longitude,
+            'latitude': latitude_raw / 1000000.0,
+            'longitude': longitude_raw / 1000000.0,
             'altitude': altitude,
             'speed': speed,
             'direction': direction,
-            'time': time_str
+            'time': bcd_to_time(time_bcd),
+            # 状态位 bit0：ACC 开/关
+            'engine_status': status & 0x01
         }
 
+        # 附加信息项只记录偏移，截断的最后一项忽略
+        start = header_offset + _LOCATION.size
+        if start >= end:
+            return LocationData(fields)
+        extra = bytes(data[start:end])
+        offsets = {}
+        pos = 0
+        size = len(extra)
+        while pos + 2 <= size:
+            length = extra[pos + 1]
+            if pos + 2 + length > size:
+                break
+            offsets[extra[pos]] = (pos + 2, length)
+            pos += 2 + length
+        return LocationData(fields, extra, offsets)
+
+    @staticmethod
+    def parse_batch_location_header(data: bytes, header_offset: int = 0) -> Optional[Tuple[int, int]]:
+        """解析0x0704定位数据批量上传的数据项个数和位置数据类型（0正常批量汇报 1盲区补报）"""
+        if len(data) < header_offset + _BATCH_LOCATION.size:
+            return None
+        return _BATCH_LOCATION.unpack_from(data, header_offset)
+
     @staticmethod
-    def parse_terminal_register(data: bytes, header_offset: int = 0) -> Optional[Dict[str, Any]]:
+    def iter_batch_locations(data: bytes, header_offset: int = 0) -> Iterator[LocationData]:
+        """
+        逐项解析0x0704定位数据批量上传
+        消息体格式：数据项个数(WORD) + 位置数据类型(BYTE) + 位置汇报数据项 * N
+        位置汇报数据项：位置汇报数据体长度(WORD) + 0x0200位置信息
+        按顺序产出各数据项的位置信息，无法解析的数据项跳过，数据截断时停止
+        """
+        batch = JT808Parser.parse_batch_location_header(data, header_offset)
+        if batch is None:
+            return
+        count = batch[0]
+        pos = header_offset + _BATCH_LOCATION.size
+        size = len(data)
+        for _ in range(count):
+            if pos + _WORD.size > size:
+                return
+            length = _WORD.unpack_from(data, pos)[0]
+            pos += _WORD.size
+            end = pos + length
+            if end > size:
+                return
+            location = JT808Parser.parse_location_data(data, pos, end)
+            if location is not None:
+                yield location
+            pos = end
+
+    @staticmethod
+    def parse_terminal_register(data: bytes, header_offset: int = 0, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
         解析0x0100终端注册信息报文
         终端注册信息格式（简化版）：
         0      1      2      3      4      5      6      7      8      9      10     11     12     13     14     15
         |----省域ID----|----市县域ID----|----制造商ID----|----终端型号----|----终端ID----|----车牌颜色----|----车牌号码----|
+        2019版（version 非None）制造商ID、终端型号、终端ID分别为11、30、30字节
         """
-        if len(data) < header_offset + 37:  # 最小长度检查
+        layout = _REGISTER if version is None else _REGISTER_2019
+        if len(data) < header_offset + layout.size:  # 最小长度检查
             return None
-        
-        offset = header_offset
-        province_id = int.from_bytes(data[offset:offset+2], 'big')
-        offset += 2
-        city_id = int.from_bytes(data[offset:offset+2], 'big')
-        offset += 2
-        manufacturer_id = int.from_bytes(data[offset:offset+5], 'big')
-        offset += 5
-        terminal_model = data[offset:offset+20].decode('gbk', errors='ignore').rstrip('\x00')
-        offset += 20
-        terminal_id = data[offset:offset+7].decode('ascii', errors='ignore').rstrip('\x00')
-        offset += 7
-        plate_color = data[offset]
-        offset += 1
-        plate_number = data[offset:offset+len(data)-offset].decode('gbk', errors='ignore').rstrip('\x00')
-        
+        (province_id, city_id, manufacturer_id, terminal_model,
+         terminal_id, plate_color) = layout.unpack_from(data, header_offset)
+        plate_number = bytes(data[header_offset + layout.size:])
+
         return {
             'province_id': province_id,
             'city_id': city_id,
-            'manufacturer_id': manufacturer_id,
-            'terminal_model': terminal_model,
-            'terminal_id': terminal_id,
+            'manufacturer_id': int.from_bytes(manufacturer_id, 'big'),
+            'terminal_model': terminal_model.decode('gbk', errors='ignore').rstrip('\x00'),
+            'terminal_id': terminal_id.decode('ascii', errors='ignore').rstrip('\x00'),
             'plate_color': plate_color,
-            'plate_number': plate_number
-        } 
\ No newline at end of file
+            'plate_number': plate_number.decode('gbk', errors='ignore').rstrip('\x00')
+        }
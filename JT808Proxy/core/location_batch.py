@@ -0,0 +1,148 @@
+"""
+定位报文批量解码模块
+回放、重处理、统计分析等离线任务一次性把大量 0x0200 帧的位置基本信息解码为 NumPy 结构化数组，
+字节提取、大端转换、经纬度换算和 BCD 时间转换都以向量运算完成，不为每帧构造字典
+需要安装 numpy，未安装时调用批量接口会抛出 ImportError
+"""
+
+from typing import Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .jt808_parser import HEADER_SIZE, HEADER_SIZE_2019, SUBPKG_FLAG, VERSION_FLAG
+except ImportError:
+    import importlib.util
+    import os
+    jt808_parser_path = os.path.join(os.path.dirname(__file__), 'jt808_parser.py')
+    spec = importlib.util.spec_from_file_location("jt808_parser", jt808_parser_path)
+    jt808_parser = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(jt808_parser)
+    HEADER_SIZE = jt808_parser.HEADER_SIZE
+    HEADER_SIZE_2019 = jt808_parser.HEADER_SIZE_2019
+    SUBPKG_FLAG = jt808_parser.SUBPKG_FLAG
+    VERSION_FLAG = jt808_parser.VERSION_FLAG
+
+# 位置基本信息长度，分包项（总包数+包序号）长度
+LOCATION_BASIC_SIZE = 28
+SUBPKG_SIZE = 4
+# 消息体属性在帧中的偏移；消息流水号位于消息头末尾（分包项之前）的两个字节
+BODY_PROPS_OFFSET = 2
+
+if np is not None:
+    # 位置基本信息的原始（大端）布局
+    _RAW_DTYPE = np.dtype([
+        ('alarm_flag', '>u4'), ('status', '>u4'),
+        ('latitude', '>u4'), ('longitude', '>u4'),
+        ('altitude', '>u2'), ('speed', '>u2'), ('direction', '>u2'),
+        ('time', 'u1', (6,))
+    ])
+    # 解码结果：字段含义与 JT808Parser.parse_location_data 一致，时间为 datetime64[s]，无效时为 NaT
+    LOCATION_DTYPE = np.dtype([
+        ('msg_seq', 'u2'),
+        ('alarm_flag', 'u4'), ('status', 'u4'),
+        ('latitude', 'f8'), ('longitude', 'f8'),
+        ('altitude', 'u2'), ('speed', 'u2'), ('direction', 'u2'),
+        ('time', 'datetime64[s]'),
+        ('valid', '?')
+    ])
+    _BASIC_RANGE = np.arange(LOCATION_BASIC_SIZE)
+    # BCD 字节 -> 两位十进制数值的查找表
+    _BCD_VALUES = np.array([(b >> 4) * 10 + (b & 0x0F) for b in range(256)], dtype=np.int32)
+else:
+    LOCATION_DTYPE = None
+
+
+def numpy_available() -> bool:
+    """numpy 是否已安装"""
+    return np is not None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("批量解码定位报文需要安装 numpy")
+
+
+def _bcd_times(bcd):
+    """(N, 6) 的 BCD 时间字节（YY MM DD hh mm ss）转 datetime64[s]，非法日期为 NaT"""
+    digits = _BCD_VALUES[bcd]
+    year, month, day = 2000 + digits[:, 0], digits[:, 1], digits[:, 2]
+    hour, minute, second = digits[:, 3], digits[:, 4], digits[:, 5]
+    valid = ((month >= 1) & (month <= 12) & (day >= 1)
+             & (hour < 24) & (minute < 60) & (second < 60))
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    # 日期不能超过当月天数（含闰年2月），否则 datetime64 会进位到下个月
+    month_starts = months.astype('datetime64[D]')
+    month_days = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int32)
+    valid &= day <= month_days
+    days = month_starts + np.where(valid, day - 1, 0)
+    times = days.astype('datetime64[s]') + (hour * 3600 + minute * 60 + second)
+    times[~valid] = np.datetime64('NaT')
+    return times
+
+
+def decode_location_buffer(buffer: Union[bytes, bytearray, memoryview], offsets, lengths=None):
+    """
+    从拼接的缓冲区批量解码 0x0200 帧
+    buffer 为多帧（已还原转义的消息头+消息体）首尾相接的字节，offsets 为各帧起始位置，
+    lengths 为各帧长度（缺省时以下一帧起始位置或缓冲区末尾为界）。
+    各帧按消息体属性的版本标识与分包标志分别确定消息头长度，2013/2019 版本可混合。
+    长度不足的帧 valid 为 False，其余字段为0
+    """
+    _require_numpy()
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    count = len(offsets)
+    result = np.zeros(count, dtype=LOCATION_DTYPE)
+    result['time'] = np.datetime64('NaT')
+    if lengths is None:
+        ends = np.append(offsets[1:], len(data))
+    else:
+        ends = offsets + np.asarray(lengths, dtype=np.int64)
+    valid = (offsets >= 0) & (offsets + HEADER_SIZE <= ends) & (ends <= len(data))
+    if not valid.any():
+        return result
+    # 逐帧读取消息体属性，2019 版本消息头为17字节，分包时其后另有4字节分包项
+    props_index = np.where(valid, offsets + BODY_PROPS_OFFSET, 0)
+    body_props = (data[props_index].astype(np.uint16) << 8) | data[props_index + 1]
+    header_ends = offsets + np.where(body_props & VERSION_FLAG, HEADER_SIZE_2019, HEADER_SIZE)
+    starts = header_ends + np.where(body_props & SUBPKG_FLAG, SUBPKG_SIZE, 0)
+    valid &= starts + LOCATION_BASIC_SIZE <= ends
+    if not valid.any():
+        return result
+    # 无效帧改从0取数，保证下标不越界，结果随后清零
+    safe_starts = np.where(valid, starts, 0)
+
+    raw = data[safe_starts[:, None] + _BASIC_RANGE].view(_RAW_DTYPE).reshape(count)
+    seq_index = np.where(valid, header_ends - 2, 0)
+    result['msg_seq'] = (data[seq_index].astype(np.uint16) << 8) | data[seq_index + 1]
+    result['alarm_flag'] = raw['alarm_flag']
+    result['status'] = raw['status']
+    result['latitude'] = raw['latitude'] / 1000000.0
+    result['longitude'] = raw['longitude'] / 1000000.0
+    result['altitude'] = raw['altitude']
+    result['speed'] = raw['speed']
+    result['direction'] = raw['direction']
+    result['time'] = _bcd_times(raw['time'])
+    result['valid'] = valid
+    if not valid.all():
+        invalid = ~valid
+        result[invalid] = np.zeros(1, dtype=LOCATION_DTYPE)
+        result['time'][invalid] = np.datetime64('NaT')
+    return result
+
+
+def decode_locations(frames: Sequence[Union[bytes, bytearray, memoryview]]):
+    """
+    批量解码多个 0x0200 帧（已还原转义的消息头+消息体）为结构化数组
+    各帧拼接为一个缓冲区后一次向量化解码
+    """
+    _require_numpy()
+    lengths = np.fromiter((len(frame) for frame in frames), dtype=np.int64, count=len(frames))
+    offsets = np.zeros(len(frames), dtype=np.int64)
+    if len(frames) > 1:
+        np.cumsum(lengths[:-1], out=offsets[1:])
+    return decode_location_buffer(b''.join(frames), offsets, lengths)
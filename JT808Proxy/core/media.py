@@ -0,0 +1,435 @@
+"""
+JT808 多媒体数据上传模块
+0x0801 多媒体数据按分包逐包写入磁盘文件的对应偏移处，用位图记录到达情况，
+内存占用与媒体文件大小无关；缺包时生成 0x8800 重传列表，收齐后发布多媒体记录。
+文件的打开、写入、截断与改名在单线程执行器中按提交顺序执行，不阻塞事件循环
+"""
+
+import os
+import time
+import struct
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .jt808_parser import JT808Parser
+except ImportError:
+    import importlib.util
+    jt808_parser_path = os.path.join(os.path.dirname(__file__), 'jt808_parser.py')
+    spec = importlib.util.spec_from_file_location("jt808_parser", jt808_parser_path)
+    jt808_parser = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(jt808_parser)
+    JT808Parser = jt808_parser.JT808Parser
+
+try:
+    from .reassembly import CLOSED_HISTORY_SIZE, MAX_RETRANSMIT_IDS
+except ImportError:
+    import importlib.util
+    reassembly_path = os.path.join(os.path.dirname(__file__), 'reassembly.py')
+    spec = importlib.util.spec_from_file_location("reassembly", reassembly_path)
+    reassembly = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(reassembly)
+    CLOSED_HISTORY_SIZE = reassembly.CLOSED_HISTORY_SIZE
+    MAX_RETRANSMIT_IDS = reassembly.MAX_RETRANSMIT_IDS
+
+logger = logging.getLogger(__name__)
+
+MSG_MEDIA_DATA = 0x0801
+MSG_MEDIA_REPLY = 0x8800
+MSG_RETRANSMIT_REQUEST = 0x8003
+
+# 首包消息体开头：多媒体ID(4) + 类型(1) + 格式编码(1) + 事件项编码(1) + 通道ID(1) + 位置基本信息(28)
+_MEDIA_HEADER = struct.Struct('>IBBBB')
+MEDIA_HEADER_SIZE = _MEDIA_HEADER.size + 28
+
+# 多媒体格式编码 -> 文件扩展名
+MEDIA_EXTENSIONS = {0: 'jpg', 1: 'tif', 2: 'mp3', 3: 'wav', 4: 'wmv'}
+
+UploadKey = Tuple[str, int]
+
+
+@dataclass
+class MediaRecord:
+    """接收完成的多媒体文件"""
+    phone: str
+    media_id: int
+    media_type: int
+    media_format: int
+    event_code: int
+    channel_id: int
+    path: str
+    size: int
+    pkg_total: int
+    location: Optional[Dict] = None
+    received_at: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> Dict:
+        return {
+            'terminal_phone': self.phone,
+            'media_id': self.media_id,
+            'media_type': self.media_type,
+            'media_format': self.media_format,
+            'event_code': self.event_code,
+            'channel_id': self.channel_id,
+            'file_path': self.path,
+            'file_size': self.size,
+            'pkg_total': self.pkg_total,
+            'latitude': self.location.get('latitude') if self.location else None,
+            'longitude': self.location.get('longitude') if self.location else None,
+            'received_at': self.received_at.isoformat(sep=' ', timespec='seconds')
+        }
+
+
+@dataclass
+class MediaRetransmit:
+    """
+    平台对多媒体上传的应答
+    已知多媒体ID时为 0x8800（重传包总数为0表示接收完成），首包未到、多媒体ID未知时退回 0x8003 补传分包请求
+    """
+    phone: str
+    first_seq: int
+    missing: List[int]
+    media_id: Optional[int] = None
+
+    @property
+    def msg_id(self) -> int:
+        return MSG_MEDIA_REPLY if self.media_id is not None else MSG_RETRANSMIT_REQUEST
+
+    def to_body(self) -> bytes:
+        ids = self.missing[:MAX_RETRANSMIT_IDS]
+        if self.media_id is not None:
+            return struct.pack(f'>IB{len(ids)}H', self.media_id, len(ids), *ids)
+        return struct.pack(f'>HB{len(ids)}H', self.first_seq, len(ids), *ids)
+
+
+class MediaUpload:
+    """一次进行中的多媒体上传：只保存位图、分包长度和文件句柄，分包数据直接落盘"""
+
+    __slots__ = ('phone', 'first_seq', 'pkg_total', 'path', 'file', 'bitmap', 'received',
+                 'chunk_size', 'last_size', 'pending_last', 'media', 'location',
+                 'created_at', 'updated_at', 'retransmit_count', 'last_request_at')
+
+    def __init__(self, phone: str, first_seq: int, pkg_total: int, path: str, now: float):
+        self.phone = phone
+        self.first_seq = first_seq
+        self.pkg_total = pkg_total
+        self.path = path
+        self.file = None
+        self.bitmap = bytearray((pkg_total + 7) >> 3)
+        self.received = 0
+        # 非末包的消息体长度（终端按固定长度切分），收到任一非末包后确定
+        self.chunk_size: Optional[int] = None
+        self.last_size: Optional[int] = None
+        # 分包长度未确定前先到的末包，最多缓存这一包
+        self.pending_last: Optional[bytes] = None
+        # 首包中的 (多媒体ID, 类型, 格式编码, 事件项编码, 通道ID)
+        self.media: Optional[Tuple[int, int, int, int, int]] = None
+        self.location: Optional[Dict] = None
+        self.created_at = now
+        self.updated_at = now
+        self.retransmit_count = 0
+        self.last_request_at = 0.0
+
+    def has(self, index: int) -> bool:
+        i = index - 1
+        return bool(self.bitmap[i >> 3] & (1 << (i & 7)))
+
+    def mark(self, index: int):
+        i = index - 1
+        self.bitmap[i >> 3] |= 1 << (i & 7)
+        self.received += 1
+
+    @property
+    def is_complete(self) -> bool:
+        return self.received == self.pkg_total
+
+    @property
+    def media_id(self) -> Optional[int]:
+        return self.media[0] if self.media is not None else None
+
+    def missing(self) -> List[int]:
+        """缺失的包序号（从1开始）"""
+        return [i for i in range(1, self.pkg_total + 1) if not self.has(i)]
+
+    def data_offset(self, index: int) -> int:
+        """第 index 包的多媒体数据在文件中的偏移（首包扣除多媒体头）"""
+        if index == 1:
+            return 0
+        return (index - 1) * self.chunk_size - MEDIA_HEADER_SIZE
+
+
+class MediaUploadSink:
+    """
+    多媒体上传接收器
+
+    位图、分包长度等状态在事件循环中更新；文件操作交给单线程执行器，按提交顺序执行，
+    同一上传的打开、写入、放弃或完成不会乱序。分包数据在提交前复制（解码器缓冲区会被复用）。
+    """
+
+    def __init__(self, media_dir: str = 'media',
+                 on_complete: Optional[Callable[[MediaRecord], None]] = None,
+                 max_uploads: int = 1000,
+                 timeout: float = 300.0,
+                 retransmit_interval: float = 15.0,
+                 max_retransmits: int = 3):
+        self.media_dir = media_dir
+        self.on_complete = on_complete
+        self.max_uploads = max_uploads
+        self.timeout = timeout
+        self.retransmit_interval = retransmit_interval
+        self.max_retransmits = max_retransmits
+        # 按创建顺序排列，便于按最旧淘汰
+        self._uploads: "OrderedDict[UploadKey, MediaUpload]" = OrderedDict()
+        self._terminal_keys: Dict[str, Set[UploadKey]] = {}
+        # 最近完成或放弃的上传键，用于忽略迟到的分包
+        self._closed: "OrderedDict[UploadKey, None]" = OrderedDict()
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='media-io')
+        # 统计信息
+        self.fragments_received = 0
+        self.duplicate_fragments = 0
+        self.bytes_written = 0
+        self.files_completed = 0
+        self.aborted = 0
+        self.retransmit_requests = 0
+
+    async def add_fragment(self, header, frame, now: Optional[float] = None) -> Optional[MediaRetransmit]:
+        """
+        加入一个 0x0801 帧（消息头+消息体，已还原转义；不分包的帧视为只有一包）
+        收到末包或收齐时返回需要下发的应答（缺包列表或接收完成），否则返回None
+        """
+        pkg_total = header.pkg_total or 1
+        pkg_index = header.pkg_index or 1
+        if pkg_index > pkg_total:
+            return None
+        now = time.monotonic() if now is None else now
+        self.fragments_received += 1
+        body = frame[header.body_offset:]
+
+        key = self._find_key(header, pkg_total, pkg_index)
+        upload = self._uploads.get(key)
+        if upload is None and key in self._closed:
+            self.duplicate_fragments += 1
+            return None
+        if upload is None:
+            upload = self._open(key, pkg_total, now)
+        elif upload.has(pkg_index):
+            self.duplicate_fragments += 1
+            upload.updated_at = now
+            return None
+        upload.updated_at = now
+
+        writes = self._store(upload, pkg_index, body)
+        if writes is None:
+            self._abort(key, "分包长度不一致")
+            return None
+        # 写入期间可能有同一上传的其他分包（终端重连）或超时检查，先更新位图
+        upload.mark(pkg_index)
+        complete = upload.is_complete
+        if writes:
+            self.bytes_written += sum(len(data) for _, data in writes)
+            try:
+                await self._run(self._write, upload, writes)
+            except (OSError, ValueError) as e:
+                self._abort(key, f"写入失败: {e}")
+                return None
+            if self._uploads.get(key) is not upload:
+                # 写入期间已被放弃
+                return None
+
+        if complete:
+            return await self._complete(key, upload)
+        if pkg_index == pkg_total:
+            # 末包已到但仍有缺包，立即请求重传
+            return self._retransmit(upload, now)
+        return None
+
+    def check_timeouts(self, now: Optional[float] = None) -> List[MediaRetransmit]:
+        """放弃超时的上传，并为停滞的上传生成重传请求"""
+        now = time.monotonic() if now is None else now
+        requests = []
+        for key, upload in list(self._uploads.items()):
+            idle = now - upload.updated_at
+            if idle >= self.timeout:
+                self._abort(key, f"超时，已收 {upload.received}/{upload.pkg_total}")
+                continue
+            if (idle >= self.retransmit_interval
+                    and upload.retransmit_count < self.max_retransmits
+                    and now - upload.last_request_at >= self.retransmit_interval):
+                requests.append(self._retransmit(upload, now))
+        return requests
+
+    def _retransmit(self, upload: MediaUpload, now: float) -> MediaRetransmit:
+        upload.retransmit_count += 1
+        upload.last_request_at = now
+        self.retransmit_requests += 1
+        return MediaRetransmit(upload.phone, upload.first_seq, upload.missing(), upload.media_id)
+
+    def _find_key(self, header, pkg_total: int, pkg_index: int) -> UploadKey:
+        """计算上传键；补传的分包流水号不连续，按缺失包序号匹配已请求重传的上传"""
+        first_seq = (header.msg_seq - pkg_index + 1) & 0xFFFF
+        key = (header.phone, first_seq)
+        if key in self._uploads:
+            return key
+        for other in self._terminal_keys.get(header.phone, ()):
+            upload = self._uploads[other]
+            if upload.pkg_total == pkg_total and upload.retransmit_count and not upload.has(pkg_index):
+                return other
+        return key
+
+    def _open(self, key: UploadKey, pkg_total: int, now: float) -> MediaUpload:
+        """登记新的上传，文件在首次写入时由执行器创建"""
+        while len(self._uploads) >= self.max_uploads:
+            old_key = next(iter(self._uploads))
+            self._abort(old_key, "进行中的上传过多，淘汰最旧上传")
+        phone, first_seq = key
+        upload = MediaUpload(phone, first_seq, pkg_total,
+                             os.path.join(self.media_dir, phone, f"{first_seq}_{int(time.time())}.part"), now)
+        self._uploads[key] = upload
+        self._terminal_keys.setdefault(phone, set()).add(key)
+        return upload
+
+    def _remove(self, key: UploadKey) -> Optional[MediaUpload]:
+        """移除上传并记录为已关闭"""
+        self._closed[key] = None
+        if len(self._closed) > CLOSED_HISTORY_SIZE:
+            self._closed.popitem(last=False)
+        upload = self._uploads.pop(key, None)
+        if upload is None:
+            return None
+        keys = self._terminal_keys.get(upload.phone)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._terminal_keys[upload.phone]
+        return upload
+
+    def _store(self, upload: MediaUpload, index: int, body) -> Optional[List[Tuple[int, bytes]]]:
+        """
+        校验一包数据，返回需要写入文件的 (偏移, 数据) 列表（数据已复制）；
+        分包长度与已知长度不一致时返回None
+        """
+        if index == 1:
+            if len(body) < MEDIA_HEADER_SIZE:
+                return None
+            upload.media = _MEDIA_HEADER.unpack_from(body, 0)
+            location = JT808Parser.parse_location_data(body, _MEDIA_HEADER.size, MEDIA_HEADER_SIZE)
+            upload.location = dict(location) if location else None
+            data = body[MEDIA_HEADER_SIZE:]
+        else:
+            data = body
+
+        writes = []
+        if index < upload.pkg_total:
+            if upload.chunk_size is None:
+                if len(body) < MEDIA_HEADER_SIZE:
+                    return None
+                upload.chunk_size = len(body)
+                # 分包长度确定后，之前缓存的末包落盘
+                if upload.pending_last is not None:
+                    pending, upload.pending_last = upload.pending_last, None
+                    writes.append((upload.data_offset(upload.pkg_total), pending))
+            elif len(body) != upload.chunk_size:
+                return None
+        else:
+            upload.last_size = len(data)
+            if upload.chunk_size is None and upload.pkg_total > 1:
+                upload.pending_last = bytes(data)
+                return writes
+        writes.append((upload.data_offset(index), bytes(data)))
+        return writes
+
+    def _run(self, func, *args) -> "asyncio.Future":
+        """在文件执行器中执行 func(*args)"""
+        return asyncio.get_running_loop().run_in_executor(self._io, func, *args)
+
+    @staticmethod
+    def _write(upload: MediaUpload, writes: List[Tuple[int, bytes]]):
+        """（执行器线程）首次写入时创建文件，按偏移写入各段数据"""
+        if upload.file is None:
+            os.makedirs(os.path.dirname(upload.path), exist_ok=True)
+            upload.file = open(upload.path, 'w+b')
+        for offset, data in writes:
+            upload.file.seek(offset)
+            upload.file.write(data)
+
+    @staticmethod
+    def _finish(upload: MediaUpload, size: int, path: str):
+        """（执行器线程）截断到实际大小、关闭并改为最终文件名"""
+        upload.file.truncate(size)
+        upload.file.close()
+        os.replace(upload.path, path)
+
+    @staticmethod
+    def _discard(upload: MediaUpload):
+        """（执行器线程）关闭并删除未完成的文件"""
+        if upload.file is not None:
+            upload.file.close()
+        try:
+            os.remove(upload.path)
+        except OSError:
+            pass
+
+    async def _complete(self, key: UploadKey, upload: MediaUpload) -> Optional[MediaRetransmit]:
+        self._remove(key)
+        media_id, media_type, media_format, event_code, channel_id = upload.media
+        size = upload.data_offset(upload.pkg_total) + upload.last_size
+        # 同一终端会重复使用多媒体ID，最终文件名带上终端手机号、接收时间与首包流水号
+        received_at = datetime.now()
+        path = os.path.join(os.path.dirname(upload.path),
+                            f"{upload.phone}_{media_id}_{received_at:%Y%m%d%H%M%S}_{upload.first_seq}"
+                            f".{MEDIA_EXTENSIONS.get(media_format, 'bin')}")
+        try:
+            await self._run(self._finish, upload, size, path)
+        except (OSError, ValueError) as e:
+            self.aborted += 1
+            logger.error(f"多媒体文件保存失败 - 终端: {upload.phone}, 多媒体ID: {media_id}, 原因: {e}")
+            self._io.submit(self._discard, upload)
+            return None
+        self.files_completed += 1
+        record = MediaRecord(upload.phone, media_id, media_type, media_format, event_code, channel_id,
+                             path, size, upload.pkg_total, upload.location, received_at)
+        logger.info(f"多媒体接收完成 - 终端: {upload.phone}, 多媒体ID: {media_id}, "
+                    f"大小: {size} 字节, 文件: {path}")
+        if self.on_complete is not None:
+            try:
+                self.on_complete(record)
+            except Exception as e:
+                logger.error(f"发布多媒体记录时出错: {e}")
+        return MediaRetransmit(upload.phone, upload.first_seq, [], media_id)
+
+    def _abort(self, key: UploadKey, reason: str):
+        """放弃上传并删除未完成的文件"""
+        upload = self._remove(key)
+        if upload is None:
+            return
+        self.aborted += 1
+        logger.warning(f"多媒体上传已放弃 - 终端: {upload.phone}, 多媒体ID: {upload.media_id}, 原因: {reason}")
+        # 排在该上传已提交的写入之后执行
+        self._io.submit(self._discard, upload)
+
+    async def flush(self):
+        """等待已提交的文件操作执行完"""
+        await self._run(lambda: None)
+
+    def close(self):
+        """关闭所有进行中的上传（删除未完成的文件），等待文件操作执行完"""
+        for key in list(self._uploads):
+            self._abort(key, "接收器关闭")
+        self._io.shutdown(wait=True)
+
+    def get_stats(self) -> Dict:
+        """获取多媒体上传统计信息"""
+        return {
+            "active_uploads": len(self._uploads),
+            "fragments_received": self.fragments_received,
+            "duplicate_fragments": self.duplicate_fragments,
+            "bytes_written": self.bytes_written,
+            "files_completed": self.files_completed,
+            "aborted": self.aborted,
+            "retransmit_requests": self.retransmit_requests
+        }
@@ -0,0 +1,236 @@
+"""
+出站发送队列模块
+每条连接（终端会话、上游转发链路）一个有界发送队列，由独立的写任务合并批量写出，
+慢速对端只会积压在自己的队列里，不会阻塞产生数据的读循环
+"""
+
+import asyncio
+import logging
+import tempfile
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 单次从溢出文件读回的字节数
+SPILL_READ_SIZE = 64 * 1024
+
+
+class OverflowPolicy(Enum):
+    """队列溢出策略"""
+    DROP_OLDEST = "drop_oldest"  # 丢弃最旧的待发数据
+    DISCONNECT = "disconnect"    # 断开慢速连接
+    SPILL = "spill"              # 溢出到临时文件，稍后按序补发
+
+
+class OutboundQueue:
+    """
+    有界出站队列
+
+    put() 为同步非阻塞调用；写任务在有数据时按需启动，用 writelines
+    一次写出队列中所有待发数据，再 await drain() 等待对端消化。
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, name: str = "",
+                 max_bytes: int = 256 * 1024,
+                 policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 high_watermark: Optional[int] = None,
+                 low_watermark: Optional[int] = None,
+                 spill_max_bytes: int = 16 * 1024 * 1024,
+                 on_close: Optional[Callable[["OutboundQueue"], None]] = None):
+        self.writer = writer
+        self.name = name
+        self.max_bytes = max_bytes
+        self.policy = OverflowPolicy(policy)
+        self.high_watermark = high_watermark if high_watermark is not None else max_bytes * 3 // 4
+        self.low_watermark = low_watermark if low_watermark is not None else max_bytes // 4
+        self.spill_max_bytes = spill_max_bytes
+        self.on_close = on_close
+        self._queue: Deque[bytes] = deque()
+        self._queued_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._above_high = False
+        # 溢出文件（仅 SPILL 策略使用）
+        self._spill = None
+        self._spill_read_pos = 0
+        self._spill_write_pos = 0
+        # 统计信息
+        self.bytes_enqueued = 0
+        self.bytes_written = 0
+        self.batches_written = 0
+        self.items_dropped = 0
+        self.bytes_dropped = 0
+        self.bytes_spilled = 0
+        self.peak_bytes = 0
+        self.high_watermark_events = 0
+        self.low_watermark_events = 0
+        self.overflow_disconnects = 0
+
+    @property
+    def queued_bytes(self) -> int:
+        """内存队列与溢出文件中尚未写出的字节数"""
+        return self._queued_bytes + self._spill_write_pos - self._spill_read_pos
+
+    @property
+    def is_congested(self) -> bool:
+        """是否处于高水位（对端消化不及）"""
+        return self._above_high
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, data: bytes) -> bool:
+        """加入待发数据，返回是否被接受"""
+        if self._closed or self.writer.is_closing():
+            return False
+        size = len(data)
+        self.bytes_enqueued += size
+
+        if self._spill_write_pos > self._spill_read_pos:
+            # 溢出文件中还有数据，后续数据也必须排在其后以保证顺序
+            if not self._spill_data(data):
+                return False
+        elif self._queued_bytes + size > self.max_bytes:
+            if not self._handle_overflow(data):
+                return False
+        else:
+            self._queue.append(data)
+            self._queued_bytes += size
+
+        self._update_watermark()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return True
+
+    def _handle_overflow(self, data: bytes) -> bool:
+        """队列已满时按策略处理"""
+        if self.policy == OverflowPolicy.DISCONNECT:
+            self.overflow_disconnects += 1
+            logger.warning(f"发送队列溢出，断开慢速连接: {self.name} (积压 {self.queued_bytes} 字节)")
+            self.abort()
+            return False
+        if self.policy == OverflowPolicy.SPILL:
+            return self._spill_data(data)
+        # DROP_OLDEST：丢弃最旧的数据直到放得下
+        size = len(data)
+        while self._queue and self._queued_bytes + size > self.max_bytes:
+            dropped = self._queue.popleft()
+            self._queued_bytes -= len(dropped)
+            self.items_dropped += 1
+            self.bytes_dropped += len(dropped)
+        if size > self.max_bytes:
+            self.items_dropped += 1
+            self.bytes_dropped += size
+            return False
+        self._queue.append(data)
+        self._queued_bytes += size
+        return True
+
+    def _spill_data(self, data: bytes) -> bool:
+        """写入溢出文件"""
+        if self._spill_write_pos - self._spill_read_pos + len(data) > self.spill_max_bytes:
+            self.items_dropped += 1
+            self.bytes_dropped += len(data)
+            return False
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="jt808_spill_")
+        self._spill.seek(self._spill_write_pos)
+        self._spill.write(data)
+        self._spill_write_pos += len(data)
+        self.bytes_spilled += len(data)
+        return True
+
+    def _read_spill(self) -> bytes:
+        """从溢出文件按序读回一段数据，读完后重置文件"""
+        self._spill.seek(self._spill_read_pos)
+        chunk = self._spill.read(min(SPILL_READ_SIZE, self._spill_write_pos - self._spill_read_pos))
+        self._spill_read_pos += len(chunk)
+        if self._spill_read_pos >= self._spill_write_pos:
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read_pos = self._spill_write_pos = 0
+        return chunk
+
+    def _update_watermark(self):
+        queued = self.queued_bytes
+        if queued > self.peak_bytes:
+            self.peak_bytes = queued
+        if not self._above_high and queued >= self.high_watermark:
+            self._above_high = True
+            self.high_watermark_events += 1
+            logger.warning(f"发送队列达到高水位: {self.name} (积压 {queued} 字节)")
+        elif self._above_high and queued <= self.low_watermark:
+            self._above_high = False
+            self.low_watermark_events += 1
+            logger.info(f"发送队列回落到低水位: {self.name} (积压 {queued} 字节)")
+
+    async def _run(self):
+        """写任务：批量写出队列中的数据，直到队列为空"""
+        writer = self.writer
+        try:
+            while True:
+                if self._queue:
+                    batch = list(self._queue)
+                    size = self._queued_bytes
+                    self._queue.clear()
+                    self._queued_bytes = 0
+                    writer.writelines(batch)
+                elif self._spill_write_pos > self._spill_read_pos:
+                    chunk = self._read_spill()
+                    size = len(chunk)
+                    writer.write(chunk)
+                else:
+                    break
+                self.bytes_written += size
+                self.batches_written += 1
+                self._update_watermark()
+                await writer.drain()
+        except Exception as e:
+            logger.error(f"发送队列写出失败: {self.name}: {e}")
+            self.abort()
+        finally:
+            self._task = None
+
+    async def flush(self, timeout: Optional[float] = None):
+        """等待队列中的数据全部写出"""
+        task = self._task
+        if task is not None:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def abort(self):
+        """丢弃待发数据并关闭连接"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.clear()
+        self._queued_bytes = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            self._spill_read_pos = self._spill_write_pos = 0
+        if not self.writer.is_closing():
+            self.writer.close()
+        if self.on_close is not None:
+            self.on_close(self)
+
+    def get_stats(self) -> Dict:
+        """获取队列统计信息"""
+        return {
+            "name": self.name,
+            "policy": self.policy.value,
+            "queued_bytes": self.queued_bytes,
+            "peak_bytes": self.peak_bytes,
+            "congested": self._above_high,
+            "bytes_enqueued": self.bytes_enqueued,
+            "bytes_written": self.bytes_written,
+            "batches_written": self.batches_written,
+            "items_dropped": self.items_dropped,
+            "bytes_dropped": self.bytes_dropped,
+            "bytes_spilled": self.bytes_spilled,
+            "high_watermark_events": self.high_watermark_events,
+            "low_watermark_events": self.low_watermark_events,
+            "overflow_disconnects": self.overflow_disconnects
+        }
@@ -0,0 +1,242 @@
+"""
+JT808 分包重组模块
+按 (终端手机号, 消息ID, 首包流水号) 缓存分包，支持乱序到达、内存上限、
+超时淘汰以及 0x8003 补传分包请求
+"""
+
+import time
+import struct
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 消息体属性中的分包标志位
+SUBPKG_FLAG = 0x2000
+# 0x8003 单条补传请求最多携带的包序号个数（重传包总数为 BYTE）
+MAX_RETRANSMIT_IDS = 255
+# 记录最近完成或放弃的重组键个数，用于忽略迟到的分包
+CLOSED_HISTORY_SIZE = 1024
+
+ReassemblyKey = Tuple[str, int, int]
+
+
+@dataclass
+class PendingMessage:
+    """等待重组的分包消息"""
+    phone: str
+    msg_id: int
+    first_seq: int
+    pkg_total: int
+    header_prefix: bytes
+    created_at: float
+    updated_at: float
+    parts: Dict[int, bytes] = field(default_factory=dict)
+    size: int = 0
+    retransmit_count: int = 0
+    last_request_at: float = 0.0
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.parts) == self.pkg_total
+
+    def missing(self) -> List[int]:
+        """缺失的包序号（从1开始）"""
+        return [i for i in range(1, self.pkg_total + 1) if i not in self.parts]
+
+
+@dataclass
+class RetransmitRequest:
+    """0x8003 补传分包请求"""
+    phone: str
+    msg_id: int
+    first_seq: int
+    missing: List[int]
+
+    def to_body(self) -> bytes:
+        """编码为 0x8003 消息体：原始消息流水号 + 重传包总数 + 重传包ID列表"""
+        ids = self.missing[:MAX_RETRANSMIT_IDS]
+        return struct.pack(f'>HB{len(ids)}H', self.first_seq, len(ids), *ids)
+
+
+class SubpackageReassembler:
+    """分包重组器"""
+
+    def __init__(self,
+                 max_bytes_per_terminal: int = 2 * 1024 * 1024,
+                 max_total_bytes: int = 64 * 1024 * 1024,
+                 timeout: float = 120.0,
+                 retransmit_interval: float = 10.0,
+                 max_retransmits: int = 3):
+        self.max_bytes_per_terminal = max_bytes_per_terminal
+        self.max_total_bytes = max_total_bytes
+        self.timeout = timeout
+        self.retransmit_interval = retransmit_interval
+        self.max_retransmits = max_retransmits
+        # 按创建顺序排列，便于按最旧淘汰
+        self._pending: "OrderedDict[ReassemblyKey, PendingMessage]" = OrderedDict()
+        self._terminal_keys: Dict[str, Set[ReassemblyKey]] = {}
+        self._terminal_bytes: Dict[str, int] = {}
+        self._closed: "OrderedDict[ReassemblyKey, None]" = OrderedDict()
+        self.total_bytes = 0
+        # 统计信息
+        self.fragments_received = 0
+        self.messages_completed = 0
+        self.duplicate_fragments = 0
+        self.timeouts = 0
+        self.evictions = 0
+        self.retransmit_requests = 0
+
+    def add_fragment(self, header, frame, now: Optional[float] = None) -> Optional[bytes]:
+        """
+        加入一个分包帧（消息头+消息体，已还原转义）
+        重组完成时返回完整报文：不含分包项的消息头（已清除分包标志）+ 拼接后的消息体，
+        流水号为首包流水号；否则返回None
+        """
+        pkg_total, pkg_index = header.pkg_total, header.pkg_index
+        if not pkg_total or not pkg_index or pkg_index > pkg_total:
+            return None
+        now = time.monotonic() if now is None else now
+        self.fragments_received += 1
+        body = bytes(frame[header.body_offset:])
+
+        key = self._find_key(header)
+        entry = self._pending.get(key)
+        if entry is None and key in self._closed:
+            self.duplicate_fragments += 1
+            return None
+        if entry is None:
+            # 2013版与2019版消息头长度不同，流水号都位于消息头最后两个字节
+            header_size = header.header_size
+            prefix = bytearray(frame[:header_size])
+            body_props = (header.body_props & ~SUBPKG_FLAG) & 0xFC00
+            struct.pack_into('>H', prefix, 2, body_props)
+            struct.pack_into('>H', prefix, header_size - 2, key[2])
+            entry = PendingMessage(header.phone, header.msg_id, key[2], pkg_total,
+                                   bytes(prefix), created_at=now, updated_at=now)
+            self._pending[key] = entry
+            self._terminal_keys.setdefault(header.phone, set()).add(key)
+        elif pkg_index in entry.parts:
+            self.duplicate_fragments += 1
+            entry.updated_at = now
+            return None
+
+        if not self._reserve(key, entry, len(body)):
+            return None
+        entry.parts[pkg_index] = body
+        entry.updated_at = now
+
+        if not entry.is_complete:
+            return None
+        self._close(key)
+        self.messages_completed += 1
+        return entry.header_prefix + b''.join(entry.parts[i] for i in range(1, entry.pkg_total + 1))
+
+    def check_timeouts(self, now: Optional[float] = None) -> List[RetransmitRequest]:
+        """淘汰超时的分包，并为停滞的分包生成 0x8003 补传请求"""
+        now = time.monotonic() if now is None else now
+        requests = []
+        for key, entry in list(self._pending.items()):
+            idle = now - entry.updated_at
+            if idle >= self.timeout:
+                self._close(key)
+                self.timeouts += 1
+                logger.warning(f"分包重组超时 - 终端: {entry.phone}, 消息ID: 0x{entry.msg_id:04X}, "
+                               f"已收 {len(entry.parts)}/{entry.pkg_total}")
+                continue
+            if (idle >= self.retransmit_interval
+                    and entry.retransmit_count < self.max_retransmits
+                    and now - entry.last_request_at >= self.retransmit_interval):
+                entry.retransmit_count += 1
+                entry.last_request_at = now
+                self.retransmit_requests += 1
+                requests.append(RetransmitRequest(entry.phone, entry.msg_id, entry.first_seq, entry.missing()))
+        return requests
+
+    def drop_terminal(self, phone: str):
+        """丢弃某终端所有未完成的分包（如连接断开）"""
+        for key in list(self._terminal_keys.get(phone, ())):
+            self._remove(key)
+
+    def _find_key(self, header) -> ReassemblyKey:
+        """计算重组键；补传的分包若流水号不连续，则按缺失包序号匹配已有消息"""
+        first_seq = (header.msg_seq - header.pkg_index + 1) & 0xFFFF
+        key = (header.phone, header.msg_id, first_seq)
+        if key in self._pending:
+            return key
+        for other in self._terminal_keys.get(header.phone, ()):
+            entry = self._pending[other]
+            if (entry.msg_id == header.msg_id and entry.pkg_total == header.pkg_total
+                    and entry.retransmit_count and header.pkg_index not in entry.parts):
+                return other
+        return key
+
+    def _reserve(self, key: ReassemblyKey, entry: PendingMessage, size: int) -> bool:
+        """为新分包预留内存，超过上限时按最旧淘汰"""
+        phone = entry.phone
+        if entry.size + size > self.max_bytes_per_terminal:
+            # 单条消息已超过终端上限，无法在内存中重组
+            self._close(key)
+            self.evictions += 1
+            logger.warning(f"分包消息超过终端内存上限，已丢弃 - 终端: {phone}, 消息ID: 0x{entry.msg_id:04X}")
+            return False
+        while self._terminal_bytes.get(phone, 0) + size > self.max_bytes_per_terminal:
+            if not self._evict_oldest(lambda k: k[0] == phone and k != key):
+                break
+        while self.total_bytes + size > self.max_total_bytes:
+            if not self._evict_oldest(lambda k: k != key):
+                self._remove(key)
+                self.evictions += 1
+                return False
+        entry.size += size
+        self._terminal_bytes[phone] = self._terminal_bytes.get(phone, 0) + size
+        self.total_bytes += size
+        return True
+
+    def _evict_oldest(self, predicate) -> bool:
+        for key in self._pending:
+            if predicate(key):
+                entry = self._remove(key)
+                self.evictions += 1
+                logger.warning(f"分包缓存已满，淘汰最旧消息 - 终端: {entry.phone}, 消息ID: 0x{entry.msg_id:04X}")
+                return True
+        return False
+
+    def _close(self, key: ReassemblyKey) -> Optional[PendingMessage]:
+        """移除并记录为已关闭，之后到达的同键分包直接忽略"""
+        self._closed[key] = None
+        if len(self._closed) > CLOSED_HISTORY_SIZE:
+            self._closed.popitem(last=False)
+        return self._remove(key)
+
+    def _remove(self, key: ReassemblyKey) -> Optional[PendingMessage]:
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return None
+        keys = self._terminal_keys.get(entry.phone)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._terminal_keys[entry.phone]
+        remaining = self._terminal_bytes.get(entry.phone, 0) - entry.size
+        if remaining > 0:
+            self._terminal_bytes[entry.phone] = remaining
+        else:
+            self._terminal_bytes.pop(entry.phone, None)
+        self.total_bytes -= entry.size
+        return entry
+
+    def get_stats(self) -> Dict:
+        """获取分包重组统计信息"""
+        return {
+            "pending_messages": len(self._pending),
+            "pending_bytes": self.total_bytes,
+            "fragments_received": self.fragments_received,
+            "messages_completed": self.messages_completed,
+            "duplicate_fragments": self.duplicate_fragments,
+            "timeouts": self.timeouts,
+            "evictions": self.evictions,
+            "retransmit_requests": self.retransmit_requests
+        }
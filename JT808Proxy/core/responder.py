@@ -0,0 +1,155 @@
+"""
+JT808 平台应答模块
+基于预计算的消息头模板生成 0x8001 平台通用应答、0x8100 终端注册应答等下行报文
+"""
+
+import struct
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from .frame_decoder import xor_checksum
+except ImportError:
+    import importlib.util
+    import os
+    frame_decoder_path = os.path.join(os.path.dirname(__file__), 'frame_decoder.py')
+    spec = importlib.util.spec_from_file_location("frame_decoder", frame_decoder_path)
+    frame_decoder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_decoder)
+    xor_checksum = frame_decoder.xor_checksum
+
+try:
+    from .builder import JT808Builder, PHONE_CACHE_SIZE
+except ImportError:
+    import importlib.util
+    import os
+    builder_path = os.path.join(os.path.dirname(__file__), 'builder.py')
+    spec = importlib.util.spec_from_file_location("builder", builder_path)
+    builder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(builder)
+    JT808Builder = builder.JT808Builder
+    PHONE_CACHE_SIZE = builder.PHONE_CACHE_SIZE
+
+# 平台下行消息ID
+MSG_PLATFORM_GENERAL_REPLY = 0x8001
+MSG_RETRANSMIT_REQUEST = 0x8003
+MSG_REGISTER_REPLY = 0x8100
+
+# 终端上行消息ID
+MSG_TERMINAL_GENERAL_REPLY = 0x0001
+MSG_HEARTBEAT = 0x0002
+MSG_REGISTER = 0x0100
+
+# 应答结果
+RESULT_SUCCESS = 0
+RESULT_FAILURE = 1
+RESULT_UNSUPPORTED = 3
+
+# 本身就是终端应答、不需要平台再应答的消息
+NO_REPLY_MSG_IDS = frozenset({
+    MSG_TERMINAL_GENERAL_REPLY,  # 终端通用应答
+    0x0104,  # 查询终端参数应答
+    0x0107,  # 查询终端属性应答
+    0x0108,  # 终端升级结果通知
+    0x0201,  # 位置信息查询应答
+    0x0302,  # 提问应答
+    0x0500,  # 车辆控制应答
+    0x0805,  # 摄像头立即拍摄命令应答
+})
+
+_GENERAL_REPLY_BODY = struct.Struct('>HHB')
+_SEQ = struct.Struct('>H')
+
+# 心跳应答模板：消息ID+消息体属性，以及消息体中流水号之后的"应答ID+结果"
+_HEARTBEAT_PREFIX = struct.pack('>HH', MSG_PLATFORM_GENERAL_REPLY, _GENERAL_REPLY_BODY.size)
+_HEARTBEAT_TAIL = struct.pack('>HB', MSG_HEARTBEAT, RESULT_SUCCESS)
+_HEARTBEAT_XOR = xor_checksum(_HEARTBEAT_PREFIX + _HEARTBEAT_TAIL)
+
+
+class JT808Responder:
+    """
+    平台应答生成器
+
+    报文编码由 JT808Builder 完成（消息头模板与手机号BCD按终端缓存），
+    心跳应答另按终端缓存"消息ID+属性+手机号"整段消息头。
+    version 为终端的协议版本号（2019版），为None时按2013版消息头编码。
+    """
+
+    def __init__(self, auth_code_provider: Optional[Callable[[str], str]] = None,
+                 builder: Optional[JT808Builder] = None):
+        # 鉴权码生成方式，默认使用终端手机号
+        self.auth_code_provider = auth_code_provider or (lambda phone: phone)
+        # 平台流水号由编码器统一分配
+        self.builder = builder or JT808Builder()
+        self._heartbeat_heads: Dict[bytes, Tuple[bytes, int]] = {}
+        # 统计信息
+        self.replies_built = 0
+        self.bytes_built = 0
+
+    def next_seq(self) -> int:
+        """平台自身的消息流水号，循环累加"""
+        return self.builder.next_seq()
+
+    def phone_bcd(self, phone: str, version: Optional[int] = None) -> bytes:
+        """终端手机号转BCD（2013版6字节，2019版10字节，带缓存）"""
+        return self.builder.phone_bcd(phone, version)
+
+    def build_message(self, phone: str, msg_id: int, body: bytes = b'', version: Optional[int] = None) -> bytes:
+        """构造完整的下行线上帧（含转义、校验码、标识位）"""
+        frame = self.builder.build(msg_id, phone, body, version=version)
+        self.replies_built += 1
+        self.bytes_built += len(frame)
+        return frame
+
+    def heartbeat_reply(self, phone_bcd: bytes, ack_seq: bytes) -> bytes:
+        """
+        0x0002 终端心跳（2013版）的 0x8001 应答
+        直接使用原始帧中的手机号BCD与流水号字节，"消息ID+属性+手机号"及其异或值按终端缓存
+        """
+        template = self._heartbeat_heads.get(phone_bcd)
+        if template is None:
+            if len(self._heartbeat_heads) >= PHONE_CACHE_SIZE:
+                self._heartbeat_heads.clear()
+            head = _HEARTBEAT_PREFIX + phone_bcd
+            template = (head, _HEARTBEAT_XOR ^ xor_checksum(phone_bcd))
+            self._heartbeat_heads[phone_bcd] = template
+        head, head_xor = template
+        seq = self.builder.next_seq()
+        checksum = head_xor ^ ack_seq[0] ^ ack_seq[1] ^ (seq >> 8) ^ (seq & 0xFF)
+        content = head + _SEQ.pack(seq) + ack_seq + _HEARTBEAT_TAIL + bytes((checksum,))
+        frame = b'\x7e' + content.replace(b'\x7d', b'\x7d\x01').replace(b'\x7e', b'\x7d\x02') + b'\x7e'
+        self.replies_built += 1
+        self.bytes_built += len(frame)
+        return frame
+
+    def general_reply(self, phone: str, ack_seq: int, ack_msg_id: int, result: int = RESULT_SUCCESS,
+                      version: Optional[int] = None) -> bytes:
+        """0x8001 平台通用应答"""
+        return self.build_message(phone, MSG_PLATFORM_GENERAL_REPLY,
+                                  _GENERAL_REPLY_BODY.pack(ack_seq, ack_msg_id, result), version)
+
+    def register_reply(self, phone: str, ack_seq: int, result: int = RESULT_SUCCESS,
+                       auth_code: Optional[str] = None, version: Optional[int] = None) -> bytes:
+        """0x8100 终端注册应答，成功时携带鉴权码"""
+        body = struct.pack('>HB', ack_seq, result)
+        if result == RESULT_SUCCESS:
+            code = auth_code if auth_code is not None else self.auth_code_provider(phone)
+            body += code.encode('gbk')
+        return self.build_message(phone, MSG_REGISTER_REPLY, body, version)
+
+    def reply_for(self, header) -> Optional[bytes]:
+        """根据上行消息头生成对应的平台应答，无需应答时返回None"""
+        msg_id = header.msg_id
+        if msg_id in NO_REPLY_MSG_IDS:
+            return None
+        version = header.version
+        if msg_id == MSG_REGISTER:
+            return self.register_reply(header.phone, header.msg_seq, version=version)
+        return self.general_reply(header.phone, header.msg_seq, msg_id, version=version)
+
+    def get_stats(self) -> Dict:
+        """获取应答统计信息"""
+        return {
+            "replies_built": self.replies_built,
+            "bytes_built": self.bytes_built,
+            "platform_seq": self.builder.seq
+        }
@@ -0,0 +1,146 @@
+"""
+终端会话管理模块
+维护 终端手机号 <-> 连接会话 的双向索引，支持断线重连时新连接接管旧连接
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TerminalSession:
+    """终端会话：一条TCP连接及其绑定的终端手机号"""
+
+    __slots__ = ('client_id', 'writer', 'info', 'phone', 'phone_bcd', 'protocol_version', 'outbound',
+                 'timer_deadline', 'timer_slot', 'frame_bucket', 'seq_window', 'upstream_replies')
+
+    def __init__(self, client_id: str, writer: asyncio.StreamWriter, info: Any = None):
+        self.client_id = client_id
+        self.writer = writer
+        # 连接信息（TCPServer 中为 ConnectionInfo）
+        self.info = info
+        self.phone: Optional[str] = None
+        # 手机号的原始BCD字节，心跳快速路径据此直接比对帧头
+        self.phone_bcd: Optional[bytes] = None
+        # 终端协议版本号（2019版），None 为2013版；绑定手机号时确定，下行报文按此编码
+        self.protocol_version: Optional[int] = None
+        # 出站发送队列（OutboundQueue），未设置时直接写入
+        self.outbound = None
+        # 空闲/心跳超时时间轮调度信息（单调时钟秒）
+        self.timer_deadline = 0.0
+        self.timer_slot: Optional[int] = None
+        # 报文速率令牌桶（AdmissionController.new_frame_bucket），None 表示不限制
+        self.frame_bucket = None
+        # 最近收到的消息流水号窗口（DuplicateFilter 使用）
+        self.seq_window = None
+        # 最近一帧是否已转发到上游平台、平台应答由上游经下行链路回送（代理不再本地应答）
+        self.upstream_replies = False
+
+    @property
+    def is_closing(self) -> bool:
+        return self.writer.is_closing()
+
+    def send(self, data: bytes) -> bool:
+        """向终端写入下行数据（经由发送队列，不等待对端消化）"""
+        if self.outbound is not None:
+            return self.outbound.put(data)
+        if self.writer.is_closing():
+            return False
+        self.writer.write(data)
+        return True
+
+    def close(self):
+        """关闭会话连接，丢弃尚未发出的下行数据"""
+        if self.outbound is not None:
+            self.outbound.abort()
+        elif not self.writer.is_closing():
+            self.writer.close()
+
+
+class SessionRegistry:
+    """会话注册表，按连接ID和终端手机号均为O(1)查找"""
+
+    def __init__(self):
+        self._by_client: Dict[str, TerminalSession] = {}
+        self._by_phone: Dict[str, TerminalSession] = {}
+        # 统计信息
+        self.takeovers = 0
+
+    def register(self, client_id: str, writer: asyncio.StreamWriter, info: Any = None) -> TerminalSession:
+        """新连接建立时注册会话（此时尚未绑定手机号）"""
+        session = TerminalSession(client_id, writer, info)
+        self._by_client[client_id] = session
+        return session
+
+    def bind_phone(self, session: TerminalSession, phone: str) -> Optional[TerminalSession]:
+        """
+        将会话绑定到终端手机号
+        若该手机号已绑定其他连接（终端重连），旧连接被接管并关闭，返回被接管的旧会话
+        """
+        if session.phone == phone:
+            return None
+        if session.phone is not None and self._by_phone.get(session.phone) is session:
+            del self._by_phone[session.phone]
+        session.phone = phone
+
+        previous = self._by_phone.get(phone)
+        self._by_phone[phone] = session
+        if previous is None or previous is session:
+            return None
+
+        # 旧连接被新连接接管
+        previous.phone = None
+        previous.phone_bcd = None
+        self.takeovers += 1
+        logger.info(f"终端 {phone} 重新连接，新连接 {session.client_id} 接管旧连接 {previous.client_id}")
+        previous.close()
+        return previous
+
+    def unregister(self, session: TerminalSession):
+        """连接断开时注销会话"""
+        if self._by_client.get(session.client_id) is session:
+            del self._by_client[session.client_id]
+        phone = session.phone
+        if phone is not None and self._by_phone.get(phone) is session:
+            del self._by_phone[phone]
+
+    def get_by_phone(self, phone: str) -> Optional[TerminalSession]:
+        """按终端手机号查找会话"""
+        return self._by_phone.get(phone)
+
+    def get_by_client(self, client_id: str) -> Optional[TerminalSession]:
+        """按连接ID（ip:port）查找会话"""
+        return self._by_client.get(client_id)
+
+    def get_writer(self, phone: str) -> Optional[asyncio.StreamWriter]:
+        """获取终端的下行写入端"""
+        session = self._by_phone.get(phone)
+        return session.writer if session is not None else None
+
+    def send_to_terminal(self, phone: str, data: bytes) -> bool:
+        """按终端手机号下发数据"""
+        session = self._by_phone.get(phone)
+        if session is None:
+            return False
+        return session.send(data)
+
+    def sessions(self) -> Iterator[TerminalSession]:
+        return iter(self._by_client.values())
+
+    def __len__(self) -> int:
+        return len(self._by_client)
+
+    @property
+    def bound_count(self) -> int:
+        """已绑定手机号的会话数"""
+        return len(self._by_phone)
+
+    def get_stats(self) -> Dict:
+        """获取会话统计信息"""
+        return {
+            "sessions": len(self._by_client),
+            "bound_terminals": len(self._by_phone),
+            "takeovers": self.takeovers
+        }
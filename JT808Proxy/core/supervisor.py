@@ -0,0 +1,349 @@
+"""
+多进程接入模块
+监管进程派生 N 个工作进程，各工作进程以 SO_REUSEPORT 绑定同一端口、运行独立的事件循环；
+存储写入与统计信息经进程间队列汇总到监管进程，由其统一写入 SQLite
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+# 导入TCP服务器
+try:
+    from .tcp_server import TCPServer
+except ImportError:
+    import importlib.util
+    tcp_server_path = os.path.join(os.path.dirname(__file__), 'tcp_server.py')
+    spec = importlib.util.spec_from_file_location("tcp_server", tcp_server_path)
+    tcp_server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tcp_server)
+    TCPServer = tcp_server.TCPServer
+
+# 导入数据库管理器
+try:
+    from ..storage.database import DatabaseManager
+except ImportError:
+    import importlib.util
+    database_path = os.path.join(os.path.dirname(__file__), '../storage/database.py')
+    spec = importlib.util.spec_from_file_location("database", database_path)
+    database = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(database)
+    DatabaseManager = database.DatabaseManager
+
+# 导入日志管理
+try:
+    from ..monitor.log_manager import setup_logging, setup_worker_logging, stop_logging
+except ImportError:
+    import importlib.util
+    log_manager_path = os.path.join(os.path.dirname(__file__), '../monitor/log_manager.py')
+    spec = importlib.util.spec_from_file_location("log_manager", log_manager_path)
+    log_manager = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(log_manager)
+    setup_logging = log_manager.setup_logging
+    setup_worker_logging = log_manager.setup_worker_logging
+    stop_logging = log_manager.stop_logging
+
+# 导入事件循环引擎选择
+try:
+    from . import event_loop
+except ImportError:
+    import importlib.util
+    event_loop_path = os.path.join(os.path.dirname(__file__), 'event_loop.py')
+    spec = importlib.util.spec_from_file_location("event_loop", event_loop_path)
+    event_loop = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(event_loop)
+
+logger = logging.getLogger(__name__)
+
+# 进程间消息类型
+MSG_STORAGE = 'storage'
+MSG_STATS = 'stats'
+
+# 参与汇总求和的工作进程统计字段
+SUMMED_STATS = (
+    'total_connections', 'active_connections',
+    'total_bytes_received', 'total_bytes_sent',
+    'total_packets_received', 'total_packets_sent'
+)
+
+
+class QueuedStorage:
+    """
+    工作进程中的存储代理
+    与 DatabaseManager 的写入接口一致，写操作先在本地缓冲，按批发往监管进程
+    """
+
+    def __init__(self, channel, worker_id: int, batch_size: int = 200, flush_interval: float = 0.1):
+        self.channel = channel
+        self.worker_id = worker_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._locations: List[tuple] = []
+        self._vehicles: List[tuple] = []
+        self._media: List[dict] = []
+        self.batches_sent = 0
+
+    def insert_location_data(self, terminal_phone: str, msg_seq: int, location_data: dict):
+        self._locations.append((terminal_phone, msg_seq, location_data))
+        if len(self._locations) >= self.batch_size:
+            self.flush()
+
+    def insert_location_data_batch(self, records: list):
+        self._locations.extend(records)
+        if len(self._locations) >= self.batch_size:
+            self.flush()
+
+    def insert_or_update_vehicle(self, terminal_phone: str, vehicle_data: dict):
+        self._vehicles.append((terminal_phone, vehicle_data))
+        self.flush()
+
+    def insert_media_record(self, record: dict):
+        self._media.append(record)
+        self.flush()
+
+    def flush(self):
+        """把缓冲的写操作发往监管进程"""
+        if not self._locations and not self._vehicles and not self._media:
+            return
+        payload = {'locations': self._locations, 'vehicles': self._vehicles, 'media': self._media}
+        self._locations, self._vehicles, self._media = [], [], []
+        self.channel.put((MSG_STORAGE, self.worker_id, payload))
+        self.batches_sent += 1
+
+    async def run_flusher(self):
+        """定时刷新，保证低流量时数据也能及时落库"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        self.flush()
+
+
+async def _run_worker(worker_id: int, host: str, port: int, channel, server_kwargs: Dict,
+                      stats_interval: float):
+    """工作进程内的事件循环入口"""
+    storage = QueuedStorage(channel, worker_id)
+    server = TCPServer(host, port, reuse_port=True, db_manager=storage, **server_kwargs)
+    # 收到停止信号时平滑排空，server.start() 在排空完成后返回
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, server.request_shutdown)
+
+    async def report_stats():
+        while True:
+            await asyncio.sleep(stats_interval)
+            channel.put((MSG_STATS, worker_id, _snapshot(server)))
+
+    tasks = [
+        asyncio.create_task(server.start()),
+        asyncio.create_task(storage.run_flusher()),
+        asyncio.create_task(report_stats())
+    ]
+    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in tasks:
+        task.cancel()
+    storage.close()
+    channel.put((MSG_STATS, worker_id, _snapshot(server)))
+    for task in done:
+        if not task.cancelled() and task.exception():
+            raise task.exception()
+
+
+def _snapshot(server) -> Dict[str, Any]:
+    """工作进程统计快照"""
+    stats = server.stats
+    return {
+        'pid': os.getpid(),
+        'total_connections': stats.total_connections,
+        'active_connections': stats.active_connections,
+        'total_bytes_received': stats.total_bytes_received,
+        'total_bytes_sent': stats.total_bytes_sent,
+        'total_packets_received': stats.total_packets_received,
+        'total_packets_sent': stats.total_packets_sent,
+        'timestamp': time.time()
+    }
+
+
+def _worker_main(worker_id: int, host: str, port: int, channel, server_kwargs: Dict,
+                 log_level: int, stats_interval: float, loop_engine: str = event_loop.LOOP_AUTO,
+                 log_queue=None):
+    """工作进程入口"""
+    if log_queue is not None:
+        # 日志发往监管进程统一写文件，避免多个进程同时轮转同一个日志文件
+        setup_worker_logging(log_queue, log_level)
+    else:
+        logging.getLogger().setLevel(log_level)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        event_loop.run(_run_worker(worker_id, host, port, channel, server_kwargs, stats_interval),
+                       loop_engine)
+    except Exception as e:
+        logger.error(f"工作进程 {worker_id} 异常退出: {e}")
+        raise
+
+
+class WorkerSupervisor:
+    """多进程监管器"""
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 16900, workers: Optional[int] = None,
+                 db_path: str = "jt808proxy.db", server_kwargs: Optional[Dict] = None,
+                 log_level: int = logging.INFO, stats_interval: float = 5.0,
+                 loop_engine: str = event_loop.LOOP_AUTO, log_options: Optional[Dict] = None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.db_path = db_path
+        self.server_kwargs = server_kwargs or {}
+        self.log_level = log_level
+        self.stats_interval = stats_interval
+        self.loop_engine = loop_engine
+        # 日志配置（setup_logging 参数），为 None 时不接管日志
+        self.log_options = log_options
+        self._log_queue = None
+        self.worker_stats: Dict[int, Dict[str, Any]] = {}
+        self.storage_batches = 0
+        self.locations_written = 0
+        self.worker_restarts = 0
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._context = multiprocessing.get_context('fork')
+        self._channel = None
+        self._db_manager = None
+        self._stopping = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        """当前平台是否支持 SO_REUSEPORT 多进程监听"""
+        return hasattr(socket, 'SO_REUSEPORT') and 'fork' in multiprocessing.get_all_start_methods()
+
+    def _spawn(self, worker_id: int):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.host, self.port, self._channel, self.server_kwargs,
+                  self.log_level, self.stats_interval, self.loop_engine, self._log_queue),
+            name=f"jt808-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+        logger.info(f"工作进程 {worker_id} 已启动 (pid: {process.pid})")
+
+    def start(self):
+        """派生全部工作进程"""
+        if not self.is_supported():
+            raise RuntimeError("当前平台不支持 SO_REUSEPORT 多进程监听")
+        self._channel = self._context.Queue()
+        if self.log_options is not None:
+            self._log_queue = self._context.Queue()
+            setup_logging(log_queue=self._log_queue, **self.log_options)
+        self._db_manager = DatabaseManager(self.db_path)
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        logger.info(f"多进程模式启动，工作进程数: {self.workers}，监听地址: {self.host}:{self.port}")
+
+    def run(self):
+        """启动工作进程并在当前进程中运行汇总循环，直到收到停止信号"""
+        self.start()
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        signal.signal(signal.SIGINT, lambda *_: self.stop())
+        last_report = time.monotonic()
+        try:
+            while not self._stopping:
+                self.poll(timeout=0.5)
+                self._check_workers()
+                if time.monotonic() - last_report >= 30:
+                    last_report = time.monotonic()
+                    stats = self.get_stats()
+                    logger.info(f"多进程汇总 - 活跃连接: {stats['active_connections']}, "
+                                f"总接收: {stats['total_packets_received']} 包, "
+                                f"已落库定位: {self.locations_written} 条")
+        finally:
+            self.shutdown()
+
+    def poll(self, timeout: float = 0.5) -> int:
+        """处理进程间队列中的消息，返回处理的消息数"""
+        handled = 0
+        try:
+            message = self._channel.get(timeout=timeout)
+            while True:
+                self._handle_message(message)
+                handled += 1
+                message = self._channel.get_nowait()
+        except queue.Empty:
+            pass
+        return handled
+
+    def _handle_message(self, message):
+        kind, worker_id, payload = message
+        if kind == MSG_STORAGE:
+            try:
+                self._db_manager.insert_location_data_batch(payload['locations'])
+                for terminal_phone, vehicle_data in payload['vehicles']:
+                    self._db_manager.insert_or_update_vehicle(terminal_phone, vehicle_data)
+                for record in payload.get('media', ()):
+                    self._db_manager.insert_media_record(record)
+                self.storage_batches += 1
+                self.locations_written += len(payload['locations'])
+            except Exception as e:
+                logger.error(f"汇总写入数据库失败 (工作进程 {worker_id}): {e}")
+        elif kind == MSG_STATS:
+            self.worker_stats[worker_id] = payload
+
+    def _check_workers(self):
+        """重启意外退出的工作进程"""
+        for worker_id, process in list(self._processes.items()):
+            if not process.is_alive() and not self._stopping:
+                logger.warning(f"工作进程 {worker_id} 已退出 (exitcode: {process.exitcode})，重新启动")
+                self.worker_restarts += 1
+                self._spawn(worker_id)
+
+    def stop(self):
+        """请求停止（可在信号处理函数中调用）"""
+        self._stopping = True
+
+    def shutdown(self, timeout: float = 60.0):
+        """通知全部工作进程平滑排空，期间继续处理其发来的存储与统计消息"""
+        self._stopping = True
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(p.is_alive() for p in self._processes.values()):
+            if self._channel is not None:
+                self.poll(timeout=0.2)
+            else:
+                time.sleep(0.2)
+        for process in self._processes.values():
+            if process.is_alive():
+                process.kill()
+            process.join()
+        if self._channel is not None:
+            self.poll(timeout=0.1)
+        if self._db_manager is not None:
+            self._db_manager.close()
+            self._db_manager = None
+        logger.info("多进程模式已停止")
+        if self._log_queue is not None:
+            stop_logging()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """汇总所有工作进程的统计信息"""
+        totals = {key: 0 for key in SUMMED_STATS}
+        for snapshot in self.worker_stats.values():
+            for key in SUMMED_STATS:
+                totals[key] += snapshot.get(key, 0)
+        totals.update({
+            'workers': self.workers,
+            'alive_workers': sum(1 for p in self._processes.values() if p.is_alive()),
+            'worker_restarts': self.worker_restarts,
+            'storage_batches': self.storage_batches,
+            'locations_written': self.locations_written,
+            'per_worker': dict(self.worker_stats)
+        })
+        return totals
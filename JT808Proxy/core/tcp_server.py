@@ -5,8 +5,11 @@ TCP Server 增强实现
 
 import asyncio
 import logging
+import os
+import signal
 import time
-from typing import Dict, Optional, List
+from typing import Any, Callable, Deque, Dict, Optional, List
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -23,9 +26,107 @@ except ImportError:
     spec.loader.exec_module(jt808_parser)
     JT808Parser = jt808_parser.JT808Parser
 
+# 导入流式帧解码器
+try:
+    from .frame_decoder import JT808FrameDecoder
+except ImportError:
+    import importlib.util
+    import os
+    frame_decoder_path = os.path.join(os.path.dirname(__file__), 'frame_decoder.py')
+    spec = importlib.util.spec_from_file_location("frame_decoder", frame_decoder_path)
+    frame_decoder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_decoder)
+    JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+
+# 导入帧视图
+try:
+    from .frame_view import JT808Frame
+except ImportError:
+    import importlib.util
+    import os
+    frame_view_path = os.path.join(os.path.dirname(__file__), 'frame_view.py')
+    spec = importlib.util.spec_from_file_location("frame_view", frame_view_path)
+    frame_view = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frame_view)
+    JT808Frame = frame_view.JT808Frame
+
+# 导入分包重组器
+try:
+    from .reassembly import SubpackageReassembler
+except ImportError:
+    import importlib.util
+    import os
+    reassembly_path = os.path.join(os.path.dirname(__file__), 'reassembly.py')
+    spec = importlib.util.spec_from_file_location("reassembly", reassembly_path)
+    reassembly = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(reassembly)
+    SubpackageReassembler = reassembly.SubpackageReassembler
+
+# 导入多媒体上传接收器
+try:
+    from .media import MediaUploadSink
+except ImportError:
+    import importlib.util
+    import os
+    media_path = os.path.join(os.path.dirname(__file__), 'media.py')
+    spec = importlib.util.spec_from_file_location("media", media_path)
+    media = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(media)
+    MediaUploadSink = media.MediaUploadSink
+
+# 导入平台应答生成器
+try:
+    from .responder import JT808Responder
+except ImportError:
+    import importlib.util
+    import os
+    responder_path = os.path.join(os.path.dirname(__file__), 'responder.py')
+    spec = importlib.util.spec_from_file_location("responder", responder_path)
+    responder = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(responder)
+    JT808Responder = responder.JT808Responder
+
+# 导入终端会话注册表
+try:
+    from .session import SessionRegistry, TerminalSession
+except ImportError:
+    import importlib.util
+    import os
+    session_path = os.path.join(os.path.dirname(__file__), 'session.py')
+    spec = importlib.util.spec_from_file_location("session", session_path)
+    session_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(session_module)
+    SessionRegistry = session_module.SessionRegistry
+    TerminalSession = session_module.TerminalSession
+
+# 导入出站发送队列
+try:
+    from .outbound import OutboundQueue, OverflowPolicy
+except ImportError:
+    import importlib.util
+    import os
+    outbound_path = os.path.join(os.path.dirname(__file__), 'outbound.py')
+    spec = importlib.util.spec_from_file_location("outbound", outbound_path)
+    outbound = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(outbound)
+    OutboundQueue = outbound.OutboundQueue
+    OverflowPolicy = outbound.OverflowPolicy
+
+# 导入超时时间轮
+try:
+    from .timer_wheel import TimerWheel
+except ImportError:
+    import importlib.util
+    import os
+    timer_wheel_path = os.path.join(os.path.dirname(__file__), 'timer_wheel.py')
+    spec = importlib.util.spec_from_file_location("timer_wheel", timer_wheel_path)
+    timer_wheel = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(timer_wheel)
+    TimerWheel = timer_wheel.TimerWheel
+
 # 导入转发器
 try:
-    from .forwarder import Forwarder
+    from .forwarder import FORWARDING_MODES, Forwarder
 except ImportError:
     import importlib.util
     import os
@@ -33,6 +134,7 @@ except ImportError:
     spec = importlib.util.spec_from_file_location("forwarder", forwarder_path)
     forwarder = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(forwarder)
+    FORWARDING_MODES = forwarder.FORWARDING_MODES
     Forwarder = forwarder.Forwarder
 
 # 导入数据库管理器
@@ -60,17 +162,183 @@ except ImportError:
     MonitorManager = monitor.MonitorManager
     TrafficMetrics = monitor.TrafficMetrics
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('jt808proxy.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# 导入连接准入控制
+try:
+    from .admission import AdmissionController
+except ImportError:
+    import importlib.util
+    import os
+    admission_path = os.path.join(os.path.dirname(__file__), 'admission.py')
+    spec = importlib.util.spec_from_file_location("admission", admission_path)
+    admission = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(admission)
+    AdmissionController = admission.AdmissionController
+
+# 导入重复报文抑制
+try:
+    from .dedup import DuplicateFilter, DuplicateMode
+except ImportError:
+    import importlib.util
+    import os
+    dedup_path = os.path.join(os.path.dirname(__file__), 'dedup.py')
+    spec = importlib.util.spec_from_file_location("dedup", dedup_path)
+    dedup = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dedup)
+    DuplicateFilter = dedup.DuplicateFilter
+    DuplicateMode = dedup.DuplicateMode
+
+# 导入报文分发注册表
+try:
+    from .dispatch import MessageDispatcher
+except ImportError:
+    import importlib.util
+    import os
+    dispatch_path = os.path.join(os.path.dirname(__file__), 'dispatch.py')
+    spec = importlib.util.spec_from_file_location("dispatch", dispatch_path)
+    dispatch = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dispatch)
+    MessageDispatcher = dispatch.MessageDispatcher
+
+# 导入监听套接字交接
+try:
+    from .handoff import inherited_socket, notify_ready, spawn_successor
+except ImportError:
+    import importlib.util
+    import os
+    handoff_path = os.path.join(os.path.dirname(__file__), 'handoff.py')
+    spec = importlib.util.spec_from_file_location("handoff", handoff_path)
+    handoff = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(handoff)
+    inherited_socket = handoff.inherited_socket
+    notify_ready = handoff.notify_ready
+    spawn_successor = handoff.spawn_successor
+
+# 导入事件循环引擎选择
+try:
+    from . import event_loop
+except ImportError:
+    import importlib.util
+    import os
+    event_loop_path = os.path.join(os.path.dirname(__file__), 'event_loop.py')
+    spec = importlib.util.spec_from_file_location("event_loop", event_loop_path)
+    event_loop = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(event_loop)
+
+# 导入日志管理（队列异步写出）
+try:
+    from ..monitor.log_manager import LogSampler, setup_logging, stop_logging
+except ImportError:
+    import importlib.util
+    import os
+    log_manager_path = os.path.join(os.path.dirname(__file__), '../monitor/log_manager.py')
+    spec = importlib.util.spec_from_file_location("log_manager", log_manager_path)
+    log_manager = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(log_manager)
+    LogSampler = log_manager.LogSampler
+    setup_logging = log_manager.setup_logging
+    stop_logging = log_manager.stop_logging
+
 logger = logging.getLogger(__name__)
 
+# 排空时分批关闭会话的间隔（秒）
+DRAIN_CLOSE_INTERVAL = 0.5
+
+# 终端心跳（0x0002）：消息ID+消息体属性（无消息体、不分包），整帧只有12字节消息头
+HEARTBEAT_PREFIX = b'\x00\x02\x00\x00'
+HEARTBEAT_FRAME_SIZE = 12
+
+
+def _config_bool(value: str) -> bool:
+    value = str(value).lower()
+    if value in ('true', '1'):
+        return True
+    if value in ('false', '0'):
+        return False
+    raise ValueError(f"无效的布尔值: {value}")
+
+
+def _config_enum(enum_type: type) -> Callable[[str], str]:
+    """枚举取值转换：不在枚举中的取值抛出 ValueError"""
+    return lambda value: enum_type(value).value
+
+
+def _config_choice(choices) -> Callable[[str], str]:
+    """可选取值转换：不在 choices 中的取值抛出 ValueError"""
+    def convert(value: str) -> str:
+        if value not in choices:
+            raise ValueError(f"取值必须是 {', '.join(choices)} 之一")
+        return value
+    return convert
+
+
+def _config_address(value: str) -> str:
+    """服务器地址 host:port"""
+    host, _, port = value.strip().rpartition(':')
+    if not host or not 0 < int(port) < 65536:
+        raise ValueError(f"地址格式应为 host:port: {value}")
+    return f"{host}:{int(port)}"
+
+
+# 系统配置键（管理界面保存在数据库 system_configs 表中）-> (TCPServer 构造参数, 取值转换)
+SERVER_CONFIG_KEYS = {
+    'tcp_max_connections': ('max_connections', int),
+    'tcp_max_connections_per_ip': ('max_connections_per_ip', int),
+    'tcp_accept_rate': ('accept_rate', float),
+    'tcp_accept_burst': ('accept_burst', float),
+    'tcp_frame_rate': ('frame_rate', float),
+    'tcp_frame_burst': ('frame_burst', float),
+    'tcp_forward_heartbeats': ('forward_heartbeats', _config_bool),
+    'tcp_dedup_mode': ('dedup_mode', _config_enum(DuplicateMode)),
+    'tcp_dedup_window': ('dedup_window', int),
+    'tcp_outbound_max_bytes': ('outbound_max_bytes', int),
+    'tcp_outbound_policy': ('outbound_policy', _config_enum(OverflowPolicy)),
+    'tcp_media_dir': ('media_dir', str),
+    'log_sample_rate': ('log_sample_rate', int),
+    'forward_enabled': ('forward_enabled', _config_bool),
+    'forward_timeout': ('forward_connect_timeout', float),
+    'forward_target_server': ('forward_target', _config_address),
+    'forward_queue_max_bytes': ('forward_queue_max_bytes', int),
+    'forward_overflow_policy': ('forward_overflow_policy', _config_enum(OverflowPolicy)),
+    'forward_mode': ('forward_mode', _config_choice(FORWARDING_MODES)),
+    'forward_max_links': ('forward_max_links', int),
+    'forward_link_idle_timeout': ('forward_link_idle_timeout', float),
+    'forward_upstream_replies': ('forward_upstream_replies', _config_bool),
+}
+
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# 日志相关系统配置键 -> (setup_logging 参数, 取值转换)
+LOG_CONFIG_KEYS = {
+    'log_level': ('level', lambda value: _config_choice(LOG_LEVELS)(value.upper())),
+    'log_file_path': ('log_file', str),
+    'log_max_size': ('max_size_mb', int),
+    'log_retention_days': ('retention_days', int),
+}
+
+
+def load_system_config(db_manager) -> Dict[str, str]:
+    """读取数据库中保存的系统配置（键 -> 字符串值），读取失败时返回空字典"""
+    try:
+        return {row['key']: row['value'] for row in db_manager.get_all_configs()}
+    except Exception as e:
+        logger.error(f"读取系统配置失败，使用默认配置: {e}")
+        return {}
+
+
+def options_from_config(configs: Dict[str, str], keys: Dict = SERVER_CONFIG_KEYS) -> Dict[str, Any]:
+    """系统配置转为构造参数（默认 TCPServer，传入 LOG_CONFIG_KEYS 时为 setup_logging），
+    未配置或取值无效（无法转换、不在可选取值中、地址格式错误等）的项记录警告，不出现在结果中，沿用默认值"""
+    options = {}
+    for key, (name, convert) in keys.items():
+        value = configs.get(key)
+        if value is None or value == '':
+            continue
+        try:
+            options[name] = convert(value)
+        except (TypeError, ValueError):
+            logger.warning(f"系统配置 {key}={value!r} 无效，使用默认值")
+    return options
+
 
 class ConnectionStatus(Enum):
     """连接状态枚举"""
@@ -79,20 +347,40 @@ class ConnectionStatus(Enum):
     ERROR = "error"
 
 
-@dataclass
 class ConnectionInfo:
-    """连接信息"""
-    remote_addr: str
-    remote_port: int
-    connect_time: datetime
-    last_activity: datetime
-    status: ConnectionStatus = ConnectionStatus.CONNECTED
-    bytes_received: int = 0
-    bytes_sent: int = 0
-    packets_received: int = 0
-    packets_sent: int = 0
-    disconnect_reason: Optional[str] = None
-    
+    """
+    连接信息
+    时间均为单调时钟秒（time.monotonic()），每个报文只做整数/浮点赋值，
+    需要展示时再通过 connect_time / last_activity 换算为 datetime
+    """
+
+    __slots__ = ('remote_addr', 'remote_port', 'connect_mono', 'last_activity_mono', 'status',
+                 'bytes_received', 'bytes_sent', 'packets_received', 'packets_sent',
+                 'disconnect_reason', 'terminal_phone')
+
+    def __init__(self, remote_addr: str, remote_port: int, now: Optional[float] = None):
+        if now is None:
+            now = time.monotonic()
+        self.remote_addr = remote_addr
+        self.remote_port = remote_port
+        self.connect_mono = now
+        self.last_activity_mono = now
+        self.status = ConnectionStatus.CONNECTED
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.packets_received = 0
+        self.packets_sent = 0
+        self.disconnect_reason: Optional[str] = None
+        self.terminal_phone: Optional[str] = None
+
+    @property
+    def connect_time(self) -> datetime:
+        return _mono_to_datetime(self.connect_mono)
+
+    @property
+    def last_activity(self) -> datetime:
+        return _mono_to_datetime(self.last_activity_mono)
+
     @property
     def is_active(self) -> bool:
         return self.status == ConnectionStatus.CONNECTED
@@ -101,8 +389,13 @@ class ConnectionInfo:
     def duration(self) -> float:
         """连接持续时间（秒）"""
         if self.is_active:
-            return (datetime.now() - self.connect_time).total_seconds()
-        return (self.last_activity - self.connect_time).total_seconds()
+            return time.monotonic() - self.connect_mono
+        return self.last_activity_mono - self.connect_mono
+
+
+def _mono_to_datetime(mono: float) -> datetime:
+    """单调时钟秒换算为本地时间"""
+    return datetime.fromtimestamp(time.time() - time.monotonic() + mono)
 
 
 @dataclass
@@ -125,124 +418,505 @@ class ServerStats:
 class TCPServer:
     """增强的 TCP 服务器实现"""
     
-    def __init__(self, host: str = '0.0.0.0', port: int = 16900):
+    def __init__(self, host: str = '0.0.0.0', port: int = 16900,
+                 outbound_max_bytes: int = 64 * 1024, outbound_policy: str = 'drop_oldest',
+                 idle_timeout: float = 60.0, heartbeat_timeout: float = 600.0,
+                 history_size: int = 1000, reuse_port: bool = False, db_manager=None,
+                 max_connections: int = 1000, max_connections_per_ip: int = 0,
+                 accept_rate: float = 200.0, accept_burst: float = 1000.0,
+                 frame_rate: float = 200.0, frame_burst: float = 500.0,
+                 log_sample_rate: int = 1000, listen_socket=None,
+                 drain_timeout: float = 30.0, drain_spread: float = 10.0,
+                 forward_heartbeats: bool = True,
+                 dedup_mode: str = 'drop', dedup_window: int = 256,
+                 media_dir: str = './data/media',
+                 forward_enabled: bool = True, forward_mode: str = 'one_to_one',
+                 forward_target: Optional[str] = None, forward_connect_timeout: float = 10.0,
+                 forward_queue_max_bytes: int = 1024 * 1024, forward_overflow_policy: str = 'drop_oldest',
+                 forward_max_links: int = 30000, forward_link_idle_timeout: float = 600.0,
+                 forward_upstream_replies: bool = True):
         self.host = host
         self.port = port
+        # 多进程模式下各工作进程以 SO_REUSEPORT 绑定同一端口
+        self.reuse_port = reuse_port
+        # 连接建立后迟迟没有有效报文的超时时间（秒）
+        self.idle_timeout = idle_timeout
+        # 终端绑定后没有任何报文（含心跳）的超时时间（秒）
+        self.heartbeat_timeout = heartbeat_timeout
+        # 终端下行发送队列配置
+        self.outbound_max_bytes = outbound_max_bytes
+        self.outbound_policy = OverflowPolicy(outbound_policy)
         self.server: Optional[asyncio.Server] = None
+        # 预先创建的监听套接字（平滑重启交接）；为None时按 host/port 监听
+        self.listen_socket = listen_socket
+        # 排空：发送队列写出超时、会话分批关闭的时间跨度（秒）
+        self.drain_timeout = drain_timeout
+        self.drain_spread = drain_spread
+        self._drain_task: Optional[asyncio.Task] = None
+        self._draining = False
+        self._stopped = asyncio.Event()
+        # 活跃连接；断开的连接移入有界的最近断开记录
         self.connections: Dict[str, ConnectionInfo] = {}
+        self.recent_disconnects: Deque[ConnectionInfo] = deque(maxlen=history_size)
+        self.timer_wheel = TimerWheel(tick=1.0)
+        self.idle_closed = 0
+        # 心跳快速路径：是否转发心跳到上游平台，以及快速路径计数
+        self.forward_heartbeats = forward_heartbeats
+        self.heartbeats = 0
+        self.heartbeats_forwarded = 0
+        # 报文转发到上游平台后由平台应答（经下行链路回送），代理不再本地应答，
+        # 避免终端收到两份应答（如鉴权码不同的两条 0x8100）；上游建连失败、暂存的报文被丢弃时补发本地应答
+        self.forward_upstream_replies = forward_upstream_replies
+        self.local_replies_skipped = 0
+        self.local_replies_resent = 0
         self.stats = ServerStats()
-        self._connection_lock = asyncio.Lock()
-        self.forwarder = Forwarder()
-        self.db_manager = DatabaseManager()
+        # 按 (终端, 流水号) 滑动窗口识别终端重发的报文
+        self.dedup = DuplicateFilter(window_size=dedup_window, mode=DuplicateMode(dedup_mode))
+        # 连接准入控制：全局/单IP连接上限、新建连接速率、会话报文速率
+        self.admission = AdmissionController(
+            max_connections=max_connections, max_per_ip=max_connections_per_ip,
+            accept_rate=accept_rate, accept_burst=accept_burst,
+            frame_rate=frame_rate, frame_burst=frame_burst
+        )
+        # 终端会话注册表：手机号 <-> 连接 双向O(1)索引
+        self.sessions = SessionRegistry()
+        self.responder = JT808Responder()
+        self.reassembler = SubpackageReassembler()
+        # 多媒体数据分包逐包落盘，不在内存中重组
+        self.media_sink = MediaUploadSink(media_dir, on_complete=self._store_media_record)
+        # 上游平台下发的报文按终端手机号回送给终端会话；每终端独立连接模式下限制上游连接总数
+        self.forward_enabled = forward_enabled
+        self.forwarder = Forwarder(queue_max_bytes=forward_queue_max_bytes,
+                                   overflow_policy=forward_overflow_policy,
+                                   on_downlink=self._relay_downlink, max_links=forward_max_links,
+                                   link_idle_timeout=forward_link_idle_timeout,
+                                   connect_timeout=forward_connect_timeout,
+                                   on_link_closed=self._close_unlinked_session,
+                                   on_pending_dropped=self._reply_dropped_frames)
+        self.forwarder.set_forwarding_mode(forward_mode)
+        if forward_target:
+            # 默认目标服务器，格式 host:port
+            target_host, _, target_port = forward_target.rpartition(':')
+            self.forwarder.set_default_target(target_host, int(target_port))
+        self.db_manager = db_manager if db_manager is not None else DatabaseManager()
+        # 消息ID -> 处理函数；未登记的消息只应答和转发，不解析消息体
+        self.dispatcher = MessageDispatcher()
+        self.dispatcher.register(0x0200, "位置信息汇报", self._process_location_message, stores=True)
+        self.dispatcher.register(0x0100, "终端注册", self._process_register_message, stores=True)
+        self.dispatcher.register(0x0704, "定位数据批量上传", self._process_batch_location_message, stores=True)
+        self.dispatcher.register(0x0801, "多媒体数据上传", self._process_media_message, stores=True, fragments=True)
         self.monitor_manager = MonitorManager()
+        # 逐报文日志在 INFO 级别按采样记录，完整记录需开启 DEBUG
+        self.log_sampler = LogSampler(log_sample_rate)
         
     async def start(self):
         """启动服务器"""
         try:
-            self.server = await asyncio.start_server(
-                self.handle_client, self.host, self.port
-            )
-            logger.info(f"TCP Server 启动成功，监听地址: {self.host}:{self.port}")
+            # 平滑重启时沿用上一个进程交接过来的监听套接字
+            if self.listen_socket is None:
+                self.listen_socket = inherited_socket()
+            if self.listen_socket is not None:
+                self.server = await asyncio.start_server(self.handle_client, sock=self.listen_socket)
+                logger.info(f"TCP Server 启动成功，沿用交接的监听套接字: {self.listen_socket.getsockname()}")
+            else:
+                self.server = await asyncio.start_server(
+                    self.handle_client, self.host, self.port,
+                    reuse_port=self.reuse_port or None
+                )
+                logger.info(f"TCP Server 启动成功，监听地址: {self.host}:{self.port}")
             logger.info(f"服务器启动时间: {self.stats.start_time}")
+            notify_ready()
             
             # 启动监控任务
             asyncio.create_task(self._monitor_connections())
+            asyncio.create_task(self._check_reassembly())
+            asyncio.create_task(self._reap_idle_sessions())
             
             # 启动系统监控
             await self.monitor_manager.start()
             
+            # 服务持续到 serve_forever 异常结束，或排空完成
             async with self.server:
-                await self.server.serve_forever()
+                serve_task = asyncio.create_task(self.server.serve_forever())
+                stopped_task = asyncio.create_task(self._stopped.wait())
+                await asyncio.wait((serve_task, stopped_task), return_when=asyncio.FIRST_COMPLETED)
+                # 排空开始时会关闭监听，serve_forever 随之结束，此时等待排空完成
+                if self.draining:
+                    await stopped_task
+                    return
+                stopped_task.cancel()
+                await serve_task
         except Exception as e:
             logger.error(f"TCP Server 启动失败: {e}")
             raise
     
+    @property
+    def draining(self) -> bool:
+        return self._draining
+    
+    def request_shutdown(self):
+        """请求平滑停止（可在信号处理函数中调用）"""
+        if self._drain_task is None:
+            self._draining = True
+            self._drain_task = asyncio.create_task(self.drain())
+    
+    def request_restart(self):
+        """请求平滑重启：先把监听套接字交接给新进程，再排空本进程（可在信号处理函数中调用）"""
+        if self._drain_task is None:
+            self._drain_task = asyncio.create_task(self._restart())
+    
+    async def _restart(self):
+        try:
+            process = await spawn_successor(self.server.sockets[0])
+            logger.info(f"新进程已接管监听套接字 (pid: {process.pid})，开始排空本进程")
+        except Exception as e:
+            logger.error(f"平滑重启失败，继续提供服务: {e}")
+            self._drain_task = None
+            return
+        await self.drain()
+    
+    async def drain(self, timeout: Optional[float] = None, spread: Optional[float] = None):
+        """
+        排空：停止接入新连接，写出所有下行/上游发送队列与待写入数据，
+        再把现有会话在 spread 秒内分批正常关闭，避免终端同时重连
+        """
+        # 先置排空标志再关闭监听，start() 据此区分排空与异常退出（直接调用 drain() 时同样适用）
+        self._draining = True
+        timeout = self.drain_timeout if timeout is None else timeout
+        spread = self.drain_spread if spread is None else spread
+        try:
+            logger.info(f"开始排空，活跃连接: {self.stats.active_connections}")
+            if self.server is not None:
+                self.server.close()
+        
+            sessions = list(self.sessions.sessions())
+            flushes = [session.outbound.flush(timeout) for session in sessions if session.outbound is not None]
+            results = await asyncio.gather(*flushes, self.forwarder.flush(timeout), return_exceptions=True)
+            failed = sum(1 for result in results if isinstance(result, Exception))
+            if failed:
+                logger.warning(f"排空时有 {failed} 个发送队列未能在 {timeout:.0f} 秒内写完")
+            flush_storage = getattr(self.db_manager, 'flush', None)
+            if flush_storage is not None:
+                flush_storage()
+        
+            # 分批关闭会话（FIN 正常关闭，不丢弃已写出的数据）
+            batches = max(1, int(spread / DRAIN_CLOSE_INTERVAL)) if spread > 0 else 1
+            batch_size = -(-len(sessions) // batches) if sessions else 0
+            for index in range(0, len(sessions), batch_size or 1):
+                for session in sessions[index:index + batch_size]:
+                    if not session.is_closing:
+                        session.info.disconnect_reason = "服务器排空，平滑关闭"
+                        session.writer.close()
+                if index + batch_size < len(sessions):
+                    await asyncio.sleep(DRAIN_CLOSE_INTERVAL)
+        
+            # 未收齐的多媒体上传无法交接给新进程，关闭文件并删除
+            self.media_sink.close()
+            self.forwarder.close()
+            await self.monitor_manager.stop()
+            logger.info(f"排空完成，共关闭 {len(sessions)} 个会话")
+        finally:
+            self._stopped.set()
+    
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """处理客户端连接"""
         addr = writer.get_extra_info('peername')
         client_id = f"{addr[0]}:{addr[1]}"
         
-        # 记录连接信息
-        conn_info = ConnectionInfo(
-            remote_addr=addr[0],
-            remote_port=addr[1],
-            connect_time=datetime.now(),
-            last_activity=datetime.now()
-        )
+        # 排空期间不再接入新连接
+        if self.draining:
+            writer.close()
+            return
+        
+        # 准入检查，超限的连接直接复位，不分配会话资源
+        reject_reason = self.admission.admit(addr[0])
+        if reject_reason:
+            logger.warning("拒绝客户端连接: %s (原因: %s)", client_id, reject_reason)
+            writer.transport.abort()
+            return
         
-        async with self._connection_lock:
-            self.connections[client_id] = conn_info
-            self.stats.total_connections += 1
-            self.stats.active_connections += 1
+        # 记录连接信息（所有计数都在事件循环线程内更新，无需加锁）
+        conn_info = ConnectionInfo(addr[0], addr[1])
+        self.connections[client_id] = conn_info
+        self.stats.total_connections += 1
+        self.stats.active_connections += 1
         
         logger.info(f"客户端连接: {client_id} (总连接数: {self.stats.total_connections}, 活跃连接: {self.stats.active_connections})")
         
+        session = self.sessions.register(client_id, writer, conn_info)
+        session.outbound = OutboundQueue(writer, name=client_id, max_bytes=self.outbound_max_bytes,
+                                         policy=self.outbound_policy)
+        self.timer_wheel.schedule(session, time.monotonic() + self.idle_timeout)
+        session.frame_bucket = self.admission.new_frame_bucket()
+        
+        # 每个连接独立的流式帧解码器，处理粘包/半包/转义
+        decoder = JT808FrameDecoder()
+        # 当前帧的原始线上字节，转发时按需取用
+        current_wire = decoder.current_wire
+        
         try:
             while True:
                 # 读取数据
-                data = await reader.read(1024)
+                data = await reader.read(4096)
                 if not data:
                     break
                 
                 # 更新连接信息
-                async with self._connection_lock:
-                    conn_info.last_activity = datetime.now()
-                    conn_info.bytes_received += len(data)
-                    conn_info.packets_received += 1
-                    self.stats.total_bytes_received += len(data)
-                    self.stats.total_packets_received += 1
+                now = time.monotonic()
+                conn_info.last_activity_mono = now
+                conn_info.bytes_received += len(data)
+                self.stats.total_bytes_received += len(data)
                 
                 # 记录数据接收日志
-                logger.debug(f"收到来自 {client_id} 的数据: {len(data)} 字节")
+                logger.debug("收到来自 %s 的数据: %d 字节", client_id, len(data))
                 
-                # JT808协议头解析
-                header = JT808Parser.parse_header(data)
-                if header:
-                    logger.info(f"JT808协议头解析成功 - 终端手机号: {header.phone}, "
-                              f"消息ID: 0x{header.msg_id:04X}, 流水号: {header.msg_seq}")
-                    if header.pkg_total and header.pkg_index:
-                        logger.info(f"分包信息 - 总数: {header.pkg_total}, 序号: {header.pkg_index}")
-                    
-                    # 根据消息ID处理不同类型的报文
-                    await self._process_message(header, data)
-                    
-                    # 尝试转发数据包
-                    forward_success = await self.forwarder.forward_packet(header.phone, data)
-                    if forward_success:
-                        logger.info(f"数据包转发成功 - 终端: {header.phone}")
+                # 逐帧处理（一次读取可能包含多帧，也可能只有半帧）
+                replies = []
+                bucket = session.frame_bucket
+                for frame in decoder.feed(data):
+                    conn_info.packets_received += 1
+                    self.stats.total_packets_received += 1
+                    # 超出会话报文速率的帧直接丢弃，不应答（终端会按超时重传）
+                    if bucket is not None and not bucket.consume(now):
+                        self.admission.frames_throttled += 1
+                        continue
+                    # 已绑定终端的心跳只比较消息头字节，不解析、不入库
+                    if (len(frame) == HEARTBEAT_FRAME_SIZE and frame[:4] == HEARTBEAT_PREFIX
+                            and frame[4:10] == session.phone_bcd):
+                        reply = await self._handle_heartbeat(frame, session, current_wire)
                     else:
-                        logger.warning(f"数据包转发失败 - 终端: {header.phone}")
-                else:
-                    logger.warning(f"无法解析JT808协议头，数据长度: {len(data)} 字节")
-                
-                # 回显数据（基础实现）
-                writer.write(data)
-                await writer.drain()
+                        reply = await self._handle_frame(JT808Frame(frame, current_wire, decoder.checksum), session)
+                    if reply:
+                        replies.append(reply)
                 
-                # 更新发送统计
-                async with self._connection_lock:
-                    conn_info.bytes_sent += len(data)
-                    conn_info.packets_sent += 1
-                    self.stats.total_bytes_sent += len(data)
-                    self.stats.total_packets_sent += 1
+                # 同一批次的平台应答合并为一次入队，由发送队列异步写出
+                if replies:
+                    payload = b''.join(replies)
+                    if not session.send(payload):
+                        if session.outbound.closed:
+                            conn_info.disconnect_reason = "下行发送队列溢出"
+                            break
+                        continue
+                    
+                    # 更新发送统计
+                    conn_info.bytes_sent += len(payload)
+                    conn_info.packets_sent += len(replies)
+                    self.stats.total_bytes_sent += len(payload)
+                    self.stats.total_packets_sent += len(replies)
                 
+        except ConnectionError as e:
+            # 对端复位等连接错误按正常断开处理
+            conn_info.disconnect_reason = f"连接异常断开: {e}"
         except Exception as e:
             logger.error(f"处理客户端 {client_id} 数据时出错: {e}")
             conn_info.status = ConnectionStatus.ERROR
             conn_info.disconnect_reason = f"处理错误: {e}"
         finally:
-            # 清理连接
-            writer.close()
-            await writer.wait_closed()
+            # 清理连接：先释放会话、准入等资源再等待套接字关闭，
+            # 对端复位时 wait_closed() 会抛出异常，不能跳过清理
+            session.close()
             
-            async with self._connection_lock:
-                if client_id in self.connections:
-                    conn_info.status = ConnectionStatus.DISCONNECTED
-                    if not conn_info.disconnect_reason:
-                        conn_info.disconnect_reason = "客户端主动断开"
-                    self.stats.active_connections -= 1
+            # 被新连接接管的旧会话已解除手机号绑定，不影响新连接
+            phone = session.phone
+            self.timer_wheel.cancel(session)
+            self.sessions.unregister(session)
+            if phone:
+                self.reassembler.drop_terminal(phone)
+                self.forwarder.release_terminal(phone)
+            
+            if self.connections.get(client_id) is conn_info:
+                del self.connections[client_id]
+                conn_info.status = ConnectionStatus.DISCONNECTED
+                if not conn_info.disconnect_reason:
+                    conn_info.disconnect_reason = "客户端主动断开"
+                self.recent_disconnects.append(conn_info)
+                self.stats.active_connections -= 1
+            self.admission.release(addr[0])
             
             logger.info(f"客户端断开连接: {client_id} (断开原因: {conn_info.disconnect_reason})")
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError) as e:
+                logger.debug("关闭客户端 %s 连接时出错: %s", client_id, e)
+    
+    async def _handle_frame(self, header: JT808Frame, session: TerminalSession) -> Optional[bytes]:
+        """处理一个已还原转义并通过校验的完整帧，返回需要下发给终端的平台应答"""
+        # 帧视图按需解码消息头字段，不复制帧数据
+        frame = header.data
+        if not header.is_valid:
+            logger.warning("无法解析JT808协议头，数据长度: %d 字节", len(frame))
+            return None
+        
+        # 收到有效报文，推迟心跳超时（时间轮中O(1)刷新）
+        self.timer_wheel.touch(session, time.monotonic() + self.heartbeat_timeout)
+        
+        # 绑定终端手机号与连接，同一终端的新连接接管旧连接
+        if session.phone != header.phone:
+            previous = self.sessions.bind_phone(session, header.phone)
+            session.protocol_version = header.version
+            # 心跳快速路径只适用于2013版的12字节消息头
+            session.phone_bcd = bytes(frame[4:10]) if header.version is None else None
+            session.info.terminal_phone = header.phone
+            if previous is not None:
+                previous.info.disconnect_reason = f"终端重连，被新连接 {session.client_id} 接管"
+                # 断线重连后终端常会重发未获应答的报文，沿用旧连接的流水号窗口
+                self.dedup.inherit(session, previous)
+        
+        logger.debug("JT808协议头解析成功 - 终端手机号: %s, 消息ID: 0x%04X, 流水号: %d",
+                     header.phone, header.msg_id, header.msg_seq)
+        if self.log_sampler():
+            logger.info("报文采样(每%d条记录1条) - 终端手机号: %s, 消息ID: 0x%04X, 流水号: %d",
+                        self.log_sampler.every, header.phone, header.msg_id, header.msg_seq)
+        # 终端未收到应答而重发的报文：照常应答，不再入库和转发；
+        # 平台应答由上游给出时仍转发，由上游平台重新应答
+        route = self.dispatcher.get(header.msg_id)
+        if self.dedup.is_duplicate(session, header.msg_seq, header.msg_id, header.checksum):
+            logger.debug("重复报文 - 终端: %s, 消息ID: 0x%04X, 流水号: %d",
+                         header.phone, header.msg_id, header.msg_seq)
+            if self.dedup.drops:
+                if route is not None and route.stores:
+                    self.dedup.writes_saved += 1
+                if session.upstream_replies and await self.forwarder.forward_packet(header.phone, header):
+                    self.local_replies_skipped += 1
+                    return None
+                self.dedup.forwards_saved += 1
+                return self._reply_for(header, route)
+        
+        if header.pkg_total and header.pkg_index:
+            logger.debug("分包信息 - 总数: %d, 序号: %d", header.pkg_total, header.pkg_index)
+            # 需要解析消息体的分包报文先重组，收齐后再按完整报文处理；逐包处理的消息直接分发；
+            # 其余分包只应答和转发
+            if route is not None and route.fragments:
+                await self._process_message(header, frame)
+            elif route is not None and route.parse:
+                message = self.reassembler.add_fragment(header, frame)
+                if message:
+                    logger.debug("分包重组完成 - 终端: %s, 消息ID: 0x%04X, 总长度: %d 字节",
+                                 header.phone, header.msg_id, len(message))
+                    await self._process_message(JT808Parser.parse_header(message), message)
+        else:
+            # 根据消息ID处理不同类型的报文
+            await self._process_message(header, frame)
+        
+        # 尝试转发数据包（原样转发线上字节，有目标连接时才复制）
+        forward_success = self.forward_enabled and await self.forwarder.forward_packet(header.phone, header)
+        if forward_success:
+            logger.debug("数据包转发成功 - 终端: %s", header.phone)
+        else:
+            logger.debug("数据包转发失败 - 终端: %s", header.phone)
+        
+        # 已转发的报文由上游平台应答，转发失败时代理本地应答
+        session.upstream_replies = forward_success and self.forward_upstream_replies
+        if session.upstream_replies:
+            self.local_replies_skipped += 1
+            return None
+        return self._reply_for(header, route)
+    
+    def _reply_for(self, header, route) -> Optional[bytes]:
+        """登记为无需应答的消息不应答，其余由应答生成器决定"""
+        if route is not None and not route.reply:
+            return None
+        return self.responder.reply_for(header)
+    
+    async def _handle_heartbeat(self, frame: memoryview, session: TerminalSession,
+                                wire_source: Optional[Callable[[], bytes]] = None) -> Optional[bytes]:
+        """心跳快速路径：刷新超时、按配置转发；未转发到上游平台时按模板生成 0x8001 应答"""
+        self.timer_wheel.touch(session, time.monotonic() + self.heartbeat_timeout)
+        self.heartbeats += 1
+        if self.forward_heartbeats and self.forward_enabled:
+            if await self.forwarder.forward_packet(session.phone, JT808Frame(frame, wire_source)):
+                self.heartbeats_forwarded += 1
+                session.upstream_replies = self.forward_upstream_replies
+                if session.upstream_replies:
+                    self.local_replies_skipped += 1
+                    return None
+            else:
+                session.upstream_replies = False
+        return self.responder.heartbeat_reply(session.phone_bcd, bytes(frame[10:12]))
+    
+    def _relay_downlink(self, phone: str, frame: JT808Frame) -> bool:
+        """上游平台下行报文原样写入终端会话的发送队列"""
+        session = self.sessions.get_by_phone(phone)
+        if session is None:
+            return False
+        wire = frame.wire
+        if not session.send(wire):
+            return False
+        conn_info = session.info
+        conn_info.bytes_sent += len(wire)
+        conn_info.packets_sent += 1
+        self.stats.total_bytes_sent += len(wire)
+        self.stats.total_packets_sent += 1
+        return True
+    
+    def _close_unlinked_session(self, phone: str):
+        """终端的独立上游连接被关闭、已失去上游鉴权：断开终端，使其重连后重新注册鉴权"""
+        session = self.sessions.get_by_phone(phone)
+        if session is None or session.is_closing:
+            return
+        session.info.disconnect_reason = "上游平台连接已关闭，断开终端以重新注册鉴权"
+        logger.info(f"终端 {phone} 的上游连接已关闭，断开终端: {session.client_id}")
+        session.close()
+    
+    def _reply_dropped_frames(self, frames: List[bytes]):
+        """上游建连失败、暂存的报文被丢弃：这些报文已跳过本地应答，由代理补发"""
+        if not self.forward_upstream_replies:
+            return
+        decoder = JT808FrameDecoder()
+        for wire in frames:
+            for frame in decoder.feed(wire):
+                header = JT808Frame(frame)
+                session = self.sessions.get_by_phone(header.phone) if header.is_valid else None
+                if session is None:
+                    continue
+                session.upstream_replies = False
+                reply = self._reply_for(header, self.dispatcher.get(header.msg_id))
+                if reply and session.send(reply):
+                    self.local_replies_resent += 1
+                    session.info.bytes_sent += len(reply)
+                    session.info.packets_sent += 1
+                    self.stats.total_bytes_sent += len(reply)
+                    self.stats.total_packets_sent += 1
+        logger.debug("上游建连失败，补发 %d 条本地应答", len(frames))
+    
+    def _send_platform_message(self, phone: str, msg_id: int, body: bytes) -> bool:
+        """向终端发送平台下行报文（0x8003、0x8800）；报文由上游平台应答时同样由上游平台下发"""
+        session = self.sessions.get_by_phone(phone)
+        if session is None:
+            return False
+        if session.upstream_replies:
+            self.local_replies_skipped += 1
+            return False
+        return session.send(self.responder.build_message(phone, msg_id, body, session.protocol_version))
+    
+    async def _check_reassembly(self):
+        """定期检查分包重组超时，并下发 0x8003 补传分包请求"""
+        while True:
+            try:
+                await asyncio.sleep(1)
+                for request in self.reassembler.check_timeouts():
+                    if self._send_platform_message(request.phone, 0x8003, request.to_body()):
+                        logger.info(f"下发补传分包请求 - 终端: {request.phone}, 原始流水号: {request.first_seq}, "
+                                  f"缺失包: {request.missing}")
+                for request in self.media_sink.check_timeouts():
+                    self._send_media_reply(request)
+            except Exception as e:
+                logger.error(f"检查分包重组时出错: {e}")
+    
+    async def _reap_idle_sessions(self):
+        """推进超时时间轮，关闭空闲/心跳超时的连接，以及空闲的终端上游连接"""
+        while True:
+            try:
+                await asyncio.sleep(self.timer_wheel.tick)
+                for session in self.timer_wheel.advance(time.monotonic()):
+                    timeout = self.heartbeat_timeout if session.phone else self.idle_timeout
+                    session.info.disconnect_reason = f"空闲超时（{timeout:.0f}秒无有效报文）"
+                    self.idle_closed += 1
+                    logger.info(f"关闭空闲连接: {session.client_id} (终端: {session.phone})")
+                    session.close()
+                self.forwarder.close_idle_links()
+            except Exception as e:
+                logger.error(f"检查空闲连接时出错: {e}")
     
     async def _monitor_connections(self):
         """监控连接状态"""
@@ -250,18 +924,8 @@ class TCPServer:
             try:
                 await asyncio.sleep(30)  # 每30秒检查一次
                 
-                current_time = datetime.now()
-                idle_connections = []
-                
-                async with self._connection_lock:
-                    for client_id, conn_info in self.connections.items():
-                        if conn_info.is_active:
-                            idle_time = (current_time - conn_info.last_activity).total_seconds()
-                            if idle_time > 600:  # 10分钟空闲
-                                idle_connections.append(client_id)
-                
                 # 记录统计信息
-                if self.stats.active_connections > 0:
+                if self.stats.active_connections > 0 or self.admission.rejected_total:
                     logger.info(f"连接监控 - 活跃连接: {self.stats.active_connections}, "
                               f"总接收: {self.stats.total_bytes_received} 字节, "
                               f"总发送: {self.stats.total_bytes_sent} 字节")
@@ -273,7 +937,9 @@ class TCPServer:
                         packets_received=self.stats.total_packets_received,
                         packets_sent=self.stats.total_packets_sent,
                         active_connections=self.stats.active_connections,
-                        total_connections=self.stats.total_connections
+                        total_connections=self.stats.total_connections,
+                        rejected_connections=self.admission.rejected_total,
+                        throttled_frames=self.admission.frames_throttled
                     )
                     self.monitor_manager.update_traffic_metrics(traffic_metrics)
                 
@@ -281,39 +947,47 @@ class TCPServer:
                 logger.error(f"监控连接时出错: {e}")
     
     async def _process_message(self, header, data: bytes):
-        """根据消息ID处理不同类型的报文"""
-        try:
-            if header.msg_id == 0x0200:  # 定位信息
-                await self._process_location_message(header, data)
-            elif header.msg_id == 0x0100:  # 终端注册
-                await self._process_register_message(header, data)
-        except Exception as e:
-            logger.error(f"处理消息时出错: {e}")
+        """根据消息ID分发到注册表中的处理函数"""
+        await self.dispatcher.dispatch(header, data)
     
-    async def _process_location_message(self, header, data: bytes):
+    async def _process_location_message(self, header, data: bytes, body_offset: int):
         """处理定位信息报文"""
-        # 计算消息体偏移量（考虑分包字段）
-        body_offset = 12
-        if header.pkg_total and header.pkg_index:
-            body_offset = 16
-        
         # 解析定位数据
         location_data = JT808Parser.parse_location_data(data, body_offset)
         if location_data:
             # 存储到数据库
             self.db_manager.insert_location_data(header.phone, header.msg_seq, location_data)
-            logger.info(f"定位数据存储成功 - 终端: {header.phone}, "
-                       f"位置: ({location_data['latitude']:.6f}, {location_data['longitude']:.6f})")
+            logger.debug("定位数据存储成功 - 终端: %s, 位置: (%.6f, %.6f)",
+                         header.phone, location_data['latitude'], location_data['longitude'])
+    
+    async def _process_batch_location_message(self, header, data: bytes, body_offset: int):
+        """处理定位数据批量上传报文，整条报文的数据项一次批量写入"""
+        records = [(header.phone, header.msg_seq, location_data)
+                   for location_data in JT808Parser.iter_batch_locations(data, body_offset)]
+        if records:
+            self.db_manager.insert_location_data_batch(records)
+            logger.debug("批量定位数据存储成功 - 终端: %s, 数据项: %d", header.phone, len(records))
     
-    async def _process_register_message(self, header, data: bytes):
+    async def _process_media_message(self, header, data: bytes, body_offset: int):
+        """处理多媒体数据上传报文：逐包写入文件，末包到达或收齐时下发 0x8800"""
+        reply = await self.media_sink.add_fragment(header, data)
+        if reply is not None:
+            self._send_media_reply(reply)
+    
+    def _send_media_reply(self, reply):
+        """下发多媒体数据上传应答（缺包列表或接收完成）"""
+        if self._send_platform_message(reply.phone, reply.msg_id, reply.to_body()) and reply.missing:
+            logger.info(f"下发多媒体重传请求 - 终端: {reply.phone}, 多媒体ID: {reply.media_id}, "
+                        f"缺失包: {reply.missing}")
+    
+    def _store_media_record(self, record):
+        """多媒体文件接收完成后写入数据库"""
+        self.db_manager.insert_media_record(record.to_dict())
+    
+    async def _process_register_message(self, header, data: bytes, body_offset: int):
         """处理终端注册报文"""
-        # 计算消息体偏移量
-        body_offset = 12
-        if header.pkg_total and header.pkg_index:
-            body_offset = 16
-        
         # 解析注册数据
-        register_data = JT808Parser.parse_terminal_register(data, body_offset)
+        register_data = JT808Parser.parse_terminal_register(data, body_offset, header.version)
         if register_data:
             # 转换为车辆信息格式
             vehicle_data = {
@@ -327,13 +1001,55 @@ class TCPServer:
             
             # 存储或更新车辆信息
             self.db_manager.insert_or_update_vehicle(header.phone, vehicle_data)
-            logger.info(f"车辆信息处理成功 - 终端: {header.phone}, 车牌: {vehicle_data.get('plate_number')}")
+            logger.info("车辆信息处理成功 - 终端: %s, 车牌: %s", header.phone, vehicle_data.get('plate_number'))
+    
+    def _get_outbound_stats(self) -> Dict:
+        """汇总所有终端下行发送队列的统计信息"""
+        totals = {
+            "policy": self.outbound_policy.value,
+            "max_bytes": self.outbound_max_bytes,
+            "queued_bytes": 0,
+            "congested_sessions": 0,
+            "bytes_dropped": 0,
+            "bytes_spilled": 0,
+            "high_watermark_events": 0,
+            "overflow_disconnects": 0
+        }
+        for session in self.sessions.sessions():
+            queue = session.outbound
+            if queue is None:
+                continue
+            totals["queued_bytes"] += queue.queued_bytes
+            totals["congested_sessions"] += 1 if queue.is_congested else 0
+            totals["bytes_dropped"] += queue.bytes_dropped
+            totals["bytes_spilled"] += queue.bytes_spilled
+            totals["high_watermark_events"] += queue.high_watermark_events
+            totals["overflow_disconnects"] += queue.overflow_disconnects
+        return totals
+    
+    def get_terminal_session(self, phone: str) -> Optional[Dict]:
+        """按终端手机号获取当前在线会话信息"""
+        session = self.sessions.get_by_phone(phone)
+        if session is None:
+            return None
+        conn = session.info
+        return {
+            "client_id": session.client_id,
+            "terminal_phone": phone,
+            "remote_addr": conn.remote_addr,
+            "remote_port": conn.remote_port,
+            "connect_time": conn.connect_time.isoformat(),
+            "last_activity": conn.last_activity.isoformat(),
+            "status": conn.status.value,
+            "bytes_received": conn.bytes_received,
+            "bytes_sent": conn.bytes_sent,
+            "packets_received": conn.packets_received,
+            "packets_sent": conn.packets_sent
+        }
     
     def get_connection_stats(self) -> Dict:
-        """获取连接统计信息"""
-        async def _get_stats():
-            async with self._connection_lock:
-                        return {
+        """获取连接统计信息（事件循环线程内同步读取，时间在此时才换算为 datetime）"""
+        return {
             "server_address": f"{self.host}:{self.port}",
             "uptime_seconds": self.stats.uptime,
             "total_connections": self.stats.total_connections,
@@ -345,6 +1061,7 @@ class TCPServer:
             "connections": [
                 {
                     "client_id": client_id,
+                    "terminal_phone": conn.terminal_phone,
                     "remote_addr": conn.remote_addr,
                     "remote_port": conn.remote_port,
                     "connect_time": conn.connect_time.isoformat(),
@@ -359,28 +1076,116 @@ class TCPServer:
                 }
                 for client_id, conn in self.connections.items()
             ],
+            "recent_disconnects": [
+                {
+                    "client_id": f"{conn.remote_addr}:{conn.remote_port}",
+                    "terminal_phone": conn.terminal_phone,
+                    "connect_time": conn.connect_time.isoformat(),
+                    "last_activity": conn.last_activity.isoformat(),
+                    "status": conn.status.value,
+                    "duration_seconds": conn.duration,
+                    "bytes_received": conn.bytes_received,
+                    "bytes_sent": conn.bytes_sent,
+                    "disconnect_reason": conn.disconnect_reason
+                }
+                for conn in self.recent_disconnects
+            ],
+            "idle_closed": self.idle_closed,
+            "heartbeats": {
+                "fast_path": self.heartbeats,
+                "forwarded": self.heartbeats_forwarded,
+                "forward_enabled": self.forward_heartbeats
+            },
+            "upstream_replies": {
+                "enabled": self.forward_upstream_replies,
+                "local_replies_skipped": self.local_replies_skipped,
+                "local_replies_resent": self.local_replies_resent
+            },
+            "sessions": self.sessions.get_stats(),
+            "outbound": self._get_outbound_stats(),
+            "admission": self.admission.get_stats(),
+            "dedup": self.dedup.get_stats(),
+            "messages": self.dispatcher.get_stats(),
+            "reassembly": self.reassembler.get_stats(),
+            "media": self.media_sink.get_stats(),
+            "responses": self.responder.get_stats(),
+            "forwarding": self.forwarder.get_forwarding_stats(),
             "monitoring": self.monitor_manager.get_monitoring_stats()
         }
-        
-        # 由于这是同步方法，我们需要在事件循环中运行
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建一个任务
-                future = asyncio.create_task(_get_stats())
-                return future.result()
-            else:
-                return asyncio.run(_get_stats())
-        except RuntimeError:
-            # 如果没有事件循环，创建一个新的
-            return asyncio.run(_get_stats())
 
 
-async def main():
-    """主函数"""
-    server = TCPServer(host='0.0.0.0', port=16900)
+async def main(host: str = '0.0.0.0', port: int = 16900, server_kwargs: Optional[Dict] = None):
+    """主函数：SIGTERM/SIGINT 平滑停止，SIGHUP 交接监听套接字后平滑重启"""
+    server = TCPServer(host=host, port=port, **(server_kwargs or {}))
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, server.request_shutdown)
+    loop.add_signal_handler(signal.SIGINT, server.request_shutdown)
+    loop.add_signal_handler(signal.SIGHUP, server.request_restart)
     await server.start()
 
 
+def run_workers(host: str, port: int, workers: int, loop_engine: str = event_loop.LOOP_AUTO,
+                log_options: Optional[Dict] = None, server_kwargs: Optional[Dict] = None):
+    """多进程模式：SO_REUSEPORT 工作进程 + 监管进程汇总"""
+    try:
+        from .supervisor import WorkerSupervisor
+    except ImportError:
+        import importlib.util
+        supervisor_path = os.path.join(os.path.dirname(__file__), 'supervisor.py')
+        spec = importlib.util.spec_from_file_location("supervisor", supervisor_path)
+        supervisor = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(supervisor)
+        WorkerSupervisor = supervisor.WorkerSupervisor
+
+    if not WorkerSupervisor.is_supported():
+        logger.warning("当前平台不支持 SO_REUSEPORT，退回单进程模式")
+        event_loop.run(main(host, port, server_kwargs), loop_engine)
+        return
+    log_level = (log_options or {}).get("level", "INFO").upper()
+    WorkerSupervisor(host=host, port=port, workers=workers, server_kwargs=server_kwargs,
+                     loop_engine=loop_engine, log_level=log_level, log_options=log_options).run()
+
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    import argparse
+
+    # 命令行参数优先，未指定的项取管理界面保存的系统配置，再取默认值
+    parser = argparse.ArgumentParser(description="JT808 TCP 服务器")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, help="监听端口（默认取系统配置 tcp_port，否则16900）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="工作进程数，大于1时启用 SO_REUSEPORT 多进程模式，0 表示按CPU核数")
+    parser.add_argument("--loop", choices=event_loop.LOOP_CHOICES,
+                        help="事件循环引擎（默认取系统配置 event_loop），auto 时已安装 uvloop 则使用 uvloop")
+    parser.add_argument("--log-level", help="日志级别")
+    parser.add_argument("--log-file", help="日志文件路径")
+    parser.add_argument("--log-max-size", type=int, help="单个日志文件大小上限(MB)")
+    parser.add_argument("--log-retention-days", type=int, help="日志保留天数")
+    args = parser.parse_args()
+
+    config_db = DatabaseManager()
+    system_config = load_system_config(config_db)
+    config_db.close()
+    server_kwargs = options_from_config(system_config)
+    port = args.port
+    if port is None:
+        port = options_from_config(system_config, {'tcp_port': ('port', int)}).get('port', 16900)
+    loop_engine = args.loop or system_config.get('event_loop') or event_loop.LOOP_AUTO
+    if loop_engine not in event_loop.LOOP_CHOICES:
+        loop_engine = event_loop.LOOP_AUTO
+
+    log_options = {"level": "INFO", "log_file": "jt808proxy.log", "max_size_mb": 100, "retention_days": 30}
+    log_options.update(options_from_config(system_config, LOG_CONFIG_KEYS))
+    for name, value in (("level", args.log_level), ("log_file", args.log_file),
+                        ("max_size_mb", args.log_max_size), ("retention_days", args.log_retention_days)):
+        if value is not None:
+            log_options[name] = value
+    if args.workers == 1:
+        setup_logging(**log_options)
+        try:
+            event_loop.run(main(args.host, port, server_kwargs), loop_engine)
+        finally:
+            stop_logging()
+    else:
+        run_workers(args.host, port, args.workers or (os.cpu_count() or 1), loop_engine, log_options,
+                    server_kwargs)
@@ -0,0 +1,95 @@
+"""
+哈希时间轮模块
+用于终端空闲/心跳超时检测：刷新超时时间只需改写一个整数，到期检查只访问当前槽位
+"""
+
+from typing import Any, List, Optional, Set
+
+
+class TimerWheel:
+    """
+    哈希时间轮（惰性重排）
+
+    被调度的对象需要有 timer_deadline、timer_slot 两个属性。
+    touch() 推迟超时时只更新 timer_deadline，不移动槽位；
+    槽位到期时若对象的 timer_deadline 尚未到达，再重新放入对应槽位。
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[Set[Any]] = [set() for _ in range(slots)]
+        self._current_tick: Optional[int] = None
+        self._size = 0
+
+    def _tick_of(self, deadline: float) -> int:
+        return int(deadline // self.tick)
+
+    def schedule(self, entry: Any, deadline: float):
+        """调度对象在 deadline（单调时钟秒）时到期"""
+        if getattr(entry, 'timer_slot', None) is not None:
+            self.cancel(entry)
+        tick = self._tick_of(deadline)
+        if self._current_tick is not None and tick <= self._current_tick:
+            # 已经过期的放到下一个槽位，下次推进时立即处理
+            tick = self._current_tick + 1
+        slot = tick % self.slots
+        entry.timer_deadline = deadline
+        entry.timer_slot = slot
+        self._wheel[slot].add(entry)
+        self._size += 1
+
+    def touch(self, entry: Any, deadline: float):
+        """刷新超时时间（O(1)），推迟时只改写 timer_deadline"""
+        if getattr(entry, 'timer_slot', None) is None or deadline < entry.timer_deadline:
+            self.schedule(entry, deadline)
+        else:
+            entry.timer_deadline = deadline
+
+    def cancel(self, entry: Any):
+        """取消调度"""
+        slot = getattr(entry, 'timer_slot', None)
+        if slot is None:
+            return
+        bucket = self._wheel[slot]
+        if entry in bucket:
+            bucket.discard(entry)
+            self._size -= 1
+            if not bucket:
+                # 集合删空后不会缩容，换成新集合释放批量上线时扩出的哈希表
+                self._wheel[slot] = set()
+        entry.timer_slot = None
+
+    def advance(self, now: float) -> List[Any]:
+        """推进时间轮到 now，返回已到期的对象（已从时间轮移除）"""
+        target = self._tick_of(now)
+        if self._current_tick is None:
+            self._current_tick = target - 1
+        if target <= self._current_tick:
+            return []
+        # 间隔超过一整圈时，每个槽位访问一次即可
+        start = max(self._current_tick + 1, target - self.slots + 1)
+        self._current_tick = target
+        expired = []
+        for tick in range(start, target + 1):
+            bucket = self._wheel[tick % self.slots]
+            if not bucket:
+                continue
+            for entry in list(bucket):
+                if entry.timer_deadline <= now:
+                    bucket.discard(entry)
+                    self._size -= 1
+                    entry.timer_slot = None
+                    expired.append(entry)
+                else:
+                    # 超时被推迟或尚未转满一圈，重新放入对应槽位
+                    bucket.discard(entry)
+                    self._size -= 1
+                    entry.timer_slot = None
+                    self.schedule(entry, entry.timer_deadline)
+            if not bucket:
+                self._wheel[tick % self.slots] = set()
+        return expired
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,138 @@
+"""
+日志管理模块
+日志记录经 QueueHandler 入队，由后台 QueueListener 线程完成格式化与文件写入，
+事件循环线程只负责入队；日志文件按大小轮转，并按保留天数清理旧文件
+"""
+
+import glob
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RetentionRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """按大小轮转的文件日志，轮转时删除超过保留天数的旧文件"""
+
+    def __init__(self, filename: str, max_bytes: int, retention_days: int = 30,
+                 backup_count: int = 1000, encoding: str = 'utf-8'):
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.retention_days = retention_days
+
+    def doRollover(self):
+        super().doRollover()
+        self.purge_expired()
+
+    def purge_expired(self, now: Optional[float] = None):
+        """删除超过保留天数的已轮转日志文件"""
+        if self.retention_days <= 0:
+            return
+        cutoff = (time.time() if now is None else now) - self.retention_days * 86400
+        for path in glob.glob(f"{glob.escape(self.baseFilename)}.*"):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    同进程内使用的 QueueHandler
+    标准实现在入队前就格式化消息；这里原样入队，格式化推迟到监听线程
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LogSampler:
+    """逐报文日志采样：每 every 次调用返回一次True"""
+
+    __slots__ = ('every', '_count')
+
+    def __init__(self, every: int = 1000):
+        self.every = max(1, every)
+        self._count = 0
+
+    def __call__(self) -> bool:
+        self._count += 1
+        if self._count >= self.every:
+            self._count = 0
+            return True
+        return False
+
+
+def _build_handlers(log_file: Optional[str], max_size_mb: int, retention_days: int,
+                    console: bool):
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        file_handler = RetentionRotatingFileHandler(
+            log_file, max_bytes=max_size_mb * 1024 * 1024, retention_days=retention_days
+        )
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging(level: str = 'INFO', log_file: Optional[str] = 'jt808proxy.log',
+                  max_size_mb: int = 100, retention_days: int = 30, console: bool = True,
+                  log_queue=None) -> logging.handlers.QueueListener:
+    """
+    配置根日志记录器：根记录器只挂一个队列处理器，文件/控制台输出在监听线程中完成
+    log_queue 为 None 时使用进程内队列；多进程模式下传入 multiprocessing.Queue，
+    工作进程通过 setup_worker_logging 把日志发到同一个队列
+    """
+    global _listener
+    stop_logging()
+    handlers = _build_handlers(log_file, max_size_mb, retention_days, console)
+    if log_queue is None:
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+    else:
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def setup_worker_logging(log_queue, level='INFO'):
+    """工作进程日志：只入队到监管进程的日志队列（消息在本进程格式化后跨进程传递）"""
+    global _listener
+    # fork 继承的监听线程在子进程中并不存在，丢弃引用即可
+    _listener = None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def stop_logging():
+    """停止监听线程，写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
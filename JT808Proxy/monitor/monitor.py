@@ -13,6 +13,17 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from collections import deque
 
+try:
+    from ..core.event_loop import current_event_loop
+except ImportError:
+    import importlib.util
+    import os
+    event_loop_path = os.path.join(os.path.dirname(__file__), '../core/event_loop.py')
+    spec = importlib.util.spec_from_file_location("event_loop", event_loop_path)
+    event_loop = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(event_loop)
+    current_event_loop = event_loop.current_event_loop
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +46,8 @@ class TrafficMetrics:
     packets_sent: int = 0
     active_connections: int = 0
     total_connections: int = 0
+    rejected_connections: int = 0
+    throttled_frames: int = 0
     timestamp: datetime = field(default_factory=datetime.now)
 
 
@@ -54,6 +67,8 @@ class PerformanceMonitor:
             return
         
         self._monitoring = True
+        # 以非阻塞方式采样CPU，首次调用只建立基准
+        psutil.cpu_percent(interval=None)
         self._monitor_task = asyncio.create_task(self._monitor_loop(interval))
         logger.info(f"性能监控已启动，监控间隔: {interval}秒")
     
@@ -92,7 +107,8 @@ class PerformanceMonitor:
     def _collect_system_metrics(self) -> SystemMetrics:
         """收集系统指标"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # interval=None 返回自上次调用以来的使用率，不阻塞事件循环
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             network_io = psutil.net_io_counters()
@@ -144,7 +160,9 @@ class PerformanceMonitor:
                 'packets_received': current_traffic.packets_received,
                 'packets_sent': current_traffic.packets_sent,
                 'active_connections': current_traffic.active_connections,
-                'total_connections': current_traffic.total_connections
+                'total_connections': current_traffic.total_connections,
+                'rejected_connections': current_traffic.rejected_connections,
+                'throttled_frames': current_traffic.throttled_frames
             },
             'timestamp': datetime.now().isoformat()
         }
@@ -210,12 +228,15 @@ class MonitorManager:
         self.performance_monitor = PerformanceMonitor()
         self.alert_manager = AlertManager()
         self._monitoring = False
+        # 运行中的事件循环引擎（uvloop / asyncio），启动时检测
+        self.event_loop = "none"
     
     async def start(self):
         """启动监控"""
         if self._monitoring:
             return
         
+        self.event_loop = current_event_loop()
         await self.performance_monitor.start_monitoring()
         self._monitoring = True
         logger.info("监控管理器已启动")
@@ -245,5 +266,6 @@ class MonitorManager:
         return {
             'current_metrics': current_metrics,
             'recent_alerts': recent_alerts,
-            'monitoring_status': 'running' if self._monitoring else 'stopped'
+            'monitoring_status': 'running' if self._monitoring else 'stopped',
+            'event_loop': self.event_loop
         } 
\ No newline at end of file
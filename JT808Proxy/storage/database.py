@@ -4,10 +4,29 @@
 
 import sqlite3
 import logging
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
 logger = logging.getLogger(__name__)
 
+# 终端上报时间为 GMT+8，入库时换算为 UTC，与 CURRENT_TIMESTAMP 一致
+DEVICE_UTC_OFFSET = timedelta(hours=8)
+
+# 定位时间取终端上报的时间（0x0704 补传的盲区数据远早于入库时间），缺失或无效时取入库时间
+INSERT_LOCATION_SQL = """
+    INSERT INTO location_data (
+        terminal_phone, latitude, longitude, altitude, speed, direction,
+        alarm_flag, status_flag, fuel_level, mileage, engine_status, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+"""
+
+INSERT_MEDIA_SQL = """
+    INSERT INTO media_files (
+        terminal_phone, media_id, media_type, media_format, event_code, channel_id,
+        file_path, file_size, pkg_total, latitude, longitude, received_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 class DatabaseManager:
     def __init__(self, db_path: str = "jt808proxy.db"):
         self.db_path = db_path
@@ -62,6 +81,35 @@ class DatabaseManager:
                 engine_status INTEGER DEFAULT 0
             )
         """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS media_files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                terminal_phone TEXT NOT NULL,
+                media_id INTEGER NOT NULL,
+                media_type INTEGER,
+                media_format INTEGER,
+                event_code INTEGER,
+                channel_id INTEGER,
+                file_path TEXT NOT NULL,
+                file_size INTEGER,
+                pkg_total INTEGER,
+                latitude REAL,
+                longitude REAL,
+                received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # 系统配置（管理界面读写，TCP 服务启动时读取）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS system_configs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                value TEXT NOT NULL,
+                description TEXT,
+                category TEXT DEFAULT 'system',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
         self.conn.commit()
 
     def get_vehicle_by_phone(self, terminal_phone: str) -> Optional[Dict]:
@@ -95,12 +143,54 @@ class DatabaseManager:
     def insert_location_data(self, terminal_phone: str, msg_seq: int, location_data: dict):
         """插入定位数据"""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO location_data (
-                terminal_phone, latitude, longitude, altitude, speed, direction,
-                alarm_flag, status_flag, fuel_level, mileage, engine_status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(INSERT_LOCATION_SQL, self._location_row(terminal_phone, location_data))
+        self.conn.commit()
+
+    def insert_location_data_batch(self, records: list):
+        """批量插入定位数据，records 为 (terminal_phone, msg_seq, location_data) 列表，单个事务提交"""
+        if not records:
+            return
+        cursor = self.conn.cursor()
+        cursor.executemany(INSERT_LOCATION_SQL,
+                           [self._location_row(phone, data) for phone, _seq, data in records])
+        self.conn.commit()
+
+    def insert_media_record(self, record: dict):
+        """插入接收完成的多媒体文件记录"""
+        cursor = self.conn.cursor()
+        cursor.execute(INSERT_MEDIA_SQL, (
+            record['terminal_phone'], record['media_id'], record.get('media_type'),
+            record.get('media_format'), record.get('event_code'), record.get('channel_id'),
+            record['file_path'], record.get('file_size'), record.get('pkg_total'),
+            record.get('latitude'), record.get('longitude'), record.get('received_at')
+        ))
+        self.conn.commit()
+
+    def get_media_records(self, terminal_phone: str, limit: int = 100) -> list:
+        """获取终端的多媒体文件记录"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM media_files WHERE terminal_phone = ? ORDER BY id DESC LIMIT ?",
+                       (terminal_phone, limit))
+        return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _device_time_utc(device_time) -> Optional[str]:
+        """终端上报时间（GMT+8，'YYYY-MM-DD hh:mm:ss' 或 datetime）换算为 UTC 字符串，无效时返回None"""
+        if isinstance(device_time, str):
+            # BCD 时间未校验取值（如全0的 '2000-00-00 00:00:00'），按字段构造 datetime 校验
+            try:
+                device_time = datetime(int(device_time[0:4]), int(device_time[5:7]), int(device_time[8:10]),
+                                       int(device_time[11:13]), int(device_time[14:16]), int(device_time[17:19]))
+            except ValueError:
+                return None
+        if not isinstance(device_time, datetime):
+            return None
+        return (device_time - DEVICE_UTC_OFFSET).strftime('%Y-%m-%d %H:%M:%S')
+
+    @classmethod
+    def _location_row(cls, terminal_phone: str, location_data: dict) -> tuple:
+        device_time = cls._device_time_utc(location_data.get('time'))
+        return (
             terminal_phone,
             location_data.get('latitude', 0),
             location_data.get('longitude', 0),
@@ -111,9 +201,9 @@ class DatabaseManager:
             location_data.get('status', 0),
             location_data.get('fuel_consumption', 0),
             location_data.get('mileage', 0),
-            location_data.get('engine_status', 0)
-        ))
-        self.conn.commit()
+            location_data.get('engine_status', 0),
+            device_time
+        )
 
     def create_vehicle(self, terminal_phone: str, vehicle_id=None, plate_number=None, vehicle_type=None, manufacturer=None, model=None, color=None) -> int:
         cursor = self.conn.cursor()
@@ -315,6 +405,41 @@ class DatabaseManager:
             "active_terminals": active_terminals
         }
 
+    def get_config(self, key: str) -> Optional[Dict]:
+        """获取一项系统配置"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM system_configs WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def set_config(self, key: str, value: str, description: str = None, category: str = "system") -> bool:
+        """新增或更新一项系统配置（未给出描述时保留原描述）"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO system_configs (key, value, description, category) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value,
+                description = COALESCE(excluded.description, description),
+                category = excluded.category, updated_at = CURRENT_TIMESTAMP
+        """, (key, value, description, category))
+        self.conn.commit()
+        return True
+
+    def get_configs_by_category(self, category: str) -> list:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM system_configs WHERE category = ? ORDER BY key", (category,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_all_configs(self) -> list:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM system_configs ORDER BY key")
+        return [dict(row) for row in cursor.fetchall()]
+
+    def delete_config(self, key: str) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM system_configs WHERE key = ?", (key,))
+        self.conn.commit()
+        return cursor.rowcount > 0
+
     def close(self):
         """关闭数据库连接"""
         if self.conn:
@@ -37,6 +37,18 @@ class SystemConfig(BaseModel):
     tcp_port: int = Field(16900, description="TCP服务端口")
     tcp_max_connections: int = Field(1000, description="最大连接数")
     tcp_timeout: int = Field(30, description="连接超时时间(秒)")
+    tcp_max_connections_per_ip: int = Field(0, description="单个来源IP最大连接数(0为不限制)")
+    tcp_accept_rate: float = Field(200.0, description="每秒新建连接速率上限(0为不限制)")
+    tcp_accept_burst: float = Field(1000.0, description="新建连接突发上限")
+    tcp_frame_rate: float = Field(200.0, description="单连接每秒报文数上限(0为不限制)")
+    tcp_frame_burst: float = Field(500.0, description="单连接报文突发上限")
+    tcp_forward_heartbeats: bool = Field(True, description="是否将终端心跳转发到上游平台")
+    tcp_dedup_mode: str = Field("drop", description="终端重发报文处理方式(drop/flag/off)")
+    tcp_dedup_window: int = Field(256, description="重复报文检测的流水号窗口大小")
+    tcp_outbound_max_bytes: int = Field(65536, description="终端下行发送队列上限(字节)")
+    tcp_outbound_policy: str = Field("drop_oldest", description="终端下行队列溢出策略(drop_oldest/disconnect/spill)")
+    tcp_media_dir: str = Field("./data/media", description="多媒体上传文件保存目录")
+    event_loop: str = Field("auto", description="事件循环引擎(auto/uvloop/asyncio)")
     
     # Web服务配置
     web_port: int = Field(7000, description="Web服务端口")
@@ -52,12 +64,19 @@ class SystemConfig(BaseModel):
     forward_timeout: int = Field(30, description="转发超时时间(秒)")
     forward_max_retries: int = Field(3, description="最大重试次数")
     forward_target_server: str = Field("192.168.1.100:8080", description="目标服务器")
+    forward_queue_max_bytes: int = Field(1048576, description="上游转发发送队列上限(字节)")
+    forward_overflow_policy: str = Field("drop_oldest", description="上游转发队列溢出策略(drop_oldest/disconnect/spill)")
+    forward_mode: str = Field("one_to_one", description="转发模式(one_to_one/many_to_one/per_terminal)")
+    forward_max_links: int = Field(30000, description="每终端独立连接模式下的上游连接数上限")
+    forward_link_idle_timeout: int = Field(600, description="每终端独立连接空闲关闭时间(秒，0为不关闭)")
+    forward_upstream_replies: bool = Field(True, description="已转发的报文由上游平台应答，代理不再本地应答")
     
     # 日志配置
     log_level: str = Field("INFO", description="日志级别")
     log_file_path: str = Field("./logs/jt808proxy.log", description="日志文件路径")
     log_max_size: int = Field(100, description="最大日志文件大小(MB)")
     log_retention_days: int = Field(30, description="保留日志天数")
+    log_sample_rate: int = Field(1000, description="逐报文日志采样间隔(每N条报文记录1条)")
     
     # 监控配置
     monitor_enabled: bool = Field(True, description="启用链路监控")
@@ -2,6 +2,7 @@
 API启动脚本
 """
 
+import argparse
 import uvicorn
 import sys
 import os
@@ -9,11 +10,19 @@ import os
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from JT808Proxy.core.event_loop import LOOP_AUTO, LOOP_CHOICES, resolve_event_loop
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JT808Proxy API 服务")
+    parser.add_argument("--loop", default=LOOP_AUTO, choices=LOOP_CHOICES,
+                        help="事件循环引擎，auto 时已安装 uvloop 则使用 uvloop")
+    args = parser.parse_args()
+
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
         port=7700,
         reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+        log_level="info",
+        loop=resolve_event_loop(args.loop)
+    )
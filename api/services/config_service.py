@@ -7,7 +7,7 @@ from typing import List, Optional, Dict, Any
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from jt808proxy.storage.database import DatabaseManager
+from JT808Proxy.storage.database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
@@ -123,6 +123,18 @@ class ConfigService:
                 'tcp_port': '16900',
                 'tcp_max_connections': '1000',
                 'tcp_timeout': '30',
+                'tcp_max_connections_per_ip': '0',
+                'tcp_accept_rate': '200',
+                'tcp_accept_burst': '1000',
+                'tcp_frame_rate': '200',
+                'tcp_frame_burst': '500',
+                'tcp_forward_heartbeats': 'true',
+                'tcp_dedup_mode': 'drop',
+                'tcp_dedup_window': '256',
+                'tcp_outbound_max_bytes': '65536',
+                'tcp_outbound_policy': 'drop_oldest',
+                'tcp_media_dir': './data/media',
+                'event_loop': 'auto',
                 
                 # Web服务配置
                 'web_port': '7000',
@@ -138,12 +150,19 @@ class ConfigService:
                 'forward_timeout': '30',
                 'forward_max_retries': '3',
                 'forward_target_server': '192.168.1.100:8080',
+                'forward_queue_max_bytes': '1048576',
+                'forward_overflow_policy': 'drop_oldest',
+                'forward_mode': 'one_to_one',
+                'forward_max_links': '30000',
+                'forward_link_idle_timeout': '600',
+                'forward_upstream_replies': 'true',
                 
                 # 日志配置
                 'log_level': 'INFO',
                 'log_file_path': './logs/jt808proxy.log',
                 'log_max_size': '100',
                 'log_retention_days': '30',
+                'log_sample_rate': '1000',
                 
                 # 监控配置
                 'monitor_enabled': 'true',
@@ -15,7 +15,7 @@ from ..models.location import (
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from jt808proxy.storage.database import DatabaseManager
+from JT808Proxy.storage.database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+终端频繁上下线的内存基准
+每轮接入一批终端、各发一帧注册报文后断开（一半 FIN 正常关闭，一半 RST 复位），
+统计每轮结束后的活跃连接、会话、时间轮、准入计数与内存占用，验证长时间运行内存不增长
+用法: python benchmark_churn.py [每轮终端数] [轮数]
+"""
+
+import os
+import sys
+import time
+import socket
+import struct
+import asyncio
+import tempfile
+import tracemalloc
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Builder = load_module('builder').JT808Builder
+TCPServer = load_module('tcp_server').TCPServer
+
+REGISTER_BODY = bytes.fromhex('002c0100') + b'MAKER' + b'MODEL'.ljust(20, b'\x00') + b'TERM001' + b'\x00'
+
+
+class MemoryStorage:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+async def terminal(port: int, frame: bytes, reset: bool):
+    """接入、发送一帧并等待应答后断开；reset 为 True 时以 RST 复位连接"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(frame)
+    await writer.drain()
+    await reader.read(4096)
+    if reset:
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        writer.transport.abort()
+    else:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run(terminals: int, rounds: int):
+    media_dir = tempfile.TemporaryDirectory()
+    server = TCPServer(db_manager=MemoryStorage(), media_dir=media_dir.name, history_size=100,
+                       max_connections=terminals, accept_rate=0, frame_rate=0)
+    listener = await asyncio.start_server(server.handle_client, '127.0.0.1', 0, backlog=4096)
+    port = listener.sockets[0].getsockname()[1]
+    builder = JT808Builder()
+    frames = [builder.build(0x0100, f"139{i:08d}", REGISTER_BODY) for i in range(terminals)]
+
+    tracemalloc.start()
+    baseline = None
+    start = time.perf_counter()
+    for round_index in range(rounds):
+        for offset in range(0, terminals, 500):
+            await asyncio.gather(*(terminal(port, frames[i], i % 2 == 1)
+                                   for i in range(offset, min(offset + 500, terminals))))
+        while server.stats.active_connections:
+            await asyncio.sleep(0.01)
+        current = tracemalloc.get_traced_memory()[0]
+        if baseline is None:
+            baseline = current
+        stats = server.get_connection_stats()
+        print(f"第 {round_index + 1} 轮: 活跃连接 {stats['active_connections']}, "
+              f"会话 {stats['sessions']['sessions']}, 时间轮 {len(server.timer_wheel)}, "
+              f"准入 {stats['admission']['active']}, 拒绝 {stats['admission']['rejected_total']}, "
+              f"内存 {current / 1024:.0f} KB (较第1轮 {(current - baseline) / 1024:+.0f} KB)")
+        assert not server.connections and not len(server.sessions) and not len(server.timer_wheel)
+        assert stats['admission']['active'] == 0 and stats['admission']['rejected_total'] == 0
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    listener.close()
+    await listener.wait_closed()
+    media_dir.cleanup()
+    print(f"共 {terminals * rounds} 次上下线（其中一半为 RST 复位），耗时 {elapsed:.2f} 秒")
+
+
+def main():
+    terminals = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"每轮终端数: {terminals}, 轮数: {rounds}")
+    asyncio.run(run(terminals, rounds))
+
+
+if __name__ == "__main__":
+    main()
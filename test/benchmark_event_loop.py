@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+事件循环引擎性能基准
+分别以标准 asyncio 与 uvloop（已安装时）运行 TCP 服务，用终端模拟器构造报文，
+对比连接接入速率与单帧往返时延
+用法: python benchmark_event_loop.py [连接数] [时延采样帧数]
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import importlib.util
+
+# 动态加载模块
+test_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.abspath(os.path.join(test_dir, '../JT808Proxy/core'))
+storage_dir = os.path.abspath(os.path.join(test_dir, '../JT808Proxy/storage'))
+
+
+def load_module(name, directory=core_dir):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+event_loop = load_module('event_loop')
+frame_decoder = load_module('frame_decoder')
+tcp_server = load_module('tcp_server')
+database = load_module('database', storage_dir)
+simulator = load_module('test_simulator', test_dir)
+JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+encode_frame = frame_decoder.encode_frame
+
+HOST = '127.0.0.1'
+PORT = 16991
+ACCEPT_BATCH = 200
+
+
+def build_frame(sim, msg_id, body=b''):
+    """用模拟器构造报文，再按协议转义（模拟器本身不做转义）"""
+    packet = sim.create_jt808_header(msg_id, body)
+    return encode_frame(packet[1:-2])
+
+
+def server_main(engine: str):
+    """服务端进程"""
+    logging.getLogger().setLevel(logging.ERROR)
+
+    async def run():
+        server = tcp_server.TCPServer(HOST, PORT, db_manager=database.DatabaseManager(':memory:'))
+        await server.start()
+
+    event_loop.run(run(), engine)
+
+
+async def connect_and_register(index: int) -> float:
+    """建立一条连接并完成一次注册往返，返回耗时"""
+    sim = simulator.JT808Simulator(HOST, PORT)
+    sim.terminal_phone = f"1{index:010d}"
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(build_frame(sim, 0x0100, sim.create_register_data()))
+    await reader.readuntil(b'\x7e')
+    await reader.readuntil(b'\x7e')
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return elapsed
+
+
+async def bench_accept(connections: int) -> float:
+    """接入速率：每批 ACCEPT_BATCH 条连接并发建立并完成注册"""
+    start = time.perf_counter()
+    for offset in range(0, connections, ACCEPT_BATCH):
+        count = min(ACCEPT_BATCH, connections - offset)
+        await asyncio.gather(*(connect_and_register(offset + i) for i in range(count)))
+    return connections / (time.perf_counter() - start)
+
+
+async def bench_latency(samples: int):
+    """单帧时延：逐帧发送 0x0200 定位报文，等待 0x8001 应答"""
+    sim = simulator.JT808Simulator(HOST, PORT)
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    decoder = JT808FrameDecoder()
+    frames = [build_frame(sim, 0x0200, sim.create_location_data(39.9042, 116.4074)) for _ in range(samples)]
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        writer.write(frame)
+        received = 0
+        while not received:
+            data = await reader.read(4096)
+            if not data:
+                raise ConnectionError("服务端关闭了连接")
+            received = sum(1 for _ in decoder.feed(data))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    writer.close()
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def bench(engine: str, connections: int, samples: int):
+    ctx = multiprocessing.get_context('fork')
+    server = ctx.Process(target=server_main, args=(engine,))
+    server.start()
+    time.sleep(1.0)
+    try:
+        accept_rate = asyncio.run(bench_accept(connections))
+        p50, p99 = asyncio.run(bench_latency(samples))
+    finally:
+        server.terminate()
+        server.join(5)
+    return accept_rate, p50, p99
+
+
+def main():
+    logging.getLogger().setLevel(logging.ERROR)
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    engines = [event_loop.LOOP_ASYNCIO]
+    if event_loop.uvloop_available():
+        engines.append(event_loop.LOOP_UVLOOP)
+    else:
+        print("未安装 uvloop，仅测试标准 asyncio 事件循环 (pip install uvloop)")
+    print(f"连接数: {connections}, 时延采样帧数: {samples}")
+
+    for engine in engines:
+        accept_rate, p50, p99 = bench(engine, connections, samples)
+        print(f"{engine:>8}: 接入 {accept_rate:,.0f} 连接/秒, 单帧往返 p50 {p50:.0f}us / p99 {p99:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+流式帧解码器性能基准
+对比旧的"一次读取即一条报文"路径与 JT808FrameDecoder 的单核吞吐
+"""
+
+import os
+import sys
+import time
+import struct
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+frame_decoder = load_module('frame_decoder')
+jt808_parser = load_module('jt808_parser')
+JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+encode_frame = frame_decoder.encode_frame
+JT808Parser = jt808_parser.JT808Parser
+
+
+def build_location_frames(count: int):
+    """构造count条0x0200定位帧（线上格式）"""
+    frames = []
+    for seq in range(count):
+        body = struct.pack('>IIIIHHH', 0, 0, 39904200 + seq, 116407400, 50, 600, seq % 360)
+        body += bytes.fromhex('250101120000')
+        header = struct.pack('>HH', 0x0200, len(body)) + bytes.fromhex('013912345678') + struct.pack('>H', seq & 0xFFFF)
+        frames.append(encode_frame(header + body))
+    return frames
+
+
+def bench_chunk_per_message(frames):
+    """旧路径：每个读取块直接当作一条报文解析"""
+    start = time.perf_counter()
+    parsed = 0
+    for chunk in frames:
+        if JT808Parser.parse_header(chunk):
+            parsed += 1
+    return time.perf_counter() - start, parsed
+
+
+def bench_frame_decoder(stream: bytes, chunk_size: int):
+    """新路径：按 chunk_size 切分字节流送入流式解码器"""
+    decoder = JT808FrameDecoder()
+    start = time.perf_counter()
+    decoded = 0
+    for offset in range(0, len(stream), chunk_size):
+        for frame in decoder.feed(stream[offset:offset + chunk_size]):
+            decoded += 1
+    return time.perf_counter() - start, decoded
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    frames = build_location_frames(count)
+    stream = b''.join(frames)
+    print(f"帧数: {count}, 字节流: {len(stream)} 字节, 平均帧长: {len(stream) / count:.1f} 字节")
+
+    elapsed, parsed = bench_chunk_per_message(frames)
+    print(f"旧路径(一块一报文，仅解析头): {parsed / elapsed:,.0f} 帧/秒 (未处理转义/校验/粘包)")
+
+    for chunk_size in (256, 1024, 4096, 65536):
+        elapsed, decoded = bench_frame_decoder(stream, chunk_size)
+        assert decoded == count, f"解码帧数不符: {decoded} != {count}"
+        print(f"流式解码(读取块 {chunk_size:>5} 字节): {decoded / elapsed:,.0f} 帧/秒")
+
+    header_start = time.perf_counter()
+    decoder = JT808FrameDecoder()
+    for offset in range(0, len(stream), 4096):
+        for frame in decoder.feed(stream[offset:offset + 4096]):
+            JT808Parser.parse_header(frame)
+    total = time.perf_counter() - header_start
+    print(f"流式解码 + 解析头(4096): {count / total:,.0f} 帧/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+帧视图性能基准
+对比每帧构造 JT808Header + 字典、重新封装线上帧转发，与帧视图按需解码消息ID、原样取线上字节转发的
+单帧耗时和单帧分配（保留处理结果时的内存块数与字节数）
+用法: python benchmark_frame_view.py [帧数]
+"""
+
+import os
+import sys
+import time
+import struct
+import tracemalloc
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+frame_decoder = load_module('frame_decoder')
+JT808Parser = load_module('jt808_parser').JT808Parser
+JT808Frame = load_module('frame_view').JT808Frame
+JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+encode_frame = frame_decoder.encode_frame
+
+
+def build_stream(count: int) -> bytes:
+    """构造count条0x0200定位帧的线上字节流"""
+    frames = []
+    for seq in range(count):
+        body = struct.pack('>IIIIHHH', 0, 0, 39904200 + seq, 116407400, 50, 600, seq % 360)
+        body += bytes.fromhex('250101120000')
+        header = struct.pack('>HH', 0x0200, len(body)) + bytes.fromhex('013912345678') + struct.pack('>H', seq & 0xFFFF)
+        frames.append(encode_frame(header + body))
+    return b''.join(frames)
+
+
+def header_path(decoder, stream, out):
+    """旧路径：解析完整消息头并转为字典，重新封装线上帧用于转发"""
+    for frame in decoder.feed(stream):
+        header = JT808Parser.parse_header(frame)
+        out.append((header.msg_id, header.to_dict(), encode_frame(frame)))
+
+
+def view_path(decoder, stream, out):
+    """帧视图：只解码路由需要的消息ID，转发时取原始线上字节"""
+    current_wire = decoder.current_wire
+    for frame in decoder.feed(stream):
+        view = JT808Frame(frame, current_wire)
+        out.append((view.msg_id, view, view.wire))
+
+
+def bench(path, stream, count):
+    out = []
+    start = time.perf_counter()
+    path(JT808FrameDecoder(), stream, out)
+    elapsed = (time.perf_counter() - start) / count * 1e9
+    assert len(out) == count
+    del out
+
+    # 保留处理结果，统计每帧新增的内存块与字节数
+    out = []
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    path(JT808FrameDecoder(), stream, out)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+    return elapsed, blocks / count, size / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    stream = build_stream(count)
+    print(f"帧数: {count}")
+    results = {}
+    for label, path in (("消息头+字典", header_path), ("帧视图", view_path)):
+        elapsed, blocks, size = results[label] = bench(path, stream, count)
+        print(f"{label}: {elapsed:,.0f} ns/帧, {blocks:.1f} 块/帧, {size:,.0f} 字节/帧")
+    old, new = results["消息头+字典"], results["帧视图"]
+    print(f"耗时降低 {old[0] / new[0]:.1f} 倍, 分配块数降低 {old[1] / new[1]:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+心跳快速路径性能基准
+对比 0x0002 心跳走完整路径（解析头、日志、分发、转发、生成应答）与快速路径的单条CPU开销
+用法: python benchmark_heartbeat.py [心跳数]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import struct
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tcp_server = load_module('tcp_server')
+TCPServer = tcp_server.TCPServer
+JT808Frame = tcp_server.JT808Frame
+
+
+class NullWriter:
+    def write(self, data):
+        pass
+
+    def is_closing(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class NullStorage:
+    def insert_location_data(self, *args):
+        pass
+
+
+def build_heartbeats(count: int):
+    """构造count条已解码的心跳帧（与解码器输出一致的memoryview）"""
+    return [memoryview(bytearray(b'\x00\x02\x00\x00' + bytes.fromhex('013912345678') + struct.pack('>H', seq & 0xFFFF)))
+            for seq in range(count)]
+
+
+async def bench(server, session, frames, handler):
+    start = time.process_time()
+    replies = 0
+    for frame in frames:
+        if await handler(frame, session):
+            replies += 1
+    elapsed = time.process_time() - start
+    assert replies == len(frames), f"应答数不符: {replies} != {len(frames)}"
+    return elapsed
+
+
+async def run(count: int):
+    frames = build_heartbeats(count)
+    server = TCPServer(db_manager=NullStorage())
+    session = server.sessions.register('127.0.0.1:1', NullWriter(), tcp_server.ConnectionInfo('127.0.0.1', 1))
+    # 先走一次完整路径绑定手机号
+    await server._handle_frame(JT808Frame(frames[0]), session)
+
+    async def handle_frame(frame, session):
+        return await server._handle_frame(JT808Frame(frame), session)
+
+    full = await bench(server, session, frames, handle_frame)
+    print(f"完整路径: {full / count * 1e6:.2f} 微秒/条")
+    for forward in (True, False):
+        server.forward_heartbeats = forward
+        fast = await bench(server, session, frames, server._handle_heartbeat)
+        label = "转发" if forward else "不转发"
+        print(f"快速路径({label}): {fast / count * 1e6:.2f} 微秒/条 (提升 {full / fast:.1f} 倍)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    asyncio.run(run(count))
+
+
+if __name__ == "__main__":
+    main()
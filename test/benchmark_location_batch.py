@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+定位报文批量解码性能基准
+对比逐帧 JT808Parser.parse_location_data（每帧一个字典）与 NumPy 向量化批量解码
+用法: python benchmark_location_batch.py [记录数]，默认 1,000,000 条
+"""
+
+import os
+import sys
+import time
+import struct
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+location_batch = load_module('location_batch')
+JT808Parser = load_module('jt808_parser').JT808Parser
+
+
+def build_location_frames(count: int):
+    """构造count条已解码的0x0200定位帧（消息头+消息体）"""
+    frames = []
+    for seq in range(count):
+        body = struct.pack('>IIIIHHH', 0, 0, 39904200 + seq % 100000, 116407400, 50, 600, seq % 360)
+        body += bytes.fromhex('250101120000')
+        header = struct.pack('>HH', 0x0200, len(body)) + bytes.fromhex('013912345678') + struct.pack('>H', seq & 0xFFFF)
+        frames.append(header + body)
+    return frames
+
+
+def main():
+    if not location_batch.numpy_available():
+        print("需要安装 numpy")
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    frames = build_location_frames(count)
+    buffer = b''.join(frames)
+    offsets = [index * len(frames[0]) for index in range(count)]
+    print(f"记录数: {count:,}")
+
+    start = time.perf_counter()
+    records = [JT808Parser.parse_location_data(frame, 12) for frame in frames]
+    per_frame = time.perf_counter() - start
+    assert len(records) == count
+    print(f"逐帧解析(字典): {per_frame:.2f} 秒, {per_frame / count * 1e9:,.0f} ns/条")
+
+    start = time.perf_counter()
+    result = location_batch.decode_locations(frames)
+    from_list = time.perf_counter() - start
+    assert result['valid'].all()
+    print(f"批量解码(帧列表): {from_list:.2f} 秒, {from_list / count * 1e9:,.0f} ns/条 (提升 {per_frame / from_list:.1f} 倍)")
+
+    start = time.perf_counter()
+    result = location_batch.decode_location_buffer(buffer, offsets)
+    from_buffer = time.perf_counter() - start
+    assert result['valid'].all()
+    print(f"批量解码(拼接缓冲区): {from_buffer:.2f} 秒, {from_buffer / count * 1e9:,.0f} ns/条 (提升 {per_frame / from_buffer:.1f} 倍)")
+
+
+if __name__ == "__main__":
+    main()
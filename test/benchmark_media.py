@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+多媒体上传内存基准
+多个终端交替上传大文件时，对比分包重组器（整文件缓存在内存）与多媒体接收器（逐包落盘）的内存峰值
+用法: python benchmark_media.py [终端数] [每个文件KB]
+"""
+
+import os
+import sys
+import time
+import struct
+import asyncio
+import tempfile
+import tracemalloc
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Parser = load_module('jt808_parser').JT808Parser
+JT808Builder = load_module('builder').JT808Builder
+SubpackageReassembler = load_module('reassembly').SubpackageReassembler
+MediaUploadSink = load_module('media').MediaUploadSink
+
+CHUNK_SIZE = 1000
+LOCATION = struct.pack('>IIIIHHH', 0, 2, 39904200, 116407400, 50, 600, 90) + bytes.fromhex('250101120000')
+
+
+def fragment_stream(terminals: int, file_size: int):
+    """按包序号交替产出各终端的 0x0801 分包帧，模拟多个终端同时上传"""
+    builder = JT808Builder()
+    data = os.urandom(file_size)
+    payload_size = 36 + file_size
+    pkg_total = -(-payload_size // CHUNK_SIZE)
+    for index in range(1, pkg_total + 1):
+        for terminal in range(terminals):
+            phone = f"139{terminal:08d}"
+            if index == 1:
+                chunk = struct.pack('>IBBBB', terminal, 0, 0, 0, 1) + LOCATION + data[:CHUNK_SIZE - 36]
+            else:
+                start = (index - 1) * CHUNK_SIZE - 36
+                chunk = data[start:start + CHUNK_SIZE]
+            yield builder.build_content(0x0801, phone, chunk, seq=index, pkg_total=pkg_total, pkg_index=index)
+
+
+async def bench(add, terminals: int, file_size: int):
+    """add 为协程函数（多媒体接收器的文件操作在执行器中完成）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    completed = 0
+    for frame in fragment_stream(terminals, file_size):
+        if await add(JT808Parser.parse_header(frame), frame):
+            completed += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert completed == terminals, f"完成数不符: {completed} != {terminals}"
+    return elapsed, peak
+
+
+def main():
+    terminals = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    file_size = (int(sys.argv[2]) if len(sys.argv) > 2 else 2048) * 1024
+    print(f"终端数: {terminals}, 每个文件: {file_size // 1024} KB")
+
+    reassembler = SubpackageReassembler(max_bytes_per_terminal=file_size * 2, max_total_bytes=file_size * terminals * 2)
+    async def reassemble(header, frame):
+        return reassembler.add_fragment(header, frame)
+
+    elapsed, peak = asyncio.run(bench(reassemble, terminals, file_size))
+    print(f"分包重组器(内存): 内存峰值 {peak / 1024 / 1024:.1f} MB, 耗时 {elapsed:.2f} 秒")
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        sink = MediaUploadSink(media_dir)
+        elapsed, peak = asyncio.run(bench(sink.add_fragment, terminals, file_size))
+        sink.close()
+        print(f"多媒体接收器(落盘): 内存峰值 {peak / 1024 / 1024:.1f} MB, 耗时 {elapsed:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
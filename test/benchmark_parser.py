@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+JT808Parser 解析性能基准
+对比旧实现（切片 + int.from_bytes + f-string 逐字节BCD）与预编译 struct + BCD 查表实现的每帧耗时
+用法: python benchmark_parser.py [帧数]
+"""
+
+import os
+import sys
+import time
+import struct
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Parser = load_module('jt808_parser').JT808Parser
+
+
+class LegacyParser:
+    """旧实现"""
+
+    @staticmethod
+    def parse_header(data):
+        if len(data) < 12:
+            return None
+        msg_id = int.from_bytes(data[0:2], 'big')
+        body_props = int.from_bytes(data[2:4], 'big')
+        phone = ''.join(f"{(b>>4)&0xF}{b&0xF}" for b in data[4:10]).lstrip('0')
+        msg_seq = int.from_bytes(data[10:12], 'big')
+        pkg_total = pkg_index = None
+        if (body_props & 0x2000) != 0 and len(data) >= 16:
+            pkg_total = int.from_bytes(data[12:14], 'big')
+            pkg_index = int.from_bytes(data[14:16], 'big')
+        return msg_id, body_props, phone, msg_seq, pkg_total, pkg_index
+
+    @staticmethod
+    def parse_location_data(data, offset=0):
+        if len(data) < offset + 28:
+            return None
+        alarm_flag = int.from_bytes(data[offset:offset+4], 'big')
+        status = int.from_bytes(data[offset+4:offset+8], 'big')
+        latitude = int.from_bytes(data[offset+8:offset+12], 'big') / 1000000.0
+        longitude = int.from_bytes(data[offset+12:offset+16], 'big') / 1000000.0
+        altitude = int.from_bytes(data[offset+16:offset+18], 'big')
+        speed = int.from_bytes(data[offset+18:offset+20], 'big')
+        direction = int.from_bytes(data[offset+20:offset+22], 'big')
+        time_str = ''.join(f"{b>>4}{b&0xF:02d}" for b in data[offset+22:offset+28])
+        time_str = f"20{time_str[:2]}-{time_str[2:4]}-{time_str[4:6]} {time_str[6:8]}:{time_str[8:10]}:{time_str[10:12]}"
+        return {
+            'alarm_flag': alarm_flag, 'status': status, 'latitude': latitude, 'longitude': longitude,
+            'altitude': altitude, 'speed': speed, 'direction': direction, 'time': time_str
+        }
+
+
+def build_location_frames(count: int):
+    """构造count条已解码的0x0200定位帧（消息头+消息体，memoryview）"""
+    frames = []
+    for seq in range(count):
+        body = struct.pack('>IIIIHHH', 0, 0, 39904200 + seq, 116407400, 50, 600, seq % 360)
+        body += bytes.fromhex('250101120000')
+        header = struct.pack('>HH', 0x0200, len(body)) + bytes.fromhex('013912345678') + struct.pack('>H', seq & 0xFFFF)
+        frames.append(memoryview(header + body))
+    return frames
+
+
+def bench(parser, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        parser.parse_header(frame)
+        parser.parse_location_data(frame, 12)
+    return (time.perf_counter() - start) / len(frames) * 1e9
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    frames = build_location_frames(count)
+    legacy = bench(LegacyParser, frames)
+    current = bench(JT808Parser, frames)
+    print(f"帧数: {count}")
+    print(f"旧实现(切片 + int.from_bytes): {legacy:,.0f} ns/帧")
+    print(f"struct + BCD查表: {current:,.0f} ns/帧 (提升 {legacy / current:.1f} 倍)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+会话对象内存与单包统计开销基准
+对比旧实现（dataclass + datetime + 每包两次 asyncio.Lock）与
+__slots__ 会话 + 单调时钟 + 无锁计数，在 20k 会话规模下的每会话内存和每包开销
+用法: python benchmark_sessions.py [会话数] [每会话报文数]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+import importlib.util
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tcp_server = load_module('tcp_server')
+session_module = load_module('session')
+ConnectionInfo = tcp_server.ConnectionInfo
+ConnectionStatus = tcp_server.ConnectionStatus
+TerminalSession = session_module.TerminalSession
+
+
+@dataclass
+class LegacyConnectionInfo:
+    """旧实现的连接信息"""
+    remote_addr: str
+    remote_port: int
+    connect_time: datetime
+    last_activity: datetime
+    status: ConnectionStatus = ConnectionStatus.CONNECTED
+    bytes_received: int = 0
+    bytes_sent: int = 0
+    packets_received: int = 0
+    packets_sent: int = 0
+    disconnect_reason: Optional[str] = None
+    terminal_phone: Optional[str] = None
+
+
+class LegacyTerminalSession:
+    """旧实现的会话对象（无 __slots__）"""
+
+    def __init__(self, client_id, writer, info=None):
+        self.client_id = client_id
+        self.writer = writer
+        self.info = info
+        self.phone = None
+        self.outbound = None
+        self.timer_deadline = 0.0
+        self.timer_slot = None
+        self.frame_bucket = None
+
+
+class Stats:
+    total_bytes_received = 0
+    total_bytes_sent = 0
+    total_packets_received = 0
+    total_packets_sent = 0
+
+
+def measure_memory(count: int, factory) -> float:
+    """创建count个会话，返回每会话分配的字节数"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(sessions) == count
+    return (after - before) / count
+
+
+def legacy_factory(i):
+    info = LegacyConnectionInfo(remote_addr='10.0.0.1', remote_port=i,
+                                connect_time=datetime.now(), last_activity=datetime.now())
+    return LegacyTerminalSession(f"10.0.0.1:{i}", None, info)
+
+
+def slots_factory(i):
+    info = ConnectionInfo('10.0.0.1', i)
+    return TerminalSession(f"10.0.0.1:{i}", None, info)
+
+
+async def legacy_packets(infos, packets: int) -> float:
+    """旧路径：每包两次加锁并刷新 datetime"""
+    lock = asyncio.Lock()
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in range(packets):
+        for info in infos:
+            async with lock:
+                info.last_activity = datetime.now()
+                info.bytes_received += 30
+                stats.total_bytes_received += 30
+            info.packets_received += 1
+            stats.total_packets_received += 1
+            async with lock:
+                info.bytes_sent += 20
+                info.packets_sent += 1
+                stats.total_bytes_sent += 20
+                stats.total_packets_sent += 1
+    return time.perf_counter() - start
+
+
+async def slots_packets(infos, packets: int) -> float:
+    """新路径：单调时钟 + 无锁计数"""
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in range(packets):
+        for info in infos:
+            now = time.monotonic()
+            info.last_activity_mono = now
+            info.bytes_received += 30
+            stats.total_bytes_received += 30
+            info.packets_received += 1
+            stats.total_packets_received += 1
+            info.bytes_sent += 20
+            info.packets_sent += 1
+            stats.total_bytes_sent += 20
+            stats.total_packets_sent += 1
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    packets = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"会话数: {count}, 每会话报文数: {packets}")
+
+    legacy_mem = measure_memory(count, legacy_factory)
+    slots_mem = measure_memory(count, slots_factory)
+    print(f"每会话内存: 旧 {legacy_mem:.0f} 字节 -> 新 {slots_mem:.0f} 字节 "
+          f"({(1 - slots_mem / legacy_mem) * 100:.0f}% 减少)")
+
+    legacy_infos = [legacy_factory(i).info for i in range(count)]
+    slots_infos = [slots_factory(i).info for i in range(count)]
+    total = count * packets
+    legacy_time = asyncio.run(legacy_packets(legacy_infos, packets))
+    slots_time = asyncio.run(slots_packets(slots_infos, packets))
+    print(f"每包统计开销: 旧 {legacy_time / total * 1e9:.0f} ns -> 新 {slots_time / total * 1e9:.0f} ns "
+          f"({legacy_time / slots_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
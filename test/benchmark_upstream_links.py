@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+每终端独立上游连接基准
+大量终端轮流转发报文时，统计上游连接数峰值、LRU 关闭次数、因链路关闭被断开的终端数与转发吞吐，
+验证连接数不超过预算，且终端数超过预算时在线终端不会轮流被断开
+用法: python benchmark_upstream_links.py [终端数] [连接数上限] [轮数]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Builder = load_module('builder').JT808Builder
+Forwarder = load_module('forwarder').Forwarder
+
+
+async def run(terminals: int, max_links: int, rounds: int, link_evict_idle: float = None):
+    accepted = 0
+    active = 0
+    unlinked = []
+
+    async def handle(reader, writer):
+        nonlocal accepted, active
+        accepted += 1
+        active += 1
+        while await reader.read(4096):
+            pass
+        active -= 1
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0, backlog=4096)
+    port = server.sockets[0].getsockname()[1]
+    # 链路关闭时服务器会断开其终端（失去上游鉴权），这里只记录
+    options = {} if link_evict_idle is None else {'link_evict_idle': link_evict_idle}
+    forwarder = Forwarder(max_links=max_links, on_link_closed=unlinked.append, **options)
+    forwarder.set_forwarding_mode('per_terminal')
+    forwarder.set_default_target('127.0.0.1', port)
+
+    builder = JT808Builder()
+    phones = [f"139{i:08d}" for i in range(terminals)]
+    frames = {phone: builder.build(0x0002, phone) for phone in phones}
+    peak = 0
+    forwarded = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for phone in phones:
+            ok = await forwarder.forward_packet(phone, frames[phone])
+            if not ok and forwarder._connecting:
+                # 连接数预算被建连中的链路占满时，等建连完成后重试（相当于终端重传）
+                await forwarder.flush(timeout=10)
+                ok = await forwarder.forward_packet(phone, frames[phone])
+            if ok:
+                forwarded += 1
+            peak = max(peak, len(forwarder.config.target_queues) + len(forwarder._connecting))
+        await forwarder.flush(timeout=10)
+    elapsed = time.perf_counter() - start
+
+    forwarder.close()
+    while active:
+        await asyncio.sleep(0.01)
+    server.close()
+    await server.wait_closed()
+    stats = forwarder.get_forwarding_stats()["links"]
+    total = terminals * rounds
+    print(f"转发 {forwarded}/{total} 帧（其余由代理本地应答）, 耗时 {elapsed:.2f} 秒 ({total / elapsed:.0f} 帧/秒)")
+    print(f"上游连接峰值: {peak} (上限 {max_links}), 累计建立: {stats['opened']}, "
+          f"LRU关闭: {stats['evicted']}, 拒绝: {stats['rejected']}, 上游接受连接: {accepted}, "
+          f"被断开终端: {len(unlinked)}")
+    assert peak <= max_links, f"连接数超出上限: {peak} > {max_links}"
+    return unlinked
+
+
+def main():
+    terminals = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    max_links = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"终端数: {terminals}, 连接数上限: {max_links}, 轮数: {rounds}")
+    # 终端都在线且持续收发：链路不被关闭，超出预算的终端由代理本地应答，不断开任何终端
+    unlinked = asyncio.run(run(terminals, max_links, rounds))
+    assert not unlinked, f"在线终端被断开: {len(unlinked)}"
+    # 链路都已空闲（空闲阈值为0）：按 LRU 关闭空闲链路，其终端被断开后重新注册
+    print("空闲阈值 0 秒（所有链路都视为空闲）:")
+    asyncio.run(run(terminals, max_links, rounds, link_evict_idle=0))
+    # 不超出预算时每个终端只建立一次连接
+    print(f"终端数: {max_links}:")
+    asyncio.run(run(max_links, max_links, rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+多进程接入性能基准
+以 1..N 个 SO_REUSEPORT 工作进程启动服务，多进程压测端并发发送 0x0200 定位帧，
+统计收到平台应答的帧率，观察吞吐随工作进程数的扩展情况
+用法: python benchmark_workers.py [最大工作进程数] [每连接帧数]
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+import tempfile
+import time
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+frame_decoder = load_module('frame_decoder')
+supervisor = load_module('supervisor')
+JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+encode_frame = frame_decoder.encode_frame
+WorkerSupervisor = supervisor.WorkerSupervisor
+
+HOST = '127.0.0.1'
+PORT = 16990
+CONNECTIONS_PER_CLIENT = 50
+BATCH = 50
+
+
+def build_frames(phone: str, count: int):
+    """构造某终端的count条0x0200定位帧"""
+    frames = []
+    for seq in range(count):
+        body = struct.pack('>IIIIHHH', 0, 0, 39904200 + seq, 116407400, 50, 600, seq % 360)
+        body += bytes.fromhex('250101120000')
+        header = struct.pack('>HH', 0x0200, len(body)) + bytes.fromhex(phone) + struct.pack('>H', seq & 0xFFFF)
+        frames.append(encode_frame(header + body))
+    return frames
+
+
+async def run_terminal(phone: str, frames_per_conn: int) -> int:
+    """单个模拟终端：按批发送，等待本批应答全部收到后再发下一批"""
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    frames = build_frames(phone, frames_per_conn)
+    decoder = JT808FrameDecoder()
+    replies = 0
+    for offset in range(0, len(frames), BATCH):
+        batch = frames[offset:offset + BATCH]
+        writer.write(b''.join(batch))
+        expected = replies + len(batch)
+        while replies < expected:
+            data = await reader.read(65536)
+            if not data:
+                writer.close()
+                return replies
+            replies += sum(1 for _ in decoder.feed(data))
+    writer.close()
+    return replies
+
+
+def client_main(client_id: int, frames_per_conn: int, result_queue):
+    """压测进程"""
+    async def run():
+        phones = [f"{client_id:04d}{i:08d}" for i in range(CONNECTIONS_PER_CLIENT)]
+        results = await asyncio.gather(*(run_terminal(p, frames_per_conn) for p in phones))
+        return sum(results)
+    result_queue.put(asyncio.run(run()))
+
+
+def server_main(workers: int, db_path: str):
+    """服务端进程"""
+    WorkerSupervisor(host=HOST, port=PORT, workers=workers, db_path=db_path,
+                     log_level=logging.ERROR).run()
+
+
+def bench(workers: int, clients: int, frames_per_conn: int) -> float:
+    ctx = multiprocessing.get_context('fork')
+    db_path = os.path.join(tempfile.mkdtemp(prefix="jt808_bench_"), "bench.db")
+    server = ctx.Process(target=server_main, args=(workers, db_path))
+    server.start()
+    time.sleep(1.0 + 0.2 * workers)
+
+    result_queue = ctx.Queue()
+    start = time.perf_counter()
+    procs = [ctx.Process(target=client_main, args=(i, frames_per_conn, result_queue)) for i in range(clients)]
+    for p in procs:
+        p.start()
+    total = sum(result_queue.get() for _ in procs)
+    elapsed = time.perf_counter() - start
+    for p in procs:
+        p.join()
+
+    server.terminate()
+    server.join(10)
+    return total / elapsed
+
+
+def main():
+    logging.getLogger().setLevel(logging.ERROR)
+    if not WorkerSupervisor.is_supported():
+        print("当前平台不支持 SO_REUSEPORT，无法运行多进程基准")
+        return
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else min(8, os.cpu_count() or 1)
+    frames_per_conn = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    clients = max(2, max_workers)
+    print(f"CPU核数: {os.cpu_count()}, 压测进程: {clients}, "
+          f"每进程连接: {CONNECTIONS_PER_CLIENT}, 每连接帧数: {frames_per_conn}")
+
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        rate = bench(workers, clients, frames_per_conn)
+        baseline = baseline or rate
+        print(f"工作进程 {workers}: {rate:,.0f} 帧/秒 (相对单进程 {rate / baseline:.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+连接准入控制单元测试
+"""
+import os
+import socket
+import struct
+import asyncio
+import tempfile
+import unittest
+import importlib.util
+
+# 动态加载admission模块
+admission_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/admission.py'))
+spec = importlib.util.spec_from_file_location("admission", admission_path)
+admission = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(admission)
+TokenBucket = admission.TokenBucket
+AdmissionController = admission.AdmissionController
+
+core_dir = os.path.dirname(admission_path)
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Builder = load_module('builder').JT808Builder
+TCPServer = load_module('tcp_server').TCPServer
+
+
+class MemoryStorage:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_and_refill(self):
+        bucket = TokenBucket(rate=10, burst=3, now=0.0)
+        self.assertTrue(all(bucket.consume(0.0) for _ in range(3)))
+        self.assertFalse(bucket.consume(0.0))
+        self.assertTrue(bucket.consume(0.1))
+        self.assertFalse(bucket.consume(0.1))
+        # 补充不超过 burst
+        bucket.consume(100.0)
+        self.assertEqual(bucket.tokens, 2)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_global_cap(self):
+        ctrl = AdmissionController(max_connections=2, accept_rate=0)
+        self.assertIsNone(ctrl.admit('1.1.1.1'))
+        self.assertIsNone(ctrl.admit('2.2.2.2'))
+        self.assertEqual(ctrl.admit('3.3.3.3'), admission.REJECT_MAX_CONNECTIONS)
+        ctrl.release('1.1.1.1')
+        self.assertIsNone(ctrl.admit('3.3.3.3'))
+        self.assertEqual(ctrl.rejected_total, 1)
+
+    def test_per_ip_cap(self):
+        ctrl = AdmissionController(max_connections=0, max_per_ip=1, accept_rate=0)
+        self.assertIsNone(ctrl.admit('1.1.1.1'))
+        self.assertEqual(ctrl.admit('1.1.1.1'), admission.REJECT_MAX_PER_IP)
+        self.assertIsNone(ctrl.admit('2.2.2.2'))
+        ctrl.release('1.1.1.1')
+        self.assertIsNone(ctrl.admit('1.1.1.1'))
+        self.assertEqual(ctrl.get_stats()['source_ips'], 2)
+
+    def test_accept_rate(self):
+        ctrl = AdmissionController(max_connections=0, accept_rate=1, accept_burst=2)
+        self.assertIsNone(ctrl.admit('1.1.1.1', now=ctrl._accept_bucket.updated))
+        self.assertIsNone(ctrl.admit('1.1.1.1', now=ctrl._accept_bucket.updated))
+        self.assertEqual(ctrl.admit('1.1.1.1', now=ctrl._accept_bucket.updated), admission.REJECT_ACCEPT_RATE)
+        # 被拒绝的连接不占用名额
+        self.assertEqual(ctrl.active, 2)
+
+    def test_frame_bucket_disabled(self):
+        self.assertIsNone(AdmissionController(frame_rate=0).new_frame_bucket())
+        self.assertIsNotNone(AdmissionController(frame_rate=5).new_frame_bucket())
+
+
+class TestServerAdmission(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.server = TCPServer(db_manager=MemoryStorage(), media_dir=self.media_dir.name, max_connections=3)
+        self.listener = await asyncio.start_server(self.server.handle_client, '127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.builder = JT808Builder()
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.media_dir.cleanup()
+
+    async def wait_idle(self, timeout=2.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while self.server.stats.active_connections:
+            if asyncio.get_running_loop().time() > deadline:
+                raise AssertionError("连接未清理")
+            await asyncio.sleep(0.01)
+
+    async def test_reset_connections_release_resources(self):
+        # 对端以 RST 断开（SO_LINGER 0），超过连接上限次数后新终端仍可接入
+        for index in range(5):
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+            writer.write(self.builder.build(0x0002, f'1391234{index:04d}', seq=1))
+            await writer.drain()
+            await reader.read(4096)
+            sock = writer.get_extra_info('socket')
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            writer.transport.abort()
+            await self.wait_idle()
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(self.builder.build(0x0002, '13900000000', seq=1))
+        await writer.drain()
+        self.assertTrue(await asyncio.wait_for(reader.read(4096), 1.0))
+        writer.close()
+        await self.wait_idle()
+
+        stats = self.server.get_connection_stats()
+        self.assertEqual(stats["admission"]["active"], 0)
+        self.assertEqual(stats["admission"]["rejected_total"], 0)
+        self.assertEqual(stats["sessions"]["sessions"], 0)
+        self.assertEqual(self.server.connections, {})
+        self.assertEqual(len(self.server.timer_wheel), 0)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,13 +5,13 @@
 import sys
 import os
 import asyncio
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 直接导入
-from jt808proxy.storage.database import DatabaseManager
+from JT808Proxy.storage.database import DatabaseManager
 
 def test_database():
     """测试数据库功能"""
@@ -97,5 +97,50 @@ def test_database():
             print("测试数据库文件已清理")
 
 
+def test_location_device_time():
+    """定位数据按终端上报时间入库（批量补传的数据保留原始时间），GMT+8 换算为 UTC"""
+    db_manager = DatabaseManager(":memory:")
+    try:
+        records = [
+            ('13912345678', seq, {'latitude': 39.9, 'longitude': 116.4, 'time': f'2024-01-01 0{seq}:00:00'})
+            for seq in range(3)
+        ]
+        db_manager.insert_location_data_batch(records)
+        db_manager.insert_location_data('13912345678', 3, {'latitude': 39.9, 'longitude': 116.4,
+                                                           'time': datetime(2024, 1, 1, 3, 0, 0)})
+        # 没有上报时间、或上报时间无效（全0的 BCD 时间、不存在的日期）时取入库时间（UTC）
+        before = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        db_manager.insert_location_data('13912345678', 4, {'latitude': 39.9, 'longitude': 116.4})
+        db_manager.insert_location_data('13912345678', 5, {'latitude': 39.9, 'longitude': 116.4,
+                                                           'time': '2000-00-00 00:00:00'})
+        db_manager.insert_location_data('13912345678', 6, {'latitude': 39.9, 'longitude': 116.4,
+                                                           'time': '2024-02-30 12:00:00'})
+        rows = db_manager.get_location_data('13912345678', limit=10)
+        timestamps = sorted(row['timestamp'] for row in rows)
+        assert timestamps[:4] == ['2023-12-31 16:00:00', '2023-12-31 17:00:00',
+                                  '2023-12-31 18:00:00', '2023-12-31 19:00:00'], timestamps
+        assert all(timestamp >= before for timestamp in timestamps[4:]), timestamps
+    finally:
+        db_manager.close()
+
+
+def test_system_configs():
+    """系统配置读写（管理界面保存，TCP 服务启动时读取）"""
+    db_manager = DatabaseManager(":memory:")
+    try:
+        assert db_manager.get_config('tcp_max_connections') is None
+        db_manager.set_config('tcp_max_connections', '1000', '最大连接数')
+        db_manager.set_config('tcp_max_connections', '5000')
+        db_manager.set_config('forward_mode', 'per_terminal', category='forward')
+        config = db_manager.get_config('tcp_max_connections')
+        assert (config['value'], config['description']) == ('5000', '最大连接数'), config
+        assert [row['key'] for row in db_manager.get_all_configs()] == ['forward_mode', 'tcp_max_connections']
+        assert [row['key'] for row in db_manager.get_configs_by_category('forward')] == ['forward_mode']
+        assert db_manager.delete_config('forward_mode')
+        assert not db_manager.delete_config('forward_mode')
+    finally:
+        db_manager.close()
+
+
 if __name__ == "__main__":
     test_database() 
\ No newline at end of file
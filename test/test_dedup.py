@@ -0,0 +1,242 @@
+"""
+重复报文抑制单元测试
+"""
+import os
+import struct
+import asyncio
+import tempfile
+import unittest
+import importlib.util
+
+# 动态加载dedup模块
+dedup_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/dedup.py'))
+spec = importlib.util.spec_from_file_location("dedup", dedup_path)
+dedup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dedup)
+SequenceWindow = dedup.SequenceWindow
+DuplicateFilter = dedup.DuplicateFilter
+DuplicateMode = dedup.DuplicateMode
+
+
+def load_module(name):
+    path = os.path.abspath(os.path.join(os.path.dirname(__file__), f'../JT808Proxy/core/{name}.py'))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeSession:
+    def __init__(self):
+        self.seq_window = None
+
+
+class TestSequenceWindow(unittest.TestCase):
+    def test_repeat_and_out_of_order(self):
+        window = SequenceWindow()
+        self.assertFalse(window.seen(10, 64))
+        self.assertTrue(window.seen(10, 64))
+        self.assertFalse(window.seen(12, 64))
+        # 乱序到达的较早流水号不是重复
+        self.assertFalse(window.seen(11, 64))
+        self.assertTrue(window.seen(11, 64))
+        self.assertTrue(window.seen(12, 64))
+
+    def test_wraparound(self):
+        window = SequenceWindow()
+        self.assertFalse(window.seen(0xFFFE, 64))
+        self.assertFalse(window.seen(0xFFFF, 64))
+        self.assertFalse(window.seen(0, 64))
+        self.assertFalse(window.seen(1, 64))
+        self.assertTrue(window.seen(0xFFFF, 64))
+        self.assertTrue(window.seen(0, 64))
+
+    def test_same_seq_different_fingerprint(self):
+        window = SequenceWindow()
+        self.assertFalse(window.seen(10, 64, 0x020011))
+        self.assertTrue(window.seen(10, 64, 0x020011))
+        # 流水号相同但消息ID或校验码不同：不是重发，记录新的指纹
+        self.assertFalse(window.seen(10, 64, 0x020022))
+        self.assertTrue(window.seen(10, 64, 0x020022))
+        self.assertFalse(window.seen(10, 64, 0x020011))
+
+    def test_fresh_window_backward_jump_resets(self):
+        window = SequenceWindow()
+        for seq in range(1, 120):
+            window.seen(seq, 256, seq)
+        # 交接到新连接后首个报文流水号回退且指纹不同：终端重启，重新计数
+        window.fresh = True
+        self.assertFalse(window.seen(1, 256, 1000))
+        self.assertEqual(window.highest, 1)
+        self.assertFalse(window.seen(2, 256, 2))
+        self.assertFalse(window.seen(3, 256, 3))
+
+    def test_fresh_window_retransmit_detected(self):
+        window = SequenceWindow()
+        for seq in range(1, 120):
+            window.seen(seq, 256, seq)
+        window.fresh = True
+        self.assertTrue(window.seen(118, 256, 118))
+        self.assertEqual(window.highest, 119)
+        self.assertTrue(window.seen(119, 256, 119))
+
+    def test_large_jump_and_restart(self):
+        window = SequenceWindow()
+        window.seen(100, 64)
+        # 前移超过窗口大小时旧记录全部失效
+        self.assertFalse(window.seen(300, 64))
+        self.assertFalse(window.seen(101, 64))
+        self.assertTrue(window.seen(101, 64))
+
+
+class TestDuplicateFilter(unittest.TestCase):
+    def test_counts_and_hit_rate(self):
+        dup_filter = DuplicateFilter(window_size=64)
+        session = FakeSession()
+        results = [dup_filter.is_duplicate(session, seq) for seq in (1, 2, 2, 3, 1)]
+        self.assertEqual(results, [False, False, True, False, True])
+        self.assertIsNotNone(session.seq_window)
+        stats = dup_filter.get_stats()
+        self.assertEqual(stats["checked"], 5)
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertAlmostEqual(stats["hit_rate"], 0.4)
+        self.assertTrue(dup_filter.drops)
+
+    def test_register_and_auth_reset_window(self):
+        dup_filter = DuplicateFilter(window_size=64)
+        session = FakeSession()
+        for seq in (1, 2, 3):
+            dup_filter.is_duplicate(session, seq, 0x0200, seq)
+        self.assertFalse(dup_filter.is_duplicate(session, 1, 0x0102, 0x55))
+        self.assertFalse(dup_filter.is_duplicate(session, 2, 0x0200, 2))
+        self.assertEqual(dup_filter.resets, 1)
+
+    def test_inherit_marks_fresh(self):
+        dup_filter = DuplicateFilter(window_size=64)
+        previous, session = FakeSession(), FakeSession()
+        dup_filter.is_duplicate(previous, 5, 0x0200, 1)
+        dup_filter.inherit(session, previous)
+        self.assertIs(session.seq_window, previous.seq_window)
+        self.assertTrue(session.seq_window.fresh)
+        self.assertTrue(dup_filter.is_duplicate(session, 5, 0x0200, 1))
+
+    def test_modes(self):
+        flag = DuplicateFilter(mode=DuplicateMode("flag"))
+        session = FakeSession()
+        flag.is_duplicate(session, 5)
+        self.assertTrue(flag.is_duplicate(session, 5))
+        self.assertFalse(flag.drops)
+
+        off = DuplicateFilter(mode=DuplicateMode.OFF)
+        session = FakeSession()
+        off.is_duplicate(session, 5)
+        self.assertFalse(off.is_duplicate(session, 5))
+        self.assertEqual(off.checked, 0)
+
+
+PHONE = '13912345678'
+
+
+class RecordingStorage:
+    """记录定位数据写入，其余存储调用忽略"""
+
+    def __init__(self):
+        self.locations = []
+
+    def insert_location_data(self, phone, msg_seq, location_data):
+        self.locations.append((phone, msg_seq, location_data['time']))
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TestServerDedup(unittest.IsolatedAsyncioTestCase):
+    """经 TCPServer.handle_client 的重复报文处理"""
+
+    async def asyncSetUp(self):
+        self.JT808Builder = load_module('builder').JT808Builder
+        self.JT808FrameDecoder = load_module('frame_decoder').JT808FrameDecoder
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.storage = RecordingStorage()
+        self.server = load_module('tcp_server').TCPServer(db_manager=self.storage, media_dir=self.media_dir.name)
+        self.forwarded = []
+        self.server.forwarder.forward_packet = self._forward_packet
+        self.listener = await asyncio.start_server(self.server.handle_client, '127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.writers = []
+
+    async def asyncTearDown(self):
+        for writer in self.writers:
+            writer.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.media_dir.cleanup()
+
+    async def _forward_packet(self, phone, data):
+        self.forwarded.append(getattr(data, 'wire', data))
+        return False
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        self.writers.append(writer)
+        return reader, writer
+
+    async def exchange(self, reader, writer, frames):
+        """发送报文并读取同样数量的平台应答"""
+        writer.write(b''.join(frames))
+        await writer.drain()
+        decoder = self.JT808FrameDecoder()
+        replies = []
+        while len(replies) < len(frames):
+            data = await asyncio.wait_for(reader.read(65536), 2.0)
+            self.assertTrue(data, "连接被关闭")
+            replies.extend(bytes(frame) for frame in decoder.feed(data))
+        return replies
+
+    @staticmethod
+    def location(builder, seq, minute):
+        body = struct.pack('>IIIIHHH', 0, 2, 39904200, 116407400, 50, 600, 90)
+        body += bytes.fromhex(f"250101{minute // 60:02d}{minute % 60:02d}00")
+        return builder.build(0x0200, PHONE, body, seq=seq)
+
+    async def test_reconnect_after_reboot_is_not_duplicate(self):
+        builder = self.JT808Builder()
+        reader, writer = await self.connect()
+        await self.exchange(reader, writer, [self.location(builder, seq, seq) for seq in range(1, 120)])
+        self.assertEqual(len(self.storage.locations), 119)
+
+        # 终端重启后重连，流水号从1重新计数，报文内容（定位时间）不同
+        reader, writer = await self.connect()
+        await self.exchange(reader, writer, [self.location(builder, seq, 200 + seq) for seq in range(1, 120)])
+        self.assertEqual(len(self.storage.locations), 238)
+        self.assertEqual(len(self.forwarded), 238)
+        self.assertEqual(self.server.dedup.duplicates, 0)
+
+    async def test_reconnect_retransmit_is_duplicate(self):
+        builder = self.JT808Builder()
+        frames = [self.location(builder, seq, seq) for seq in range(1, 11)]
+        reader, writer = await self.connect()
+        await self.exchange(reader, writer, frames)
+
+        # 断线重连后重发最后两条未获应答的报文：照常应答，不再入库和转发
+        reader, writer = await self.connect()
+        replies = await self.exchange(reader, writer, frames[-2:])
+        self.assertEqual([reply[:2] for reply in replies], [b'\x80\x01'] * 2)
+        self.assertEqual([reply[12:14] for reply in replies], [b'\x00\x09', b'\x00\x0a'])
+        self.assertEqual(len(self.storage.locations), 10)
+        self.assertEqual(len(self.forwarded), 10)
+        self.assertEqual(self.server.dedup.duplicates, 2)
+        self.assertEqual(self.server.dedup.writes_saved, 2)
+
+    async def test_duplicate_replied_but_not_stored(self):
+        builder = self.JT808Builder()
+        frame = self.location(builder, 7, 1)
+        reader, writer = await self.connect()
+        replies = await self.exchange(reader, writer, [frame, frame])
+        self.assertEqual([reply[12:17] for reply in replies], [b'\x00\x07\x02\x00\x00'] * 2)
+        self.assertEqual(self.storage.locations, [(PHONE, 7, '2025-01-01 00:01:00')])
+        self.assertEqual(len(self.forwarded), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
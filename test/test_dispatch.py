@@ -0,0 +1,75 @@
+"""
+报文分发注册表单元测试
+"""
+import os
+import asyncio
+import unittest
+import importlib.util
+
+# 动态加载dispatch模块
+dispatch_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/dispatch.py'))
+spec = importlib.util.spec_from_file_location("dispatch", dispatch_path)
+dispatch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dispatch)
+MessageDispatcher = dispatch.MessageDispatcher
+
+
+class FakeHeader:
+    def __init__(self, msg_id, pkg_total=None, pkg_index=None):
+        self.msg_id = msg_id
+        self.pkg_total = pkg_total
+        self.pkg_index = pkg_index
+        self.body_offset = 16 if pkg_total and pkg_index else 12
+
+
+class TestMessageDispatcher(unittest.TestCase):
+    def test_dispatch_passes_body_offset(self):
+        calls = []
+
+        async def handler(header, data, body_offset):
+            calls.append((header.msg_id, body_offset))
+
+        dispatcher = MessageDispatcher()
+        dispatcher.register(0x0200, "位置信息汇报", handler, stores=True)
+        self.assertTrue(asyncio.run(dispatcher.dispatch(FakeHeader(0x0200), b'')))
+        self.assertTrue(asyncio.run(dispatcher.dispatch(FakeHeader(0x0200, 2, 1), b'')))
+        self.assertEqual(calls, [(0x0200, 12), (0x0200, 16)])
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats["routes"]["0x0200"]["count"], 2)
+        self.assertTrue(dispatcher.get(0x0200).stores)
+
+    def test_unknown_and_attribute_only_routes(self):
+        dispatcher = MessageDispatcher()
+        dispatcher.register(0x0001, "终端通用应答", reply=False)
+        self.assertFalse(asyncio.run(dispatcher.dispatch(FakeHeader(0x0F00), b'')))
+        self.assertFalse(asyncio.run(dispatcher.dispatch(FakeHeader(0x0001), b'')))
+        self.assertEqual(dispatcher.unhandled, 2)
+        self.assertIsNone(dispatcher.get(0x0F00))
+        # 只登记属性、没有处理函数的消息不解析消息体
+        self.assertFalse(dispatcher.get(0x0001).parse)
+        self.assertFalse(dispatcher.get(0x0001).reply)
+
+    def test_fragment_routes(self):
+        async def handler(header, data, body_offset):
+            pass
+
+        dispatcher = MessageDispatcher()
+        self.assertTrue(dispatcher.register(0x0801, "多媒体数据上传", handler, fragments=True).fragments)
+        # 只登记属性的消息不能逐包处理
+        self.assertFalse(dispatcher.register(0x0800, "多媒体事件信息上传", fragments=True).fragments)
+        self.assertFalse(dispatcher.register(0x0200, "位置信息汇报", handler).fragments)
+
+    def test_handler_errors_are_counted(self):
+        async def handler(header, data, body_offset):
+            raise ValueError("bad body")
+
+        dispatcher = MessageDispatcher()
+        dispatcher.register(0x0100, "终端注册", handler)
+        self.assertTrue(asyncio.run(dispatcher.dispatch(FakeHeader(0x0100), b'')))
+        route_stats = dispatcher.get_stats()["routes"]["0x0100"]
+        self.assertEqual(route_stats["errors"], 1)
+        self.assertEqual(route_stats["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
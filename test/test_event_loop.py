@@ -0,0 +1,38 @@
+"""
+事件循环引擎选择单元测试
+"""
+import asyncio
+import os
+import unittest
+import importlib.util
+
+# 动态加载event_loop模块
+event_loop_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/event_loop.py'))
+spec = importlib.util.spec_from_file_location("event_loop", event_loop_path)
+event_loop = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(event_loop)
+
+
+class TestEventLoop(unittest.TestCase):
+    def tearDown(self):
+        asyncio.set_event_loop_policy(None)
+
+    def test_resolve(self):
+        self.assertEqual(event_loop.resolve_event_loop('asyncio'), 'asyncio')
+        expected = 'uvloop' if event_loop.uvloop_available() else 'asyncio'
+        self.assertEqual(event_loop.resolve_event_loop('auto'), expected)
+        self.assertEqual(event_loop.resolve_event_loop('uvloop'), expected)
+        with self.assertRaises(ValueError):
+            event_loop.resolve_event_loop('tokio')
+
+    def test_run_reports_engine(self):
+        async def probe():
+            return event_loop.current_event_loop()
+        self.assertEqual(event_loop.run(probe(), 'asyncio'), 'asyncio')
+        if event_loop.uvloop_available():
+            self.assertEqual(event_loop.run(probe(), 'uvloop'), 'uvloop')
+        self.assertEqual(event_loop.current_event_loop(), 'none')
+
+
+if __name__ == '__main__':
+    unittest.main()
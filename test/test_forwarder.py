@@ -0,0 +1,342 @@
+"""
+报文转发器单元测试（上游链路双向转发、每终端独立连接）
+"""
+import os
+import time
+import asyncio
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Builder = load_module('builder').JT808Builder
+forwarder_module = load_module('forwarder')
+Forwarder = forwarder_module.Forwarder
+
+PHONE = '13912345678'
+OTHER_PHONE = '13987654321'
+THIRD_PHONE = '13700001111'
+
+
+class FakePlatform:
+    """模拟上游平台：记录收到的数据，可主动向代理下发报文"""
+
+    def __init__(self):
+        self.server = None
+        self.writers = []
+        self.received = bytearray()
+        self.connected = asyncio.Event()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        self.writers.append(writer)
+        self.connected.set()
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+            self.received += data
+        writer.close()
+
+    async def send(self, data: bytes):
+        writer = self.writers[-1]
+        writer.write(data)
+        await writer.drain()
+
+    async def stop(self):
+        for writer in self.writers:
+            writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("等待超时")
+        await asyncio.sleep(0.01)
+
+
+class TestForwarderDownlink(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.platform = FakePlatform()
+        port = await self.platform.start()
+        self.delivered = []
+        self.online = {PHONE}
+        self.forwarder = Forwarder(on_downlink=self._on_downlink)
+        self.forwarder.set_forwarding_mode('many_to_one')
+        self.forwarder.set_default_target('127.0.0.1', port)
+        self.builder = JT808Builder()
+
+    async def asyncTearDown(self):
+        self.forwarder.close()
+        await self.platform.stop()
+
+    def _on_downlink(self, phone, frame):
+        if phone not in self.online:
+            return False
+        self.delivered.append((phone, frame.msg_id, frame.wire))
+        return True
+
+    async def test_relay_platform_reply(self):
+        uplink = self.builder.build(0x0002, PHONE)
+        self.assertTrue(await self.forwarder.forward_packet(PHONE, uplink))
+        await self.platform.connected.wait()
+        await wait_for(lambda: bytes(self.platform.received) == uplink)
+
+        # 0x8001 应答与 0x8103 设置终端参数（含需要转义的字节）原样回送，按帧切分
+        ack = self.builder.build(0x8001, PHONE, bytes.fromhex('0001000200'))
+        params = self.builder.build(0x8103, PHONE, bytes.fromhex('0100000001047e7d0000'))
+        await self.platform.send(ack + params[:5])
+        await self.platform.send(params[5:])
+        await wait_for(lambda: len(self.delivered) == 2)
+        self.assertEqual(self.delivered, [(PHONE, 0x8001, ack), (PHONE, 0x8103, params)])
+
+        stats = self.forwarder.get_forwarding_stats()["downlink"]
+        self.assertEqual(stats["frames"], 2)
+        self.assertEqual(stats["relayed"], 2)
+        self.assertEqual(stats["unknown_terminal"], 0)
+        self.assertGreater(stats["max_latency_us"], 0)
+
+    async def test_unknown_terminal(self):
+        await self.forwarder.forward_packet(PHONE, self.builder.build(0x0002, PHONE))
+        await self.platform.connected.wait()
+        await self.platform.send(self.builder.build(0x8001, OTHER_PHONE, bytes.fromhex('0001000200')))
+        await wait_for(lambda: self.forwarder.downlink_frames == 1)
+        self.assertEqual(self.delivered, [])
+        self.assertEqual(self.forwarder.downlink_unknown, 1)
+        self.assertEqual(self.forwarder.downlink_relayed, 0)
+
+    async def test_concurrent_first_forwards_share_connection(self):
+        frames = [self.builder.build(0x0002, PHONE, seq=seq) for seq in range(50)]
+        # 链路建立前同时到达的转发共用一次建连，不产生无人管理的孤立连接
+        results = await asyncio.gather(*(self.forwarder.forward_packet(PHONE, frame) for frame in frames))
+        self.assertTrue(all(results))
+        await wait_for(lambda: bytes(self.platform.received) == b''.join(frames))
+        self.assertEqual(len(self.platform.writers), 1)
+        self.assertEqual(len(self.forwarder._readers), 1)
+        self.assertEqual(self.forwarder._connecting, {})
+
+    async def test_upstream_close_removes_link(self):
+        await self.forwarder.forward_packet(PHONE, self.builder.build(0x0002, PHONE))
+        await self.forwarder.flush(timeout=1)
+        self.assertEqual(len(self.forwarder._readers), 1)
+        self.platform.writers[-1].close()
+        await wait_for(lambda: not self.forwarder.config.target_queues)
+        self.assertEqual(self.forwarder._readers, {})
+        self.assertEqual(self.forwarder.config.target_connections, {})
+
+        # 下一次转发重新建立链路
+        self.assertTrue(await self.forwarder.forward_packet(PHONE, self.builder.build(0x0002, PHONE)))
+        await self.forwarder.flush(timeout=1)
+        self.assertEqual(len(self.forwarder._readers), 1)
+
+
+class TestForwarderPerTerminal(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.platform = FakePlatform()
+        port = await self.platform.start()
+        self.delivered = []
+        self.unlinked = []
+        self.forwarder = Forwarder(on_downlink=self._on_downlink, max_links=2, link_idle_timeout=60,
+                                   on_link_closed=self.unlinked.append)
+        self.forwarder.set_forwarding_mode('per_terminal')
+        self.forwarder.set_default_target('127.0.0.1', port)
+        self.builder = JT808Builder()
+
+    async def asyncTearDown(self):
+        self.forwarder.close()
+        await self.platform.stop()
+
+    def _on_downlink(self, phone, frame):
+        self.delivered.append((phone, frame.msg_id))
+        return True
+
+    async def forward(self, phone):
+        """转发一帧并等待（后台）建连完成"""
+        result = await self.forwarder.forward_packet(phone, self.builder.build(0x0002, phone))
+        await self.forwarder.flush(timeout=1)
+        return result
+
+    async def test_connection_per_terminal(self):
+        self.assertTrue(await self.forward(PHONE))
+        self.assertTrue(await self.forward(OTHER_PHONE))
+        self.assertTrue(await self.forward(PHONE))
+        await wait_for(lambda: len(self.platform.writers) == 2)
+        target = f"127.0.0.1:{self.platform.server.sockets[0].getsockname()[1]}"
+        self.assertEqual(set(self.forwarder.config.target_queues),
+                         {f"{PHONE}@{target}", f"{OTHER_PHONE}@{target}"})
+        self.assertEqual(self.forwarder.links_opened, 2)
+
+        # 上游平台在各自的连接上应答，按手机号回送
+        await self.platform.writers[0].drain()
+        self.platform.writers[0].write(self.builder.build(0x8001, PHONE, bytes.fromhex('0001000200')))
+        await wait_for(lambda: self.delivered == [(PHONE, 0x8001)])
+
+        stats = self.forwarder.get_forwarding_stats()
+        self.assertEqual(stats["active_connections"], 2)
+        self.assertEqual(stats["queues"], [])
+        self.assertEqual(stats["links"]["opened"], 2)
+
+    async def test_budget_evicts_least_recently_used(self):
+        await self.forward(PHONE)
+        await self.forward(OTHER_PHONE)
+        # PHONE 最近使用过，超出上限时关闭空闲的 OTHER_PHONE 链路（待发数据写出后才可关闭）
+        await self.forward(PHONE)
+        await self.forwarder.flush(timeout=1)
+        lru = self.forwarder._link_lru
+        lru[next(iter(lru))] -= 120
+        self.assertTrue(await self.forward(THIRD_PHONE))
+        keys = {key.split('@')[0] for key in self.forwarder.config.target_queues}
+        self.assertEqual(keys, {PHONE, THIRD_PHONE})
+        self.assertEqual(self.forwarder.links_evicted, 1)
+        self.assertEqual(len(self.forwarder._readers), 2)
+        # 被关闭链路的终端失去上游鉴权，通知断开
+        self.assertEqual(self.unlinked, [OTHER_PHONE])
+
+    async def test_budget_keeps_active_links(self):
+        await self.forward(PHONE)
+        await self.forward(OTHER_PHONE)
+        # 链路都在使用中：不关闭在线终端的链路，新终端暂不转发
+        self.assertFalse(await self.forward(THIRD_PHONE))
+        self.assertEqual((self.forwarder.links_evicted, self.forwarder.links_rejected), (0, 1))
+        self.assertEqual(len(self.forwarder.config.target_queues), 2)
+        self.assertEqual(self.unlinked, [])
+
+    async def test_budget_rejects_when_links_busy(self):
+        await self.forward(PHONE)
+        await self.forward(OTHER_PHONE)
+        for conn_key, queue in self.forwarder.config.target_queues.items():
+            queue._queued_bytes = 1  # 模拟上游消化不及、仍有待发数据
+            self.forwarder._link_lru[conn_key] -= 120
+        self.assertFalse(await self.forward(THIRD_PHONE))
+        self.assertEqual(self.forwarder.links_rejected, 1)
+        for queue in self.forwarder.config.target_queues.values():
+            queue._queued_bytes = 0
+
+    async def test_budget_counts_closing_links(self):
+        await self.forward(PHONE)
+        await self.forward(OTHER_PHONE)
+        queues = list(self.forwarder.config.target_queues.values())
+        for queue in queues:
+            queue._queued_bytes = 1
+        # 终端断开后仍在写出待发数据的连接同样占用连接数
+        self.forwarder.release_terminal(PHONE)
+        self.assertEqual(len(self.forwarder._closing), 1)
+        self.assertFalse(await self.forward(THIRD_PHONE))
+        self.assertEqual(self.forwarder.links_rejected, 1)
+        for queue in queues:
+            queue._queued_bytes = 0
+
+    async def test_idle_links_closed(self):
+        await self.forward(PHONE)
+        await self.forward(OTHER_PHONE)
+        lru = self.forwarder._link_lru
+        first, second = list(lru)
+        lru[first] -= 120
+        self.assertEqual(self.forwarder.close_idle_links(), 1)
+        self.assertEqual(list(self.forwarder.config.target_queues), [second])
+        self.assertEqual(self.forwarder.links_idle_closed, 1)
+        self.assertEqual(self.forwarder.close_idle_links(), 0)
+        self.assertEqual(self.unlinked, [first.split('@')[0]])
+
+    async def test_release_terminal(self):
+        await self.forward(PHONE)
+        await self.platform.connected.wait()
+        self.forwarder.release_terminal(PHONE)
+        self.assertEqual(self.forwarder.config.target_queues, {})
+        self.assertEqual(self.forwarder._link_lru, {})
+        self.assertEqual(self.forwarder.links_released, 1)
+        # 终端已断开，不再通知
+        self.assertEqual(self.unlinked, [])
+        # 终端重连后建立新的上游连接
+        self.assertTrue(await self.forward(PHONE))
+        await wait_for(lambda: len(self.platform.writers) == 2)
+
+
+class TestForwarderReconnect(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # 先占用再关闭一个端口，作为暂时不可用的上游平台
+        self.platform = FakePlatform()
+        self.port = await self.platform.start()
+        await self.platform.stop()
+        self.forwarder = Forwarder(connect_timeout=1)
+        self.forwarder.set_forwarding_mode('many_to_one')
+        self.forwarder.set_default_target('127.0.0.1', self.port)
+        self.builder = JT808Builder()
+
+    async def asyncTearDown(self):
+        self.forwarder.close()
+        await self.platform.stop()
+
+    async def test_connect_in_background(self):
+        self.platform.server = await asyncio.start_server(self.platform._handle, '127.0.0.1', self.port)
+        frames = [self.builder.build(0x0002, PHONE, seq=seq) for seq in range(3)]
+        # 转发不等待建连，建连期间的数据暂存，连接建立后按序写出
+        self.assertTrue(await self.forwarder.forward_packet(PHONE, frames[0]))
+        self.assertEqual(len(self.forwarder._connecting), 1)
+        self.assertEqual(self.forwarder.config.target_queues, {})
+        self.assertTrue(await self.forwarder.forward_packet(PHONE, frames[1]))
+        await self.forwarder.flush(timeout=1)
+        self.assertTrue(await self.forwarder.forward_packet(PHONE, frames[2]))
+        await wait_for(lambda: bytes(self.platform.received) == b''.join(frames))
+
+    async def test_backoff_after_connect_failure(self):
+        frame = self.builder.build(0x0002, PHONE)
+        with self.assertLogs(forwarder_module.logger, 'ERROR') as logs:
+            await self.forwarder.forward_packet(PHONE, frame)
+            await self.forwarder.flush(timeout=1)
+            # 退避期间直接返回失败，不再建连，也不重复记录错误日志
+            for _ in range(5):
+                self.assertFalse(await self.forwarder.forward_packet(PHONE, frame))
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(self.forwarder._connecting, {})
+        stats = self.forwarder.get_forwarding_stats()["connect"]
+        self.assertEqual((stats["failures"], stats["backoff_links"], stats["pending_dropped"]), (1, 1, 1))
+
+        # 再次失败时退避时间翻倍
+        address = f"127.0.0.1:{self.port}"
+        self.forwarder._backoff[address] = (1, 0.0)
+        await self.forwarder.forward_packet(PHONE, frame)
+        await self.forwarder.flush(timeout=1)
+        failures, retry_at = self.forwarder._backoff[address]
+        self.assertEqual(failures, 2)
+        self.assertGreater(retry_at - time.monotonic(), 1.5)
+
+        # 退避结束、上游恢复后重新建连并清除退避
+        self.platform.server = await asyncio.start_server(self.platform._handle, '127.0.0.1', self.port)
+        self.forwarder._backoff[address] = (2, 0.0)
+        self.assertTrue(await self.forwarder.forward_packet(PHONE, frame))
+        await wait_for(lambda: bytes(self.platform.received) == frame)
+        self.assertEqual(self.forwarder._backoff, {})
+
+    async def test_backoff_per_terminal_link(self):
+        self.forwarder.set_forwarding_mode('per_terminal')
+        await self.forwarder.forward_packet(PHONE, self.builder.build(0x0002, PHONE))
+        await self.forwarder.flush(timeout=1)
+        # 一个终端建连失败只让它自己的链路退避，同一目标服务器的其他终端照常建连
+        self.assertEqual(list(self.forwarder._backoff), [f"{PHONE}@127.0.0.1:{self.port}"])
+        self.assertFalse(await self.forwarder.forward_packet(PHONE, self.builder.build(0x0002, PHONE)))
+        self.assertTrue(await self.forwarder.forward_packet(OTHER_PHONE, self.builder.build(0x0002, OTHER_PHONE)))
+        await self.forwarder.flush(timeout=1)
+        self.assertEqual(len(self.forwarder._backoff), 2)
+        # 终端断开时清除其链路的退避记录
+        self.forwarder.release_terminal(PHONE)
+        self.assertEqual(list(self.forwarder._backoff), [f"{OTHER_PHONE}@127.0.0.1:{self.port}"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ import time
 import importlib.util
 
 # 动态加载模块
-forwarder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../jt808proxy/core/forwarder.py'))
+forwarder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/forwarder.py'))
 spec = importlib.util.spec_from_file_location("forwarder", forwarder_path)
 forwarder = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(forwarder)
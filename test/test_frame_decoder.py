@@ -0,0 +1,101 @@
+"""
+JT808流式帧解码器单元测试
+"""
+import os
+import unittest
+import importlib.util
+
+# 动态加载frame_decoder模块
+frame_decoder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/frame_decoder.py'))
+spec = importlib.util.spec_from_file_location("frame_decoder", frame_decoder_path)
+frame_decoder = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(frame_decoder)
+JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+encode_frame = frame_decoder.encode_frame
+
+# 消息ID: 0x0002, 消息体属性: 0x0000, 手机号: 013912345678, 流水号: 0x0001
+HEARTBEAT = bytes.fromhex('00 02 00 00 01 39 12 34 56 78 00 01')
+# 消息体中包含需要转义的0x7E和0x7D
+ESCAPED = bytes.fromhex('02 00 00 04 01 39 12 34 56 78 00 02 7e 7d 01 02')
+
+
+class TestJT808FrameDecoder(unittest.TestCase):
+    def decode_all(self, decoder, *chunks):
+        frames = []
+        for chunk in chunks:
+            frames.extend(bytes(frame) for frame in decoder.feed(chunk))
+        return frames
+
+    def test_single_frame(self):
+        decoder = JT808FrameDecoder()
+        frames = self.decode_all(decoder, encode_frame(HEARTBEAT))
+        self.assertEqual(frames, [HEARTBEAT])
+        self.assertEqual(decoder.frames_decoded, 1)
+
+    def test_escape_roundtrip(self):
+        wire = encode_frame(ESCAPED)
+        self.assertEqual(wire.count(0x7E), 2)
+        self.assertIn(b'\x7d\x02', wire)
+        self.assertIn(b'\x7d\x01', wire)
+        frames = self.decode_all(JT808FrameDecoder(), wire)
+        self.assertEqual(frames, [ESCAPED])
+
+    def test_coalesced_frames(self):
+        # 多帧粘在一次读取中
+        data = encode_frame(HEARTBEAT) + encode_frame(ESCAPED) + encode_frame(HEARTBEAT)
+        frames = self.decode_all(JT808FrameDecoder(), data)
+        self.assertEqual(frames, [HEARTBEAT, ESCAPED, HEARTBEAT])
+
+    def test_split_frames(self):
+        # 逐字节送入，模拟帧被TCP拆分
+        data = encode_frame(ESCAPED) + encode_frame(HEARTBEAT)
+        decoder = JT808FrameDecoder()
+        frames = self.decode_all(decoder, *(data[i:i + 1] for i in range(len(data))))
+        self.assertEqual(frames, [ESCAPED, HEARTBEAT])
+        self.assertEqual(decoder.buffered_bytes, 1)
+
+    def test_shared_flag_between_frames(self):
+        # 前一帧的结束标识位兼作下一帧的起始标识位
+        data = encode_frame(HEARTBEAT) + encode_frame(ESCAPED)[1:]
+        frames = self.decode_all(JT808FrameDecoder(), data)
+        self.assertEqual(frames, [HEARTBEAT, ESCAPED])
+
+    def test_bad_checksum(self):
+        wire = bytearray(encode_frame(HEARTBEAT))
+        wire[-2] ^= 0xFF
+        decoder = JT808FrameDecoder()
+        frames = self.decode_all(decoder, bytes(wire), encode_frame(HEARTBEAT))
+        self.assertEqual(frames, [HEARTBEAT])
+        self.assertEqual(decoder.checksum_errors, 1)
+
+    def test_leading_garbage(self):
+        decoder = JT808FrameDecoder()
+        frames = self.decode_all(decoder, b'noise', encode_frame(HEARTBEAT))
+        self.assertEqual(frames, [HEARTBEAT])
+        self.assertEqual(decoder.discarded_bytes, 5)
+
+    def test_large_frame(self):
+        # 超过旧实现1024字节单次读取上限的报文
+        body = bytes(range(256)) * 4
+        content = bytes.fromhex('08 01 03 ff 01 39 12 34 56 78 00 03') + body[:1023]
+        data = encode_frame(content)
+        decoder = JT808FrameDecoder()
+        frames = self.decode_all(decoder, data[:700], data[700:1400], data[1400:])
+        self.assertEqual(frames, [content])
+
+    def test_current_wire(self):
+        # 当前帧的原始线上字节（含转义），共享标识位时以前一帧的结束标识位为起点
+        first, second = encode_frame(ESCAPED), encode_frame(HEARTBEAT)
+        decoder = JT808FrameDecoder()
+        wires = [decoder.current_wire() for _ in decoder.feed(b'noise' + first + second[1:])]
+        self.assertEqual(wires, [first, first[-1:] + second[1:]])
+
+    def test_oversize_frame_dropped(self):
+        decoder = JT808FrameDecoder(max_frame_size=64)
+        frames = self.decode_all(decoder, b'\x7e' + b'\x00' * 200, encode_frame(HEARTBEAT))
+        self.assertEqual(frames, [HEARTBEAT])
+        self.assertEqual(decoder.invalid_frames, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+JT808帧视图单元测试
+"""
+import os
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+frame_view = load_module('frame_view')
+frame_decoder = load_module('frame_decoder')
+JT808Parser = load_module('jt808_parser').JT808Parser
+JT808Frame = frame_view.JT808Frame
+JT808FrameDecoder = frame_decoder.JT808FrameDecoder
+encode_frame = frame_decoder.encode_frame
+
+HEADER_FIELDS = ('msg_id', 'body_props', 'phone', 'msg_seq', 'pkg_total', 'pkg_index',
+                 'version', 'header_size', 'body_offset')
+
+
+class TestJT808Frame(unittest.TestCase):
+    def assert_matches_parser(self, data):
+        frame = JT808Frame(memoryview(data))
+        header = JT808Parser.parse_header(data)
+        self.assertTrue(frame.is_valid)
+        for name in HEADER_FIELDS:
+            self.assertEqual(getattr(frame, name), getattr(header, name), name)
+        self.assertEqual(bytes(frame.body), data[header.body_offset:])
+
+    def test_fields_match_parser(self):
+        self.assert_matches_parser(bytes.fromhex('02 00 00 40 01 39 12 34 56 78 00 01 aa bb'))
+        self.assert_matches_parser(bytes.fromhex('02 00 20 40 01 39 12 34 56 78 00 01 00 03 00 02 cc'))
+        # 2019版消息头
+        self.assert_matches_parser(bytes.fromhex('02 00 40 02 01 00 00 00 00 01 39 12 34 56 78 00 07 dd ee'))
+
+    def test_invalid_length(self):
+        self.assertFalse(JT808Frame(memoryview(bytes(11))).is_valid)
+        # 2019版标志位但不足17字节
+        self.assertFalse(JT808Frame(memoryview(bytes.fromhex('02 00 40 00 01 00 00 00 00 01 39 12 34'))).is_valid)
+
+    def test_wire_from_decoder(self):
+        content = bytes.fromhex('02 00 00 02 01 39 12 34 56 78 00 02 7e 7d')
+        wire = encode_frame(content)
+        decoder = JT808FrameDecoder()
+        for data in decoder.feed(b'\x00' + wire):
+            frame = JT808Frame(data, decoder.current_wire)
+            self.assertEqual(frame.msg_id, 0x0200)
+            self.assertEqual(frame.wire, wire)
+
+    def test_checksum(self):
+        content = bytes.fromhex('02 00 00 02 01 39 12 34 56 78 00 02 7e 7d')
+        decoder = JT808FrameDecoder()
+        for data in decoder.feed(encode_frame(content)):
+            # 解码器校验时取得的校验码与按内容计算的一致
+            self.assertEqual(decoder.checksum, frame_decoder.xor_checksum(content))
+            self.assertEqual(JT808Frame(data, checksum=decoder.checksum).checksum, decoder.checksum)
+            self.assertEqual(JT808Frame(data).checksum, decoder.checksum)
+
+    def test_wire_without_source(self):
+        content = bytes.fromhex('00 02 00 00 01 39 12 34 56 78 00 01')
+        self.assertEqual(JT808Frame(memoryview(content)).wire, encode_frame(content))
+
+
+if __name__ == '__main__':
+    unittest.main()
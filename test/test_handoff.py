@@ -0,0 +1,104 @@
+"""
+平滑排空与监听套接字交接单元测试
+"""
+import os
+import socket
+import asyncio
+import unittest
+import importlib.util
+
+# 动态加载handoff与tcp_server模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+spec = importlib.util.spec_from_file_location("handoff", os.path.join(core_dir, 'handoff.py'))
+handoff = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(handoff)
+spec = importlib.util.spec_from_file_location("tcp_server", os.path.join(core_dir, 'tcp_server.py'))
+tcp_server = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(tcp_server)
+TCPServer = tcp_server.TCPServer
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.flushed = 0
+
+    def flush(self):
+        self.flushed += 1
+
+
+class TestHandoff(unittest.TestCase):
+    def test_no_inherited_socket(self):
+        os.environ.pop(handoff.LISTEN_FD_ENV, None)
+        self.assertIsNone(handoff.inherited_socket())
+        handoff.notify_ready()
+
+    def test_inherit_socket_and_notify_ready(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        read_fd, write_fd = os.pipe()
+        os.environ[handoff.LISTEN_FD_ENV] = str(os.dup(listener.fileno()))
+        os.environ[handoff.READY_FD_ENV] = str(write_fd)
+        inherited = handoff.inherited_socket()
+        try:
+            self.assertEqual(inherited.getsockname(), listener.getsockname())
+            handoff.notify_ready()
+            self.assertEqual(os.read(read_fd, 1), b"1")
+            self.assertNotIn(handoff.LISTEN_FD_ENV, os.environ)
+            self.assertNotIn(handoff.READY_FD_ENV, os.environ)
+        finally:
+            inherited.close()
+            listener.close()
+            os.close(read_fd)
+
+
+class TestDrain(unittest.TestCase):
+    def test_drain_closes_sessions_and_flushes_storage(self):
+        async def scenario():
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.bind(('127.0.0.1', 0))
+            listener.listen()
+            port = listener.getsockname()[1]
+            storage = MemoryStorage()
+            server = TCPServer(listen_socket=listener, db_manager=storage,
+                               drain_timeout=1.0, drain_spread=0.0)
+            server_task = asyncio.create_task(server.start())
+            await asyncio.sleep(0.1)
+
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await asyncio.sleep(0.1)
+            self.assertEqual(server.stats.active_connections, 1)
+
+            server.request_shutdown()
+            self.assertTrue(server.draining)
+            await asyncio.wait_for(server_task, 5.0)
+            # 会话以FIN正常关闭，终端读到EOF
+            self.assertEqual(await asyncio.wait_for(reader.read(), 1.0), b"")
+            self.assertEqual(storage.flushed, 1)
+            with self.assertRaises(OSError):
+                await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+
+        asyncio.run(scenario())
+
+    def test_direct_drain_stops_start(self):
+        async def scenario():
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.bind(('127.0.0.1', 0))
+            listener.listen()
+            server = TCPServer(listen_socket=listener, db_manager=MemoryStorage(),
+                               drain_timeout=1.0, drain_spread=0.0)
+            server_task = asyncio.create_task(server.start())
+            await asyncio.sleep(0.1)
+            self.assertFalse(server.draining)
+
+            # 不经 request_shutdown 直接排空，start() 应正常返回而不是抛出 CancelledError
+            await server.drain()
+            self.assertTrue(server.draining)
+            await asyncio.wait_for(server_task, 5.0)
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
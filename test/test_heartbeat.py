@@ -0,0 +1,264 @@
+"""
+心跳快速路径与上游平台应答单元测试（经 TCPServer.handle_client 的完整连接）
+"""
+import os
+import asyncio
+import tempfile
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Builder = load_module('builder').JT808Builder
+JT808FrameDecoder = load_module('frame_decoder').JT808FrameDecoder
+JT808Frame = load_module('frame_view').JT808Frame
+TCPServer = load_module('tcp_server').TCPServer
+
+PHONE = '13912345678'
+OTHER_PHONE = '13987654321'
+# 终端注册消息体：省域、市县域、制造商、型号、终端ID、车牌颜色、车牌
+REGISTER_BODY = (bytes.fromhex('002c0100') + b'MAKER' + b'MODEL'.ljust(20, b'\x00')
+                 + b'TERM001' + b'\x01' + '京A12345'.encode('gbk'))
+AUTH_CODE = b'PLATFORM'
+
+
+class MemoryStorage:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TerminalClient:
+    """模拟终端：发送报文并按帧读取平台应答"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.decoder = JT808FrameDecoder()
+        self.frames = []
+
+    async def send(self, data: bytes):
+        self.writer.write(data)
+        await self.writer.drain()
+
+    async def reply(self, timeout=1.0) -> bytes:
+        while not self.frames:
+            data = await asyncio.wait_for(self.reader.read(4096), timeout)
+            if not data:
+                raise ConnectionError("连接已关闭")
+            self.frames.extend(bytes(frame) for frame in self.decoder.feed(data))
+        return self.frames.pop(0)
+
+
+class TestHeartbeatFastPath(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.server = TCPServer(db_manager=MemoryStorage(), media_dir=self.media_dir.name)
+        self.forwarded = []
+        self.server.forwarder.forward_packet = self._forward_packet
+        self.listener = await asyncio.start_server(self.server.handle_client, '127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.builder = JT808Builder()
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            client.writer.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.media_dir.cleanup()
+
+    async def _forward_packet(self, phone, data):
+        self.forwarded.append((phone, getattr(data, 'wire', data)))
+        return False
+
+    async def connect(self) -> TerminalClient:
+        client = TerminalClient(*await asyncio.open_connection('127.0.0.1', self.port))
+        self.clients.append(client)
+        return client
+
+    def assert_heartbeat_ack(self, reply: bytes, seq: int, phone: str = PHONE):
+        # 0x8001 平台通用应答：应答流水号、应答ID 0x0002、结果0
+        self.assertEqual(reply[:2], b'\x80\x01')
+        self.assertEqual(reply[4:10], bytes.fromhex(phone.rjust(12, '0')))
+        self.assertEqual(reply[12:17], seq.to_bytes(2, 'big') + b'\x00\x02\x00')
+
+    async def test_first_heartbeat_takes_full_path(self):
+        client = await self.connect()
+        await client.send(self.builder.build(0x0002, PHONE, seq=1))
+        self.assert_heartbeat_ack(await client.reply(), 1)
+        # 首个心跳尚未绑定终端，经完整路径处理并绑定手机号BCD
+        self.assertEqual(self.server.heartbeats, 0)
+        session = self.server.sessions.get_by_phone(PHONE)
+        self.assertEqual(session.phone_bcd, bytes.fromhex('013912345678'))
+
+        frames = [self.builder.build(0x0002, PHONE, seq=seq) for seq in (2, 3, 4)]
+        await client.send(b''.join(frames))
+        for seq in (2, 3, 4):
+            self.assert_heartbeat_ack(await client.reply(), seq)
+        self.assertEqual(self.server.heartbeats, 3)
+        self.assertEqual(self.server.heartbeats_forwarded, 0)
+        # 快速路径同样按原始线上字节转发
+        self.assertEqual(self.forwarded[1:], [(PHONE, frame) for frame in frames])
+
+    async def test_phone_mismatch_takes_full_path(self):
+        client = await self.connect()
+        await client.send(self.builder.build(0x0002, PHONE, seq=1))
+        await client.reply()
+        # 手机号与会话绑定的BCD不一致的心跳不走快速路径（同一连接换绑终端）
+        await client.send(self.builder.build(0x0002, OTHER_PHONE, seq=2))
+        self.assert_heartbeat_ack(await client.reply(), 2, OTHER_PHONE)
+        self.assertEqual(self.server.heartbeats, 0)
+        self.assertIsNotNone(self.server.sessions.get_by_phone(OTHER_PHONE))
+
+        # 带消息体的 0x0002 长度不符，也走完整路径
+        await client.send(self.builder.build(0x0002, OTHER_PHONE, b'\x00', seq=3))
+        await client.reply()
+        self.assertEqual(self.server.heartbeats, 0)
+
+    async def test_forward_heartbeats_toggle(self):
+        forwarded_ok = []
+
+        async def forward_packet(phone, data):
+            forwarded_ok.append(getattr(data, 'wire', data))
+            return True
+
+        self.server.forwarder.forward_packet = forward_packet
+        # 桩转发不会回送上游应答，由代理本地应答
+        self.server.forward_upstream_replies = False
+        client = await self.connect()
+        await client.send(self.builder.build(0x0002, PHONE, seq=1))
+        await client.reply()
+        await client.send(self.builder.build(0x0002, PHONE, seq=2))
+        await client.reply()
+        self.assertEqual((self.server.heartbeats, self.server.heartbeats_forwarded), (1, 1))
+
+        # 关闭心跳转发后快速路径只应答，不转发
+        self.server.forward_heartbeats = False
+        forwarded_ok.clear()
+        await client.send(self.builder.build(0x0002, PHONE, seq=3))
+        self.assert_heartbeat_ack(await client.reply(), 3)
+        self.assertEqual(forwarded_ok, [])
+        self.assertEqual((self.server.heartbeats, self.server.heartbeats_forwarded), (2, 1))
+        stats = self.server.get_connection_stats()["heartbeats"]
+        self.assertEqual(stats, {"fast_path": 2, "forwarded": 1, "forward_enabled": False})
+
+
+
+class TestUpstreamReplies(unittest.IsolatedAsyncioTestCase):
+    """报文转发到上游平台后由平台应答，代理不再本地应答"""
+
+    async def asyncSetUp(self):
+        self.platform_frames = []
+        self.platform = await asyncio.start_server(self._platform, '127.0.0.1', 0)
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.server = TCPServer(db_manager=MemoryStorage(), media_dir=self.media_dir.name)
+        self.server.forwarder.set_forwarding_mode('many_to_one')
+        self.server.forwarder.set_default_target('127.0.0.1', self.platform.sockets[0].getsockname()[1])
+        self.listener = await asyncio.start_server(self.server.handle_client, '127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.builder = JT808Builder()
+
+    async def asyncTearDown(self):
+        self.client.writer.close()
+        self.server.forwarder.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.platform.close()
+        await self.platform.wait_closed()
+        self.media_dir.cleanup()
+
+    async def _platform(self, reader, writer):
+        """模拟上游平台：注册应答 0x8100 带平台鉴权码，其余报文 0x8001 通用应答"""
+        builder = JT808Builder()
+        decoder = JT808FrameDecoder()
+        while data := await reader.read(4096):
+            for raw in decoder.feed(data):
+                frame = JT808Frame(bytes(raw))
+                self.platform_frames.append((frame.msg_id, frame.msg_seq))
+                seq = frame.msg_seq.to_bytes(2, 'big')
+                if frame.msg_id == 0x0100:
+                    writer.write(builder.build(0x8100, frame.phone, seq + b'\x00' + AUTH_CODE))
+                else:
+                    writer.write(builder.build(0x8001, frame.phone, seq + frame.msg_id.to_bytes(2, 'big') + b'\x00'))
+        writer.close()
+
+    async def test_platform_replies_only(self):
+        self.client = TerminalClient(*await asyncio.open_connection('127.0.0.1', self.port))
+        await self.client.send(self.builder.build(0x0100, PHONE, REGISTER_BODY, seq=1))
+        # 终端只收到平台的注册应答（带平台鉴权码），没有代理自行生成的另一条 0x8100
+        reply = await self.client.reply()
+        self.assertEqual(reply[:2], b'\x81\x00')
+        self.assertTrue(reply.endswith(AUTH_CODE))
+
+        # 心跳快速路径同样只有平台应答
+        await self.client.send(self.builder.build(0x0002, PHONE, seq=2))
+        reply = await self.client.reply()
+        self.assertEqual(reply[:2], b'\x80\x01')
+        self.assertEqual(self.server.heartbeats, 1)
+
+        # 未获应答而重发的注册报文仍转发给平台，由平台重新应答
+        await self.client.send(self.builder.build(0x0100, PHONE, REGISTER_BODY, seq=1))
+        reply = await self.client.reply()
+        self.assertTrue(reply.endswith(AUTH_CODE))
+        self.assertEqual(self.platform_frames, [(0x0100, 1), (0x0002, 2), (0x0100, 1)])
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.client.reply(timeout=0.2)
+        # 补传分包请求、多媒体上传应答同样由上游平台下发
+        self.assertFalse(self.server._send_platform_message(PHONE, 0x8003, b'\x00\x01\x00'))
+        stats = self.server.get_connection_stats()["upstream_replies"]
+        self.assertEqual(stats, {"enabled": True, "local_replies_skipped": 4, "local_replies_resent": 0})
+
+    async def test_unreachable_platform_replies_locally(self):
+        # 上游平台不可达：建连期间暂存的首帧被丢弃后由代理补发本地应答
+        self.server.forwarder.set_default_target('127.0.0.1', 1)
+        self.client = TerminalClient(*await asyncio.open_connection('127.0.0.1', self.port))
+        await self.client.send(self.builder.build(0x0200, PHONE, bytes(28), seq=1))
+        reply = await self.client.reply()
+        self.assertEqual(reply[:2], b'\x80\x01')
+        self.assertEqual(self.server.forwarder.pending_dropped, 1)
+
+        # 退避期间不再转发，直接本地应答
+        await self.client.send(self.builder.build(0x0002, PHONE, seq=2))
+        self.assertEqual((await self.client.reply())[:2], b'\x80\x01')
+        stats = self.server.get_connection_stats()["upstream_replies"]
+        self.assertEqual(stats, {"enabled": True, "local_replies_skipped": 1, "local_replies_resent": 1})
+
+    async def test_evicted_link_closes_terminal(self):
+        # 每终端独立连接、上限1条：第二个终端接入时关闭第一个终端已空闲的链路
+        self.server.forwarder.set_forwarding_mode('per_terminal')
+        self.server.forwarder.max_links = 1
+        self.client = TerminalClient(*await asyncio.open_connection('127.0.0.1', self.port))
+        await self.client.send(self.builder.build(0x0100, PHONE, REGISTER_BODY, seq=1))
+        await self.client.reply()
+        await self.server.forwarder.flush(timeout=1)
+        # 只关闭空闲的链路
+        lru = self.server.forwarder._link_lru
+        for conn_key in lru:
+            lru[conn_key] -= 120
+
+        other = TerminalClient(*await asyncio.open_connection('127.0.0.1', self.port))
+        try:
+            await other.send(self.builder.build(0x0100, OTHER_PHONE, REGISTER_BODY, seq=1))
+            self.assertTrue((await other.reply()).endswith(AUTH_CODE))
+            # 第一个终端已失去上游鉴权，被断开以便重连后重新注册
+            with self.assertRaises(ConnectionError):
+                await self.client.reply()
+            self.assertEqual(self.server.forwarder.links_evicted, 1)
+            await asyncio.sleep(0.05)
+            reasons = [conn["disconnect_reason"] for conn in self.server.get_connection_stats()["recent_disconnects"]]
+            self.assertEqual(reasons, ["上游平台连接已关闭，断开终端以重新注册鉴权"])
+        finally:
+            other.writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
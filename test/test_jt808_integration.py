@@ -9,7 +9,7 @@ import time
 import importlib.util
 
 # 动态加载模块
-tcp_server_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../jt808proxy/core/tcp_server.py'))
+tcp_server_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/tcp_server.py'))
 spec = importlib.util.spec_from_file_location("tcp_server", tcp_server_path)
 tcp_server = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(tcp_server)
@@ -30,9 +30,10 @@ async def test_jt808_integration():
     
     print("服务器已启动，开始测试JT808协议解析...")
     
-    # 构造JT808协议数据包
-    # 消息ID: 0x0200 (位置信息), 消息体属性: 0x0040, 手机号: 13912345678, 流水号: 1
-    jt808_data = bytes.fromhex('02 00 00 40 01 39 12 34 56 78 00 01')
+    # 构造JT808协议数据包（含标识位、校验码）
+    # 消息ID: 0x0200 (位置信息), 消息体长度: 28, 手机号: 13912345678, 流水号: 1
+    jt808_data = bytes.fromhex('7e 02 00 00 1c 01 39 12 34 56 78 00 01 00 00 00 00 00 00 00 00 02 60 e3 c8 '
+                               '06 f0 3c 68 00 32 02 58 00 5a 25 01 01 12 00 00 c1 7e')
     
     try:
         # 连接服务器
@@ -44,7 +45,7 @@ async def test_jt808_integration():
         client.send(jt808_data)
         print(f"发送JT808数据包: {jt808_data.hex()}")
         
-        # 接收响应
+        # 接收平台通用应答（0x8001）
         response = client.recv(1024)
         print(f"收到响应: {response.hex()}")
         
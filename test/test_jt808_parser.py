@@ -3,11 +3,12 @@ JT808协议头解析单元测试
 """
 import sys
 import os
+import pickle
 import unittest
 import importlib.util
 
 # 动态加载jt808_parser模块
-jt808_parser_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../jt808proxy/core/jt808_parser.py'))
+jt808_parser_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/jt808_parser.py'))
 spec = importlib.util.spec_from_file_location("jt808_parser", jt808_parser_path)
 jt808_parser = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(jt808_parser)
@@ -38,11 +39,92 @@ class TestJT808Parser(unittest.TestCase):
         self.assertEqual(header.pkg_total, 3)
         self.assertEqual(header.pkg_index, 2)
 
+    def test_parse_header_2019(self):
+        # 消息体属性: 0x4005 (版本标识)，协议版本号: 1，手机号BCD[10]
+        data = bytes.fromhex('02 00 40 05 01 00 00 00 00 01 39 12 34 56 78 00 09')
+        header = JT808Parser.parse_header(data)
+        self.assertEqual(header.version, 1)
+        self.assertEqual(header.phone, '13912345678')
+        self.assertEqual(header.msg_seq, 9)
+        self.assertEqual(header.body_offset, 17)
+        # 带分包
+        data = bytes.fromhex('02 00 60 05 01 00 00 00 00 01 39 12 34 56 78 00 09 00 02 00 01')
+        header = JT808Parser.parse_header(data)
+        self.assertEqual((header.pkg_total, header.pkg_index), (2, 1))
+        self.assertEqual(header.body_offset, 21)
+        # 2013版
+        header = JT808Parser.parse_header(bytes.fromhex('02 00 20 40 01 39 12 34 56 78 00 01 00 03 00 02'))
+        self.assertIsNone(header.version)
+        self.assertEqual(header.body_offset, 16)
+        # 2019版消息头长度不足
+        self.assertIsNone(JT808Parser.parse_header(bytes.fromhex('02 00 40 05 01 00 00 00 00 01 39 12 34')))
+
     def test_parse_header_invalid(self):
         # 长度不足
         data = bytes.fromhex('02 00 00 40 01 39 12')
         header = JT808Parser.parse_header(data)
         self.assertIsNone(header)
 
+    def test_parse_location_data(self):
+        # 纬度39.904200、经度116.407400，时间 2025-01-01 12:00:00
+        body = bytes.fromhex('00000001 00000002 0260e3c8 06f03c68 0032 0258 005a 250101120000')
+        location = JT808Parser.parse_location_data(memoryview(bytes(12) + body), 12)
+        self.assertEqual(location['alarm_flag'], 1)
+        self.assertEqual(location['status'], 2)
+        self.assertAlmostEqual(location['latitude'], 39.9042)
+        self.assertAlmostEqual(location['longitude'], 116.4074)
+        self.assertEqual(location['altitude'], 50)
+        self.assertEqual(location['speed'], 600)
+        self.assertEqual(location['direction'], 90)
+        self.assertEqual(location['time'], '2025-01-01 12:00:00')
+        self.assertIsNone(JT808Parser.parse_location_data(body[:-1]))
+
+    def test_parse_location_additional_items(self):
+        body = bytes.fromhex('00000000 00000001 0260e3c8 06f03c68 0032 0258 005a 250101120000')
+        body += bytes.fromhex('01 04 0001e240')      # 里程 12345.6 km
+        body += bytes.fromhex('02 02 01f4')          # 油量 50.0 L
+        body += bytes.fromhex('30 01 1f')            # 信号强度 31
+        body += bytes.fromhex('31 01 0c')            # 卫星数 12
+        body += bytes.fromhex('e1 03 aabbcc')        # 自定义附加信息
+        body += bytes.fromhex('03 02 00')            # 截断的附加信息项
+        location = JT808Parser.parse_location_data(body)
+        self.assertEqual(location.additional_ids, (0x01, 0x02, 0x30, 0x31, 0xE1))
+        self.assertAlmostEqual(location['mileage'], 12345.6)
+        self.assertAlmostEqual(location.get('fuel_consumption', 0), 50.0)
+        self.assertEqual(location['satellites'], 12)
+        self.assertEqual(location['engine_status'], 1)
+        self.assertEqual(location.get('recorder_speed', 0), 0)
+        self.assertNotIn('recorder_speed', location)
+        self.assertEqual(location.additional_items()[0xE1], bytes.fromhex('aabbcc'))
+        decoded = location.to_dict()
+        self.assertEqual(decoded['signal_strength'], 31)
+        self.assertEqual(pickle.loads(pickle.dumps(location)), decoded)
+
+    def test_iter_batch_locations(self):
+        items = []
+        for seq in range(3):
+            item = bytes.fromhex('00000000 00000000') + (39904200 + seq).to_bytes(4, 'big')
+            item += bytes.fromhex('06f03c68 0032 0258 005a 250101120000 30 01 1f')
+            items.append(len(item).to_bytes(2, 'big') + item)
+        body = bytes.fromhex('0004 01') + b''.join(items) + bytes.fromhex('0030 00')
+        self.assertEqual(JT808Parser.parse_batch_location_header(body), (4, 1))
+        locations = list(JT808Parser.iter_batch_locations(memoryview(bytes(12) + body), 12))
+        # 第4项数据截断，只产出前3项
+        self.assertEqual(len(locations), 3)
+        self.assertAlmostEqual(locations[2]['latitude'], 39.904202)
+        self.assertEqual([loc['signal_strength'] for loc in locations], [31, 31, 31])
+
+    def test_parse_terminal_register(self):
+        body = (bytes.fromhex('002c 0133') + b'ABCDE' + b'MODEL'.ljust(20, b'\x00')
+                + b'T000001' + b'\x01' + '京A12345'.encode('gbk'))
+        register = JT808Parser.parse_terminal_register(body)
+        self.assertEqual(register['province_id'], 44)
+        self.assertEqual(register['city_id'], 307)
+        self.assertEqual(register['manufacturer_id'], int.from_bytes(b'ABCDE', 'big'))
+        self.assertEqual(register['terminal_model'], 'MODEL')
+        self.assertEqual(register['terminal_id'], 'T000001')
+        self.assertEqual(register['plate_color'], 1)
+        self.assertEqual(register['plate_number'], '京A12345')
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+定位报文批量解码单元测试
+"""
+import os
+import struct
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+location_batch = load_module('location_batch')
+JT808Parser = load_module('jt808_parser').JT808Parser
+
+
+def build_location_frame(seq, time_bcd='250101120000'):
+    body = struct.pack('>IIIIHHH', seq, 3, 39904200 + seq, 116407400, 50, 600, seq % 360)
+    body += bytes.fromhex(time_bcd)
+    return struct.pack('>HH', 0x0200, len(body)) + bytes.fromhex('013912345678') + struct.pack('>H', seq) + body
+
+
+def build_location_frame_2019(seq, subpackage=False):
+    """2019 版本帧：版本标识位、协议版本号、10字节手机号，可带分包项"""
+    body = struct.pack('>IIIIHHH', seq, 3, 39904200 + seq, 116407400, 50, 600, seq % 360)
+    body += bytes.fromhex('250101120000')
+    props = 0x4000 | (0x2000 if subpackage else 0) | len(body)
+    header = struct.pack('>HHB', 0x0200, props, 1) + bytes.fromhex('00000000013912345678') + struct.pack('>H', seq)
+    if subpackage:
+        header += struct.pack('>HH', 1, 1)
+    return header + body
+
+
+@unittest.skipUnless(location_batch.numpy_available(), "需要安装 numpy")
+class TestLocationBatch(unittest.TestCase):
+    def test_matches_per_frame_parser(self):
+        import numpy as np
+        frames = [build_location_frame(seq) for seq in range(5)]
+        frames[3] = build_location_frame(3, '991231235959')
+        result = location_batch.decode_locations(frames)
+        self.assertEqual(len(result), 5)
+        for frame, record in zip(frames, result):
+            expected = JT808Parser.parse_location_data(frame, 12)
+            self.assertTrue(record['valid'])
+            for field in ('alarm_flag', 'status', 'altitude', 'speed', 'direction'):
+                self.assertEqual(record[field], expected[field])
+            self.assertAlmostEqual(record['latitude'], expected['latitude'])
+            self.assertAlmostEqual(record['longitude'], expected['longitude'])
+            self.assertEqual(str(record['time']).replace('T', ' '), expected['time'])
+        self.assertEqual(list(result['msg_seq']), [0, 1, 2, 3, 4])
+        self.assertEqual(result['time'][3], np.datetime64('2099-12-31T23:59:59'))
+
+    def test_buffer_with_offsets_and_invalid_frames(self):
+        import numpy as np
+        frames = [build_location_frame(1), build_location_frame(2)[:30], build_location_frame(3, '251301000000')]
+        offsets = [0, len(frames[0]), len(frames[0]) + len(frames[1])]
+        result = location_batch.decode_location_buffer(b''.join(frames), offsets)
+        self.assertEqual(list(result['valid']), [True, False, True])
+        self.assertEqual(result['latitude'][1], 0)
+        self.assertTrue(np.isnat(result['time'][1]))
+        # 月份13为非法BCD时间
+        self.assertTrue(np.isnat(result['time'][2]))
+        self.assertEqual(result['msg_seq'][2], 3)
+
+    def test_2019_frames(self):
+        frames = [build_location_frame(1), build_location_frame_2019(2),
+                  build_location_frame_2019(3, subpackage=True), build_location_frame_2019(4)[:40]]
+        result = location_batch.decode_locations(frames)
+        # 2019 版本帧按17字节消息头解码，与2013版本帧混合时各自定位消息体和流水号
+        self.assertEqual(list(result['valid']), [True, True, True, False])
+        self.assertEqual(list(result['msg_seq']), [1, 2, 3, 0])
+        self.assertEqual(list(result['alarm_flag']), [1, 2, 3, 0])
+        expected = JT808Parser.parse_location_data(frames[1], 17)
+        self.assertAlmostEqual(result['latitude'][1], expected['latitude'])
+        self.assertEqual(str(result['time'][2]).replace('T', ' '), expected['time'])
+
+    def test_day_beyond_month_length(self):
+        import numpy as np
+        frames = [build_location_frame(1, '240231000000'), build_location_frame(2, '240229235959'),
+                  build_location_frame(3, '250229000000'), build_location_frame(4, '250431000000'),
+                  build_location_frame(5, '251231000000')]
+        times = location_batch.decode_locations(frames)['time']
+        # 2024-02-31、2025-02-29、2025-04-31 不存在，不能进位成下个月的日期
+        self.assertTrue(np.isnat(times[0]))
+        self.assertEqual(times[1], np.datetime64('2024-02-29T23:59:59'))
+        self.assertTrue(np.isnat(times[2]))
+        self.assertTrue(np.isnat(times[3]))
+        self.assertEqual(times[4], np.datetime64('2025-12-31T00:00:00'))
+
+    def test_empty(self):
+        self.assertEqual(len(location_batch.decode_locations([])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+日志管理单元测试
+"""
+import logging
+import os
+import tempfile
+import time
+import unittest
+import importlib.util
+
+# 动态加载log_manager模块
+log_manager_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/monitor/log_manager.py'))
+spec = importlib.util.spec_from_file_location("log_manager", log_manager_path)
+log_manager = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(log_manager)
+
+
+class TestLogSampler(unittest.TestCase):
+    def test_every_n(self):
+        sampler = log_manager.LogSampler(3)
+        self.assertEqual([sampler() for _ in range(7)], [False, False, True, False, False, True, False])
+        always = log_manager.LogSampler(0)
+        self.assertTrue(always())
+
+
+class TestLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.root_handlers = logging.getLogger().handlers[:]
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        log_manager.stop_logging()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in self.root_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.root_level)
+
+    def test_queue_listener_writes_file(self):
+        log_file = os.path.join(self.tmpdir, 'logs', 'proxy.log')
+        log_manager.setup_logging('INFO', log_file=log_file, console=False)
+        logger = logging.getLogger('test_log_manager')
+        logger.info("终端 %s 上线", '013912345678')
+        logger.debug("不应写出")
+        log_manager.stop_logging()
+        with open(log_file, encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('终端 013912345678 上线', content)
+        self.assertNotIn('不应写出', content)
+
+    def test_rotation_purges_expired(self):
+        log_file = os.path.join(self.tmpdir, 'proxy.log')
+        handler = log_manager.RetentionRotatingFileHandler(log_file, max_bytes=50, retention_days=1)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        expired = log_file + '.9'
+        with open(expired, 'w') as f:
+            f.write('old')
+        old = time.time() - 3 * 86400
+        os.utime(expired, (old, old))
+        for i in range(5):
+            handler.emit(logging.makeLogRecord({'msg': 'x' * 30}))
+        handler.close()
+        self.assertFalse(os.path.exists(expired))
+        self.assertTrue(os.path.exists(log_file + '.1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
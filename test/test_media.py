@@ -0,0 +1,147 @@
+"""
+多媒体上传接收器单元测试
+"""
+import os
+import struct
+import tempfile
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Parser = load_module('jt808_parser').JT808Parser
+JT808Builder = load_module('builder').JT808Builder
+media = load_module('media')
+MediaUploadSink = media.MediaUploadSink
+
+PHONE = '13912345678'
+LOCATION = struct.pack('>IIIIHHH', 0, 2, 39904200, 116407400, 50, 600, 90) + bytes.fromhex('250101120000')
+
+
+def media_fragments(media_id, data, chunk_size, first_seq=100, media_format=0):
+    """把多媒体数据按固定消息体长度切分为 0x0801 分包帧（消息头+消息体，未转义）"""
+    payload = struct.pack('>IBBBB', media_id, 0, media_format, 1, 2) + LOCATION + data
+    chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+    builder = JT808Builder()
+    return [builder.build_content(0x0801, PHONE, chunk, seq=(first_seq + i) & 0xFFFF,
+                                  pkg_total=len(chunks), pkg_index=i + 1)
+            for i, chunk in enumerate(chunks)]
+
+
+class TestMediaUploadSink(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.records = []
+        self.sink = MediaUploadSink(self.tmp.name, on_complete=self.records.append,
+                                    timeout=60, retransmit_interval=5)
+
+    def tearDown(self):
+        self.sink.close()
+        self.tmp.cleanup()
+
+    async def feed(self, frame, now=0.0):
+        return await self.sink.add_fragment(JT808Parser.parse_header(frame), memoryview(frame), now)
+
+    async def test_in_order_upload(self):
+        data = os.urandom(5000)
+        frames = media_fragments(7, data, 1000)
+        replies = [await self.feed(frame) for frame in frames]
+        self.assertTrue(all(reply is None for reply in replies[:-1]))
+        done = replies[-1]
+        self.assertEqual((done.msg_id, done.missing), (0x8800, []))
+        self.assertEqual(done.to_body(), struct.pack('>IB', 7, 0))
+        record, = self.records
+        self.assertEqual((record.media_id, record.size, record.channel_id), (7, len(data), 2))
+        self.assertAlmostEqual(record.location['latitude'], 39.9042)
+        # 文件名：手机号_多媒体ID_接收时间_首包流水号.扩展名
+        self.assertRegex(os.path.basename(record.path), rf'^{PHONE}_7_\d{{14}}_100\.jpg$')
+        with open(record.path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.listdir(os.path.dirname(record.path)), [os.path.basename(record.path)])
+
+    async def test_missing_fragments_and_retransmit(self):
+        data = os.urandom(4100)
+        frames = media_fragments(8, data, 1000)
+        # 末包先到（分包长度未知时暂存），立即请求重传；首包未到时多媒体ID未知，退回 0x8003
+        reply = await self.feed(frames[-1])
+        self.assertEqual((reply.msg_id, reply.missing), (0x8003, [1, 2, 3, 4]))
+        # 第3包丢失，重复的末包被忽略
+        for index in (0, 1, 3):
+            self.assertIsNone(await self.feed(frames[index]))
+        self.assertIsNone(await self.feed(frames[-1]))
+        self.assertEqual(self.sink.duplicate_fragments, 1)
+        reply, = self.sink.check_timeouts(now=10.0)
+        self.assertEqual((reply.msg_id, reply.media_id, reply.missing), (0x8800, 8, [3]))
+        self.assertEqual(reply.to_body(), struct.pack('>IBH', 8, 1, 3))
+        # 补传的分包使用新的流水号
+        resent = media_fragments(8, data, 1000, first_seq=500)[2]
+        done = await self.feed(resent, now=11.0)
+        self.assertEqual(done.missing, [])
+        with open(self.records[0].path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    async def test_last_fragment_with_gap_requests_retransmit(self):
+        frames = media_fragments(9, os.urandom(3000), 1000)
+        await self.feed(frames[0])
+        reply = await self.feed(frames[-1])
+        self.assertEqual(reply.missing, [2, 3])
+
+    async def test_unknown_media_id_falls_back_to_0x8003(self):
+        frames = media_fragments(10, os.urandom(3000), 1000, first_seq=20)
+        await self.feed(frames[1])
+        reply = self.sink.check_timeouts(now=10.0)[0]
+        self.assertEqual((reply.msg_id, reply.missing), (0x8003, [1, 3, 4]))
+        self.assertEqual(reply.to_body(), struct.pack('>HB3H', 20, 3, 1, 3, 4))
+
+    async def test_single_frame_upload(self):
+        data = os.urandom(300)
+        frame = JT808Builder().build_content(0x0801, PHONE, struct.pack('>IBBBB', 11, 2, 3, 0, 1) + LOCATION + data, seq=5)
+        done = await self.feed(frame)
+        self.assertEqual(done.missing, [])
+        self.assertTrue(self.records[0].path.endswith('_5.wav'))
+        self.assertEqual(self.records[0].size, len(data))
+
+    async def test_timeout_removes_partial_file(self):
+        frames = media_fragments(12, os.urandom(3000), 1000)
+        await self.feed(frames[0])
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp.name, PHONE))), 1)
+        self.sink.check_timeouts(now=100.0)
+        await self.sink.flush()
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, PHONE)), [])
+        self.assertEqual(self.sink.aborted, 1)
+        # 已放弃上传的迟到分包被忽略
+        self.assertIsNone(await self.feed(frames[1], now=101.0))
+        self.assertEqual(self.sink.get_stats()["active_uploads"], 0)
+
+    async def test_reused_media_id_keeps_both_files(self):
+        # 终端重启后多媒体ID从头计数，同一ID的两次上传各自保存
+        first, second = os.urandom(1500), os.urandom(1500)
+        for frame in media_fragments(14, first, 1000, first_seq=30):
+            await self.feed(frame)
+        for frame in media_fragments(14, second, 1000, first_seq=40):
+            await self.feed(frame)
+        self.assertEqual(len(self.records), 2)
+        self.assertNotEqual(self.records[0].path, self.records[1].path)
+        for record, data in zip(self.records, (first, second)):
+            with open(record.path, 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    async def test_inconsistent_chunk_size_aborts(self):
+        frames = media_fragments(13, os.urandom(3000), 1000)
+        await self.feed(frames[0])
+        odd = media_fragments(13, os.urandom(3000), 900)[1]
+        self.assertIsNone(await self.feed(odd))
+        self.assertEqual(self.sink.aborted, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ import time
 import importlib.util
 
 # 动态加载模块
-monitor_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../jt808proxy/monitor/monitor.py'))
+monitor_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/monitor/monitor.py'))
 spec = importlib.util.spec_from_file_location("monitor", monitor_path)
 monitor = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(monitor)
@@ -0,0 +1,113 @@
+"""
+出站发送队列单元测试
+"""
+import os
+import asyncio
+import unittest
+import importlib.util
+
+# 动态加载outbound模块
+outbound_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/outbound.py'))
+spec = importlib.util.spec_from_file_location("outbound", outbound_path)
+outbound = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(outbound)
+OutboundQueue = outbound.OutboundQueue
+OverflowPolicy = outbound.OverflowPolicy
+
+
+class SlowWriter:
+    """模拟慢速对端：drain() 直到放行前一直阻塞"""
+    def __init__(self):
+        self.writes = []
+        self.closed = False
+        self.released = asyncio.Event()
+
+    def write(self, data):
+        self.writes.append([data])
+
+    def writelines(self, data):
+        self.writes.append(list(data))
+
+    async def drain(self):
+        await self.released.wait()
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def received(self):
+        return b''.join(b''.join(batch) for batch in self.writes)
+
+
+class TestOutboundQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesced_writes(self):
+        writer = SlowWriter()
+        queue = OutboundQueue(writer, max_bytes=1000)
+        queue.put(b'a')
+        await asyncio.sleep(0)
+        # 第一批写出后阻塞在 drain，期间的数据合并为下一批
+        for data in (b'b', b'c', b'd'):
+            queue.put(data)
+        writer.released.set()
+        await queue.flush(timeout=1)
+        self.assertEqual(writer.writes, [[b'a'], [b'b', b'c', b'd']])
+        self.assertEqual(queue.batches_written, 2)
+        self.assertEqual(queue.queued_bytes, 0)
+
+    async def test_drop_oldest(self):
+        writer = SlowWriter()
+        queue = OutboundQueue(writer, max_bytes=10)
+        queue.put(b'x' * 4)
+        await asyncio.sleep(0)
+        for i in range(4):
+            self.assertTrue(queue.put(bytes([0x30 + i]) * 4))
+        self.assertEqual(queue.items_dropped, 2)
+        writer.released.set()
+        await queue.flush(timeout=1)
+        self.assertEqual(writer.received, b'xxxx' + b'2222' + b'3333')
+
+    async def test_disconnect_policy(self):
+        closed = []
+        writer = SlowWriter()
+        queue = OutboundQueue(writer, max_bytes=10, policy='disconnect', on_close=closed.append)
+        queue.put(b'x' * 4)
+        await asyncio.sleep(0)
+        self.assertTrue(queue.put(b'y' * 8))
+        self.assertFalse(queue.put(b'z' * 8))
+        self.assertTrue(writer.closed)
+        self.assertEqual(closed, [queue])
+        self.assertFalse(queue.put(b'again'))
+
+    async def test_spill_keeps_order(self):
+        writer = SlowWriter()
+        queue = OutboundQueue(writer, max_bytes=8, policy=OverflowPolicy.SPILL)
+        queue.put(b'0000')
+        await asyncio.sleep(0)
+        for i in range(1, 6):
+            self.assertTrue(queue.put(bytes([0x30 + i]) * 4))
+        self.assertGreater(queue.bytes_spilled, 0)
+        writer.released.set()
+        await queue.flush(timeout=1)
+        self.assertEqual(writer.received, b''.join(bytes([0x30 + i]) * 4 for i in range(6)))
+        self.assertEqual(queue.queued_bytes, 0)
+
+    async def test_watermarks(self):
+        writer = SlowWriter()
+        queue = OutboundQueue(writer, max_bytes=100, high_watermark=50, low_watermark=10)
+        queue.put(b'a')
+        await asyncio.sleep(0)
+        queue.put(b'b' * 60)
+        self.assertTrue(queue.is_congested)
+        self.assertEqual(queue.high_watermark_events, 1)
+        writer.released.set()
+        await queue.flush(timeout=1)
+        self.assertFalse(queue.is_congested)
+        self.assertEqual(queue.low_watermark_events, 1)
+        self.assertEqual(queue.peak_bytes, 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+JT808分包重组单元测试
+"""
+import os
+import struct
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+spec = importlib.util.spec_from_file_location("jt808_parser", os.path.join(core_dir, 'jt808_parser.py'))
+jt808_parser = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(jt808_parser)
+JT808Parser = jt808_parser.JT808Parser
+spec = importlib.util.spec_from_file_location("reassembly", os.path.join(core_dir, 'reassembly.py'))
+reassembly = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(reassembly)
+SubpackageReassembler = reassembly.SubpackageReassembler
+
+PHONE_BCD = bytes.fromhex('013912345678')
+
+
+def build_fragment(msg_id, seq, total, index, body):
+    """构造分包帧（消息头+消息体）"""
+    return (struct.pack('>HH', msg_id, 0x2000 | len(body)) + PHONE_BCD +
+            struct.pack('>HHH', seq, total, index) + body)
+
+
+def split_message(msg_id, first_seq, payload, size):
+    chunks = [payload[i:i + size] for i in range(0, len(payload), size)]
+    return [build_fragment(msg_id, (first_seq + i) & 0xFFFF, len(chunks), i + 1, chunk)
+            for i, chunk in enumerate(chunks)]
+
+
+class TestSubpackageReassembler(unittest.TestCase):
+    def feed(self, reassembler, frame, now=0.0):
+        return reassembler.add_fragment(JT808Parser.parse_header(frame), frame, now=now)
+
+    def test_in_order(self):
+        payload = bytes(range(256)) * 3
+        frames = split_message(0x0801, 100, payload, 200)
+        reassembler = SubpackageReassembler()
+        results = [self.feed(reassembler, f) for f in frames]
+        self.assertTrue(all(r is None for r in results[:-1]))
+        message = results[-1]
+        header = JT808Parser.parse_header(message)
+        self.assertEqual(header.msg_id, 0x0801)
+        self.assertEqual(header.msg_seq, 100)
+        self.assertIsNone(header.pkg_total)
+        self.assertEqual(message[12:], payload)
+        self.assertEqual(reassembler.total_bytes, 0)
+
+    def test_protocol_2019(self):
+        payload = os.urandom(500)
+        phone_bcd = bytes.fromhex('00000000013912345678')
+        frames = []
+        for index, offset in enumerate(range(0, len(payload), 200), start=1):
+            chunk = payload[offset:offset + 200]
+            frames.append(struct.pack('>HHB', 0x0801, 0x6000 | len(chunk), 1) + phone_bcd +
+                          struct.pack('>HHH', 50 + index - 1, 3, index) + chunk)
+        reassembler = SubpackageReassembler()
+        message = [self.feed(reassembler, f) for f in frames][-1]
+        header = JT808Parser.parse_header(message)
+        self.assertEqual(header.version, 1)
+        self.assertEqual(header.phone, '13912345678')
+        self.assertEqual(header.msg_seq, 50)
+        self.assertIsNone(header.pkg_total)
+        self.assertEqual(message[header.body_offset:], payload)
+
+    def test_out_of_order_and_duplicate(self):
+        payload = os.urandom(1000)
+        frames = split_message(0x0801, 0xFFFE, payload, 300)
+        reassembler = SubpackageReassembler()
+        self.assertIsNone(self.feed(reassembler, frames[2]))
+        self.assertIsNone(self.feed(reassembler, frames[0]))
+        self.assertIsNone(self.feed(reassembler, frames[0]))
+        self.assertIsNone(self.feed(reassembler, frames[3]))
+        message = self.feed(reassembler, frames[1])
+        self.assertEqual(message[12:], payload)
+        self.assertEqual(reassembler.duplicate_fragments, 1)
+        # 完成后迟到的重复分包被忽略
+        self.assertIsNone(self.feed(reassembler, frames[1]))
+        self.assertEqual(reassembler.get_stats()['pending_messages'], 0)
+
+    def test_retransmit_request_and_timeout(self):
+        frames = split_message(0x0801, 10, os.urandom(900), 300)
+        reassembler = SubpackageReassembler(timeout=60, retransmit_interval=5, max_retransmits=2)
+        self.feed(reassembler, frames[0], now=0.0)
+        self.assertEqual(reassembler.check_timeouts(now=1.0), [])
+        requests = reassembler.check_timeouts(now=6.0)
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0].missing, [2, 3])
+        self.assertEqual(requests[0].to_body(), bytes.fromhex('000a 02 0002 0003'))
+        # 补传的分包使用新流水号，仍能按缺失包序号归入原消息
+        self.assertIsNone(self.feed(reassembler, build_fragment(0x0801, 500, 3, 2, frames[1][16:]), now=7.0))
+        self.assertIsNotNone(self.feed(reassembler, build_fragment(0x0801, 501, 3, 3, frames[2][16:]), now=7.0))
+
+        self.feed(reassembler, frames[0], now=100.0)
+        self.assertEqual(reassembler.check_timeouts(now=200.0), [])
+        self.assertEqual(reassembler.timeouts, 0)
+        self.feed(reassembler, split_message(0x0801, 50, os.urandom(900), 300)[0], now=100.0)
+        self.assertEqual(reassembler.check_timeouts(now=200.0), [])
+        self.assertEqual(reassembler.timeouts, 1)
+
+    def test_memory_caps(self):
+        reassembler = SubpackageReassembler(max_bytes_per_terminal=1000, max_total_bytes=10000)
+        first = split_message(0x0801, 1, os.urandom(1200), 400)
+        second = split_message(0x0801, 20, os.urandom(1200), 400)
+        self.feed(reassembler, first[0])
+        self.feed(reassembler, first[1])
+        # 超过终端上限时淘汰该终端最旧的消息
+        self.feed(reassembler, second[0])
+        self.feed(reassembler, second[1])
+        self.assertEqual(reassembler.evictions, 1)
+        self.assertLessEqual(reassembler.total_bytes, 1000)
+        # 单条消息本身超过上限则放弃重组
+        self.assertIsNone(self.feed(reassembler, second[2]))
+        self.assertEqual(reassembler.total_bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
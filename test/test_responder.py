@@ -0,0 +1,83 @@
+"""
+平台应答生成器单元测试
+"""
+import os
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+
+
+def load_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(core_dir, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+JT808Parser = load_module('jt808_parser').JT808Parser
+JT808FrameDecoder = load_module('frame_decoder').JT808FrameDecoder
+JT808Responder = load_module('responder').JT808Responder
+
+
+def decode(wire):
+    frames = [bytes(f) for f in JT808FrameDecoder().feed(wire)]
+    assert len(frames) == 1
+    return JT808Parser.parse_header(frames[0]), frames[0][12:]
+
+
+class TestJT808Responder(unittest.TestCase):
+    def test_general_reply(self):
+        responder = JT808Responder()
+        header = JT808Parser.parse_header(bytes.fromhex('02 00 00 1c 01 39 12 34 56 78 00 07'))
+        reply_header, body = decode(responder.reply_for(header))
+        self.assertEqual(reply_header.msg_id, 0x8001)
+        self.assertEqual(reply_header.phone, '13912345678')
+        self.assertEqual(reply_header.body_props, 5)
+        self.assertEqual(body, bytes.fromhex('0007 0200 00'))
+
+    def test_register_reply(self):
+        responder = JT808Responder(auth_code_provider=lambda phone: 'AUTH' + phone[-4:])
+        header = JT808Parser.parse_header(bytes.fromhex('01 00 00 25 01 39 12 34 56 78 00 02'))
+        reply_header, body = decode(responder.reply_for(header))
+        self.assertEqual(reply_header.msg_id, 0x8100)
+        self.assertEqual(body, bytes.fromhex('0002 00') + b'AUTH5678')
+
+    def test_platform_seq_and_escape(self):
+        responder = JT808Responder()
+        first, _ = decode(responder.general_reply('13912345678', 1, 0x0002))
+        second, _ = decode(responder.general_reply('13912345678', 2, 0x0002))
+        self.assertEqual(second.msg_seq, first.msg_seq + 1)
+        # 应答流水号中出现0x7E时需要转义
+        wire = responder.general_reply('13912345678', 0x7E7D, 0x0002)
+        self.assertEqual(wire.count(0x7E), 2)
+        _, body = decode(wire)
+        self.assertEqual(body[:2], bytes.fromhex('7e7d'))
+
+    def test_reply_2019(self):
+        responder = JT808Responder()
+        header = JT808Parser.parse_header(bytes.fromhex('02 00 40 00 01 00 00 00 00 01 39 12 34 56 78 00 07'))
+        frames = [bytes(f) for f in JT808FrameDecoder().feed(responder.reply_for(header))]
+        reply_header = JT808Parser.parse_header(frames[0])
+        self.assertEqual(reply_header.msg_id, 0x8001)
+        self.assertEqual(reply_header.version, 1)
+        self.assertEqual(reply_header.phone, '13912345678')
+        self.assertEqual(reply_header.body_props, 0x4005)
+        self.assertEqual(frames[0][reply_header.body_offset:], bytes.fromhex('0007 0200 00'))
+
+    def test_heartbeat_reply_matches_general_reply(self):
+        frame = bytes.fromhex('00 02 00 00 01 39 12 34 56 78 7e 7d')
+        fast, slow = JT808Responder(), JT808Responder()
+        header = JT808Parser.parse_header(frame)
+        self.assertEqual(fast.heartbeat_reply(frame[4:10], frame[10:12]), slow.reply_for(header))
+        self.assertEqual(fast.replies_built, 1)
+
+    def test_no_reply_for_terminal_ack(self):
+        responder = JT808Responder()
+        header = JT808Parser.parse_header(bytes.fromhex('00 01 00 05 01 39 12 34 56 78 00 03'))
+        self.assertIsNone(responder.reply_for(header))
+
+
+if __name__ == '__main__':
+    unittest.main()
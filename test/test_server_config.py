@@ -0,0 +1,108 @@
+"""
+系统配置接入单元测试（管理界面保存的配置 -> TCPServer / Forwarder / 日志参数）
+"""
+import os
+import asyncio
+import unittest
+import importlib.util
+
+# 动态加载模块
+core_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core'))
+storage_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/storage'))
+
+
+def load_module(name, directory=core_dir):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tcp_server = load_module('tcp_server')
+DatabaseManager = load_module('database', storage_dir).DatabaseManager
+TCPServer = tcp_server.TCPServer
+
+
+class MemoryStorage:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TestServerConfig(unittest.IsolatedAsyncioTestCase):
+    def test_load_and_convert(self):
+        db_manager = DatabaseManager(":memory:")
+        try:
+            for key, value in (('tcp_max_connections', '5000'), ('tcp_accept_rate', '50'),
+                               ('tcp_forward_heartbeats', 'false'), ('tcp_dedup_window', 'abc'),
+                               ('forward_target_server', '10.0.0.1:7900'), ('log_max_size', '20'),
+                               ('web_port', '7000')):
+                db_manager.set_config(key, value)
+            configs = tcp_server.load_system_config(db_manager)
+        finally:
+            db_manager.close()
+        # 取值按参数类型转换，无效取值与无关配置不出现在结果中
+        self.assertEqual(tcp_server.options_from_config(configs), {
+            'max_connections': 5000, 'accept_rate': 50.0, 'forward_heartbeats': False,
+            'forward_target': '10.0.0.1:7900'
+        })
+        self.assertEqual(tcp_server.options_from_config(configs, tcp_server.LOG_CONFIG_KEYS),
+                         {'max_size_mb': 20})
+        self.assertEqual(tcp_server.load_system_config(MemoryStorage()), {})
+
+    async def test_server_applies_config(self):
+        configs = {
+            'tcp_max_connections': '5000', 'tcp_dedup_window': '64', 'tcp_media_dir': '/tmp/jt808-media',
+            'log_sample_rate': '10', 'forward_enabled': 'false', 'forward_timeout': '5',
+            'forward_target_server': '10.0.0.1:7900', 'forward_queue_max_bytes': '4096',
+            'forward_overflow_policy': 'disconnect', 'forward_mode': 'per_terminal',
+            'forward_max_links': '100', 'forward_link_idle_timeout': '30', 'forward_upstream_replies': 'false'
+        }
+        server = TCPServer(db_manager=MemoryStorage(), **tcp_server.options_from_config(configs))
+        self.assertEqual(server.admission.max_connections, 5000)
+        self.assertEqual(server.dedup.window_size, 64)
+        self.assertEqual(server.media_sink.media_dir, '/tmp/jt808-media')
+        self.assertEqual(server.log_sampler.every, 10)
+        self.assertFalse(server.forward_enabled)
+        self.assertFalse(server.forward_upstream_replies)
+        forwarder = server.forwarder
+        self.assertEqual(forwarder.config.mode, 'per_terminal')
+        target = forwarder.config.default_target
+        self.assertEqual((target.host, target.port), ('10.0.0.1', 7900))
+        self.assertEqual((forwarder.connect_timeout, forwarder.queue_max_bytes), (5.0, 4096))
+        self.assertEqual(forwarder.overflow_policy.value, 'disconnect')
+        self.assertEqual((forwarder.max_links, forwarder.link_idle_timeout), (100, 30.0))
+
+    def test_invalid_values_fall_back(self):
+        configs = {
+            'tcp_dedup_mode': 'ignore', 'tcp_outbound_policy': 'block', 'forward_overflow_policy': 'DROP',
+            'forward_mode': 'broadcast', 'forward_target_server': '10.0.0.1', 'forward_enabled': 'yes',
+            'tcp_max_connections': '5000', 'log_level': 'verbose'
+        }
+        with self.assertLogs(tcp_server.logger, 'WARNING') as logs:
+            options = tcp_server.options_from_config(configs)
+            log_options = tcp_server.options_from_config(configs, tcp_server.LOG_CONFIG_KEYS)
+        # 无效取值逐项记录警告并沿用默认值，有效取值照常生效
+        self.assertEqual(options, {'max_connections': 5000})
+        self.assertEqual(log_options, {})
+        self.assertEqual(len(logs.output), 7)
+        server = TCPServer(db_manager=MemoryStorage(), **options)
+        self.assertEqual(server.forwarder.config.mode, 'one_to_one')
+
+    def test_target_server_address(self):
+        for value in ('10.0.0.1:', ':7900', '10.0.0.1:port', '10.0.0.1:70000'):
+            with self.assertLogs(tcp_server.logger, 'WARNING'):
+                self.assertEqual(tcp_server.options_from_config({'forward_target_server': value}), {})
+        self.assertEqual(tcp_server.options_from_config({'forward_target_server': ' gateway.local:7900 '}),
+                         {'forward_target': 'gateway.local:7900'})
+        self.assertEqual(tcp_server.options_from_config({'tcp_dedup_mode': 'flag', 'log_level': 'debug'}),
+                         {'dedup_mode': 'flag'})
+        self.assertEqual(tcp_server.options_from_config({'log_level': 'debug'}, tcp_server.LOG_CONFIG_KEYS),
+                         {'level': 'DEBUG'})
+
+    def test_media_dir_default_matches_config(self):
+        server = TCPServer(db_manager=MemoryStorage())
+        self.assertEqual(server.media_sink.media_dir, './data/media')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+终端会话注册表单元测试
+"""
+import os
+import unittest
+import importlib.util
+
+# 动态加载session模块
+session_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/session.py'))
+spec = importlib.util.spec_from_file_location("session", session_path)
+session_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(session_module)
+SessionRegistry = session_module.SessionRegistry
+
+
+class FakeWriter:
+    """模拟 asyncio.StreamWriter"""
+    def __init__(self):
+        self.closed = False
+        self.data = []
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def write(self, data):
+        self.data.append(data)
+
+
+class TestSessionRegistry(unittest.TestCase):
+    def test_bind_and_lookup(self):
+        registry = SessionRegistry()
+        writer = FakeWriter()
+        session = registry.register('127.0.0.1:5000', writer)
+        self.assertIsNone(registry.get_by_phone('13912345678'))
+        self.assertIsNone(registry.bind_phone(session, '13912345678'))
+        self.assertIs(registry.get_by_phone('13912345678'), session)
+        self.assertIs(registry.get_writer('13912345678'), writer)
+        self.assertEqual(session.phone, '13912345678')
+        self.assertTrue(registry.send_to_terminal('13912345678', b'\x7e\x7e'))
+        self.assertEqual(writer.data, [b'\x7e\x7e'])
+
+    def test_reconnect_takeover(self):
+        registry = SessionRegistry()
+        old = registry.register('127.0.0.1:5000', FakeWriter())
+        new = registry.register('127.0.0.1:5001', FakeWriter())
+        registry.bind_phone(old, '13912345678')
+        previous = registry.bind_phone(new, '13912345678')
+        self.assertIs(previous, old)
+        self.assertTrue(old.writer.closed)
+        self.assertIsNone(old.phone)
+        self.assertEqual(registry.takeovers, 1)
+        # 旧连接随后注销，不影响新连接的绑定
+        registry.unregister(old)
+        self.assertIs(registry.get_by_phone('13912345678'), new)
+        self.assertEqual(len(registry), 1)
+        registry.unregister(new)
+        self.assertIsNone(registry.get_by_phone('13912345678'))
+        self.assertEqual(registry.get_stats()['sessions'], 0)
+
+    def test_rebind_other_phone(self):
+        registry = SessionRegistry()
+        session = registry.register('127.0.0.1:5000', FakeWriter())
+        registry.bind_phone(session, '13900000001')
+        registry.bind_phone(session, '13900000002')
+        self.assertIsNone(registry.get_by_phone('13900000001'))
+        self.assertIs(registry.get_by_phone('13900000002'), session)
+        self.assertEqual(registry.bound_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
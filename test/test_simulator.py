@@ -5,59 +5,33 @@ JT808终端模拟器
 """
 
 import asyncio
+import os
 import socket
 import struct
 import time
 import random
+import importlib.util
 from datetime import datetime
 
+# 动态加载报文编码模块
+builder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/builder.py'))
+spec = importlib.util.spec_from_file_location("builder", builder_path)
+builder = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(builder)
+JT808Builder = builder.JT808Builder
+
 class JT808Simulator:
     def __init__(self, host='localhost', port=16900):
         self.host = host
         self.port = port
         self.terminal_phone = "13800138001"  # 模拟终端手机号
         self.msg_seq = 1  # 消息流水号
+        self.builder = JT808Builder()
         
     def create_jt808_header(self, msg_id, msg_body=b""):
-        """创建JT808协议头"""
-        # 消息ID (2字节)
-        # 消息体属性 (2字节) - 包含消息体长度
-        msg_body_len = len(msg_body)
-        msg_attr = msg_body_len
-        
-        # 终端手机号 (6字节) - BCD编码
-        # 将手机号转换为BCD格式（每两位数字占一个字节）
-        phone_bcd = b''
-        for i in range(0, len(self.terminal_phone), 2):
-            if i + 1 < len(self.terminal_phone):
-                # 两个数字组成一个字节
-                high = int(self.terminal_phone[i])
-                low = int(self.terminal_phone[i + 1])
-                phone_bcd += bytes([high * 16 + low])
-            else:
-                # 最后一个数字，高位补0
-                low = int(self.terminal_phone[i])
-                phone_bcd += bytes([low])
-        
-        # 确保长度为6字节，不足补0
-        while len(phone_bcd) < 6:
-            phone_bcd += b'\x00'
-        
-        # 消息流水号 (2字节)
-        msg_seq_bytes = struct.pack('>H', self.msg_seq)
-        
-        # 组装协议头
-        header = struct.pack('>HH', msg_id, msg_attr) + phone_bcd + msg_seq_bytes
-        
-        # 计算校验码
-        checksum = 0
-        for byte in header + msg_body:
-            checksum ^= byte
-        
-        # 添加校验码和标识位
-        packet = b'\x7e' + header + msg_body + struct.pack('B', checksum) + b'\x7e'
-        
-        self.msg_seq += 1
+        """创建完整的JT808线上帧（消息头、校验码、转义、标识位）"""
+        packet = self.builder.build(msg_id, self.terminal_phone, msg_body, seq=self.msg_seq)
+        self.msg_seq = (self.msg_seq + 1) & 0xFFFF
         return packet
     
     def create_location_data(self, lat, lng, altitude=100, speed=60):
@@ -0,0 +1,60 @@
+"""
+多进程监管模块单元测试
+"""
+import os
+import queue
+import unittest
+import importlib.util
+
+# 动态加载supervisor模块
+supervisor_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/supervisor.py'))
+spec = importlib.util.spec_from_file_location("supervisor", supervisor_path)
+supervisor = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(supervisor)
+QueuedStorage = supervisor.QueuedStorage
+WorkerSupervisor = supervisor.WorkerSupervisor
+
+
+class TestQueuedStorage(unittest.TestCase):
+    def test_batches_locations(self):
+        channel = queue.Queue()
+        storage = QueuedStorage(channel, worker_id=3, batch_size=3)
+        storage.insert_location_data('013912345678', 1, {'latitude': 1})
+        storage.insert_location_data('013912345678', 2, {'latitude': 2})
+        self.assertTrue(channel.empty())
+        storage.insert_location_data('013912345678', 3, {'latitude': 3})
+        kind, worker_id, payload = channel.get_nowait()
+        self.assertEqual(kind, supervisor.MSG_STORAGE)
+        self.assertEqual(worker_id, 3)
+        self.assertEqual([seq for _, seq, _ in payload['locations']], [1, 2, 3])
+
+    def test_flush_on_close(self):
+        channel = queue.Queue()
+        storage = QueuedStorage(channel, worker_id=0, batch_size=100)
+        storage.insert_location_data('013912345678', 1, {})
+        storage.close()
+        storage.close()
+        self.assertEqual(channel.qsize(), 1)
+
+
+class TestWorkerSupervisor(unittest.TestCase):
+    def test_aggregates_worker_stats_and_storage(self):
+        sup = WorkerSupervisor(port=0, workers=2, db_path=':memory:')
+        sup._channel = queue.Queue()
+        sup._db_manager = supervisor.DatabaseManager(':memory:')
+        sup._channel.put((supervisor.MSG_STATS, 0, {'active_connections': 3, 'total_packets_received': 10}))
+        sup._channel.put((supervisor.MSG_STATS, 1, {'active_connections': 2, 'total_packets_received': 5}))
+        sup._channel.put((supervisor.MSG_STORAGE, 1, {
+            'locations': [('013912345678', 1, {'latitude': 39.9, 'longitude': 116.4})],
+            'vehicles': []
+        }))
+        self.assertEqual(sup.poll(timeout=0.1), 3)
+        stats = sup.get_stats()
+        self.assertEqual(stats['active_connections'], 5)
+        self.assertEqual(stats['total_packets_received'], 15)
+        self.assertEqual(stats['locations_written'], 1)
+        sup._db_manager.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
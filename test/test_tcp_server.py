@@ -12,10 +12,10 @@ import socket
 import time
 import json
 try:
-    from jt808proxy.core.tcp_server import TCPServer
+    from JT808Proxy.core.tcp_server import TCPServer
 except ImportError:
     import importlib.util
-    spec = importlib.util.spec_from_file_location("tcp_server", os.path.join(os.path.dirname(__file__), '../jt808proxy/core/tcp_server.py'))
+    spec = importlib.util.spec_from_file_location("tcp_server", os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/tcp_server.py'))
     tcp_server = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(tcp_server)
     TCPServer = tcp_server.TCPServer
@@ -45,14 +45,14 @@ async def test_server():
             clients.append(client)
             print(f"客户端 {i+1} 连接成功")
             
-            # 发送测试数据
-            test_data = f"Test data from client {i+1}".encode()
+            # 发送终端心跳（0x0002）
+            test_data = bytes.fromhex('7e 00 02 00 00 01 39 12 34 56 78 00 01 33 7e')
             client.send(test_data)
-            print(f"客户端 {i+1} 发送数据: {test_data}")
+            print(f"客户端 {i+1} 发送数据: {test_data.hex()}")
             
-            # 接收响应
+            # 接收平台通用应答（0x8001）
             response = client.recv(1024)
-            print(f"客户端 {i+1} 收到响应: {response}")
+            print(f"客户端 {i+1} 收到响应: {response.hex()}")
             
             # 等待一段时间，让服务器处理
             await asyncio.sleep(0.5)
@@ -0,0 +1,82 @@
+"""
+超时时间轮单元测试
+"""
+import os
+import unittest
+import importlib.util
+
+# 动态加载timer_wheel模块
+timer_wheel_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../JT808Proxy/core/timer_wheel.py'))
+spec = importlib.util.spec_from_file_location("timer_wheel", timer_wheel_path)
+timer_wheel = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(timer_wheel)
+TimerWheel = timer_wheel.TimerWheel
+
+
+class Entry:
+    def __init__(self, name):
+        self.name = name
+        self.timer_deadline = 0.0
+        self.timer_slot = None
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_expire(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.advance(100.0)
+        a, b = Entry('a'), Entry('b')
+        wheel.schedule(a, 103.0)
+        wheel.schedule(b, 105.5)
+        self.assertEqual(wheel.advance(102.0), [])
+        self.assertEqual(wheel.advance(103.0), [a])
+        self.assertEqual(wheel.advance(105.2), [])
+        self.assertEqual(wheel.advance(106.0), [b])
+        self.assertEqual(len(wheel), 0)
+
+    def test_touch_postpones(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.advance(0.0)
+        entry = Entry('a')
+        wheel.schedule(entry, 3.0)
+        # 每次收到报文都推迟超时，槽位不变
+        for now in range(1, 20):
+            self.assertEqual(wheel.advance(float(now)), [])
+            wheel.touch(entry, now + 3.0)
+        self.assertEqual(wheel.advance(22.0), [entry])
+
+    def test_deadline_beyond_one_round(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.advance(0.0)
+        entry = Entry('a')
+        wheel.schedule(entry, 30.0)
+        expired = []
+        for now in range(1, 40):
+            expired += [(now, e) for e in wheel.advance(float(now))]
+        self.assertEqual(expired, [(30, entry)])
+
+    def test_cancel_and_large_gap(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.advance(0.0)
+        a, b = Entry('a'), Entry('b')
+        wheel.schedule(a, 2.0)
+        wheel.schedule(b, 5.0)
+        wheel.cancel(a)
+        self.assertEqual(len(wheel), 1)
+        self.assertEqual(wheel.advance(1000.0), [b])
+
+    def test_empty_bucket_released(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.advance(0.0)
+        entries = [Entry(i) for i in range(1000)]
+        for entry in entries:
+            wheel.schedule(entry, 3.0)
+        bucket = wheel._wheel[3]
+        for entry in entries:
+            wheel.cancel(entry)
+        # 槽位删空后换成新集合，不保留批量调度时扩出的哈希表
+        self.assertIsNot(wheel._wheel[3], bucket)
+        self.assertEqual(len(wheel), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()